@@ -7,7 +7,7 @@ from alembic import context
 import sys
 from pathlib import Path
 import os
-from src.database.models import Base, Job, JobEmbedding, User, Role
+from src.database.models import Base, Job, JobDetail, JobEmbedding, EmbeddingCacheEntry, QueryEmbedding, User, Role, ScrapeBoard, ScrapeTask
 from src.settings import settings
 
 
@@ -0,0 +1,37 @@
+"""add scrape_boards
+
+Revision ID: 7c1e4b2a9d30
+Revises: 20e8dae6e1a8
+Create Date: 2026-10-18 09:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b2a9d30'
+down_revision: Union[str, Sequence[str], None] = '20e8dae6e1a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_boards',
+    sa.Column('source', sa.Text(), nullable=False),
+    sa.Column('board', sa.Text(), nullable=False),
+    sa.Column('etag', sa.Text(), nullable=True),
+    sa.Column('last_modified', sa.Text(), nullable=True),
+    sa.Column('body_hash', sa.Text(), nullable=True),
+    sa.Column('last_fetched_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_changed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('source', 'board')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scrape_boards')
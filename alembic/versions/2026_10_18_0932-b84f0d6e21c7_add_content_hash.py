@@ -0,0 +1,31 @@
+"""add content_hash to jobs and job_embeddings
+
+Revision ID: b84f0d6e21c7
+Revises: 7c1e4b2a9d30
+Create Date: 2026-10-18 09:32:47.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84f0d6e21c7'
+down_revision: Union[str, Sequence[str], None] = '7c1e4b2a9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable: existing rows get their fingerprint on the next scrape that touches them.
+    op.add_column('jobs', sa.Column('content_hash', sa.Text(), nullable=True))
+    op.add_column('job_embeddings', sa.Column('content_hash', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_embeddings', 'content_hash')
+    op.drop_column('jobs', 'content_hash')
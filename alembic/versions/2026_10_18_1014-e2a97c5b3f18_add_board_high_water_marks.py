@@ -0,0 +1,31 @@
+"""add high-water marks to scrape_boards
+
+Revision ID: e2a97c5b3f18
+Revises: b84f0d6e21c7
+Create Date: 2026-10-18 10:14:03.551872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a97c5b3f18'
+down_revision: Union[str, Sequence[str], None] = 'b84f0d6e21c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scrape_boards', sa.Column('high_water_mark', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('scrape_boards', sa.Column('known_source_ids', postgresql.ARRAY(sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scrape_boards', 'known_source_ids')
+    op.drop_column('scrape_boards', 'high_water_mark')
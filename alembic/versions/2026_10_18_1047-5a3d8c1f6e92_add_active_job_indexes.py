@@ -0,0 +1,38 @@
+"""add partial indexes on active jobs
+
+Revision ID: 5a3d8c1f6e92
+Revises: e2a97c5b3f18
+Create Date: 2026-10-18 10:47:22.306415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a3d8c1f6e92'
+down_revision: Union[str, Sequence[str], None] = 'e2a97c5b3f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the jobs table writable while the indexes build.
+    with op.get_context().autocommit_block():
+        op.create_index('jobs_active_posted_at_idx', 'jobs', [sa.text('posted_at DESC')], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('jobs_active_source_company_idx', 'jobs', ['source', 'company'], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('jobs_active_id_idx', 'jobs', ['id'], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('jobs_active_id_idx', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('jobs_active_source_company_idx', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('jobs_active_posted_at_idx', table_name='jobs', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,32 @@
+"""add circuit breaker state to scrape_boards
+
+Revision ID: c41f7a9e0b25
+Revises: 5a3d8c1f6e92
+Create Date: 2026-10-18 11:39:47.120584
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a9e0b25'
+down_revision: Union[str, Sequence[str], None] = '5a3d8c1f6e92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scrape_boards', sa.Column('consecutive_failures', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('scrape_boards', sa.Column('circuit_open_until', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('scrape_boards', sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scrape_boards', 'last_error')
+    op.drop_column('scrape_boards', 'circuit_open_until')
+    op.drop_column('scrape_boards', 'consecutive_failures')
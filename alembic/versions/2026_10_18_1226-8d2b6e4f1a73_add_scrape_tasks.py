@@ -0,0 +1,56 @@
+"""add scrape_tasks work queue
+
+Revision ID: 8d2b6e4f1a73
+Revises: c41f7a9e0b25
+Create Date: 2026-10-18 12:26:31.774019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b6e4f1a73'
+down_revision: Union[str, Sequence[str], None] = 'c41f7a9e0b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_tasks',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('source', sa.Text(), nullable=False),
+    sa.Column('board', sa.Text(), nullable=False),
+    sa.Column('full_refresh', sa.Boolean(), server_default='false', nullable=False),
+    sa.Column('status', sa.Text(), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False),
+    sa.Column('lease_owner', sa.Text(), nullable=True),
+    sa.Column('lease_expires_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('available_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('enqueued_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.CheckConstraint("status IN ('pending', 'running', 'done', 'failed')", name='scrape_tasks_status_check'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('scrape_tasks_open_board_uq', 'scrape_tasks', ['source', 'board'], unique=True,
+                    postgresql_where=sa.text("status IN ('pending', 'running')"))
+    op.create_index('scrape_tasks_pending_idx', 'scrape_tasks', ['available_at'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"))
+    op.create_index('scrape_tasks_running_idx', 'scrape_tasks', ['lease_expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('scrape_tasks_running_idx', table_name='scrape_tasks')
+    op.drop_index('scrape_tasks_pending_idx', table_name='scrape_tasks')
+    op.drop_index('scrape_tasks_open_board_uq', table_name='scrape_tasks')
+    op.drop_table('scrape_tasks')
@@ -0,0 +1,36 @@
+"""turn scrape_boards into the board registry with adaptive cadence
+
+Revision ID: f6a0c3d9b812
+Revises: 8d2b6e4f1a73
+Create Date: 2026-10-18 13:18:05.902733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a0c3d9b812'
+down_revision: Union[str, Sequence[str], None] = '8d2b6e4f1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scrape_boards', sa.Column('enabled', sa.Boolean(), server_default='true', nullable=False))
+    op.add_column('scrape_boards', sa.Column('scrape_interval', sa.Integer(), nullable=True))
+    op.add_column('scrape_boards', sa.Column('min_interval', sa.Integer(), nullable=True))
+    op.add_column('scrape_boards', sa.Column('max_interval', sa.Integer(), nullable=True))
+    op.add_column('scrape_boards', sa.Column('added_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scrape_boards', 'added_at')
+    op.drop_column('scrape_boards', 'max_interval')
+    op.drop_column('scrape_boards', 'min_interval')
+    op.drop_column('scrape_boards', 'scrape_interval')
+    op.drop_column('scrape_boards', 'enabled')
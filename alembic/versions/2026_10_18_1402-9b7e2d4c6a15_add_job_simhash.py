@@ -0,0 +1,45 @@
+"""add simhash fingerprints and duplicate_of to jobs
+
+Revision ID: 9b7e2d4c6a15
+Revises: f6a0c3d9b812
+Create Date: 2026-10-18 14:02:41.557190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e2d4c6a15'
+down_revision: Union[str, Sequence[str], None] = 'f6a0c3d9b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable columns without defaults: metadata-only, no table rewrite. Existing rows are
+    # fingerprinted by `python -m src.insertion.near_duplicates`.
+    op.add_column('jobs', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('jobs', sa.Column('simhash_bands', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column('jobs', sa.Column('duplicate_of', sa.Text(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('jobs_simhash_bands_idx', 'jobs', ['simhash_bands'], unique=False, postgresql_using='gin',
+                        postgresql_where=sa.text('is_active AND duplicate_of IS NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('jobs_duplicate_of_idx', 'jobs', ['duplicate_of'], unique=False,
+                        postgresql_where=sa.text('duplicate_of IS NOT NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('jobs_duplicate_of_idx', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('jobs_simhash_bands_idx', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('jobs', 'duplicate_of')
+    op.drop_column('jobs', 'simhash_bands')
+    op.drop_column('jobs', 'simhash')
@@ -0,0 +1,74 @@
+"""add job_details and copy the wide job columns into it
+
+Revision ID: 3f8a1c5e7d24
+Revises: 9b7e2d4c6a15
+Create Date: 2026-10-18 14:51:12.480316
+
+Expand step of the jobs/job_details split. Code from this revision on reads and writes
+job_details only; the old columns stay on jobs until 6c2e9b0d4f17 drops them, so instances
+still running the previous release keep working during a rolling deploy. Upgrade to this
+revision explicitly (`alembic upgrade 3f8a1c5e7d24`); `upgrade head` would run the contract
+step before the old instances are gone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a1c5e7d24'
+down_revision: Union[str, Sequence[str], None] = '9b7e2d4c6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# One keyset batch per statement; in autocommit mode each commits on its own, so no lock on
+# jobs is held for longer than one batch. Rows the new code already wrote are left alone.
+COPY_BATCH = sa.text("""
+WITH batch AS (
+  SELECT id, description_html, description_text, compensation
+  FROM jobs
+  WHERE id > :after
+  ORDER BY id
+  LIMIT :limit
+), copied AS (
+  INSERT INTO job_details (job_id, description_html, description_text, compensation)
+  SELECT id, description_html, description_text, compensation FROM batch
+  ON CONFLICT (job_id) DO NOTHING
+)
+SELECT max(id) FROM batch
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'job_details',
+        sa.Column('job_id', sa.Text(), nullable=False),
+        sa.Column('description_html', sa.Text(), nullable=True),
+        sa.Column('description_text', sa.Text(), nullable=True),
+        sa.Column('compensation', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('source_payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id'),
+    )
+    for column in ('description_html', 'description_text', 'compensation', 'source_payload'):
+        op.execute(f"ALTER TABLE job_details ALTER COLUMN {column} SET COMPRESSION lz4")
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        after = ''
+        while True:
+            last = conn.execute(COPY_BATCH, {"after": after, "limit": BATCH_SIZE}).scalar()
+            if last is None:
+                break
+            after = last
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_details')
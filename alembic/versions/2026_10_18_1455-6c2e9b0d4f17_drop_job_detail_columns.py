@@ -0,0 +1,87 @@
+"""drop the wide columns from jobs now that job_details holds them
+
+Revision ID: 6c2e9b0d4f17
+Revises: 3f8a1c5e7d24
+Create Date: 2026-10-18 14:55:47.119802
+
+Contract step of the jobs/job_details split: apply once no instance of the previous
+release is writing to jobs any more. Ship it as two upgrades, never one `upgrade head`:
+
+    uv run alembic upgrade 3f8a1c5e7d24   # expand, then roll out the new release
+    uv run alembic upgrade head           # contract, once the old instances are gone
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e9b0d4f17'
+down_revision: Union[str, Sequence[str], None] = '3f8a1c5e7d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# What old instances wrote to jobs after the expand step's copy: rows they inserted, and
+# rows they updated later than job_details was last written (both bump updated_at to now()).
+CATCH_UP = sa.text("""
+INSERT INTO job_details (job_id, description_html, description_text, compensation)
+SELECT j.id, j.description_html, j.description_text, j.compensation
+FROM jobs j
+LEFT JOIN job_details d ON d.job_id = j.id
+WHERE d.job_id IS NULL OR j.updated_at > d.updated_at
+ON CONFLICT (job_id) DO UPDATE SET
+  description_html = EXCLUDED.description_html,
+  description_text = EXCLUDED.description_text,
+  compensation = EXCLUDED.compensation,
+  updated_at = now()
+WHERE (job_details.description_html, job_details.description_text, job_details.compensation)
+  IS DISTINCT FROM (EXCLUDED.description_html, EXCLUDED.description_text, EXCLUDED.compensation)
+""")
+
+COPY_BACK_BATCH = sa.text("""
+WITH batch AS (
+  SELECT job_id, description_html, description_text, compensation
+  FROM job_details
+  WHERE job_id > :after
+  ORDER BY job_id
+  LIMIT :limit
+), copied AS (
+  UPDATE jobs j
+  SET description_html = b.description_html,
+      description_text = b.description_text,
+      compensation = b.compensation
+  FROM batch b
+  WHERE j.id = b.job_id
+)
+SELECT max(job_id) FROM batch
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CATCH_UP)
+    # Dropping a column only touches the catalog, but needs a brief ACCESS EXCLUSIVE lock:
+    # give up rather than queue behind a long query with every search waiting behind us.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.drop_column('jobs', 'compensation')
+    op.drop_column('jobs', 'description_text')
+    op.drop_column('jobs', 'description_html')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('jobs', sa.Column('description_html', sa.Text(), nullable=True))
+    op.add_column('jobs', sa.Column('description_text', sa.Text(), nullable=True))
+    op.add_column('jobs', sa.Column('compensation', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        after = ''
+        while True:
+            last = conn.execute(COPY_BACK_BATCH, {"after": after, "limit": BATCH_SIZE}).scalar()
+            if last is None:
+                break
+            after = last
@@ -0,0 +1,38 @@
+"""add query_embeddings, the shared search query vector cache
+
+Revision ID: 8d1f4a7c2e60
+Revises: 6c2e9b0d4f17
+Create Date: 2026-10-18 15:32:07.913254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f4a7c2e60'
+down_revision: Union[str, Sequence[str], None] = '6c2e9b0d4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'query_embeddings',
+        sa.Column('model_name', sa.Text(), nullable=False),
+        sa.Column('query_key', sa.Text(), nullable=False),
+        sa.Column('embedding', Vector(384), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('model_name', 'query_key'),
+    )
+    op.create_index('query_embeddings_created_at_idx', 'query_embeddings', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('query_embeddings_created_at_idx', table_name='query_embeddings')
+    op.drop_table('query_embeddings')
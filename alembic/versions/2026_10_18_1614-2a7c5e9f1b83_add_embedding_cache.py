@@ -0,0 +1,38 @@
+"""add embedding_cache, job embeddings keyed by model and text hash
+
+Revision ID: 2a7c5e9f1b83
+Revises: 8d1f4a7c2e60
+Create Date: 2026-10-18 16:14:52.308817
+
+The table starts empty and fills as the backfill encodes new texts; existing job_embeddings
+are not copied in.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7c5e9f1b83'
+down_revision: Union[str, Sequence[str], None] = '8d1f4a7c2e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'embedding_cache',
+        sa.Column('model_name', sa.Text(), nullable=False),
+        sa.Column('text_sha', sa.Text(), nullable=False),
+        sa.Column('embedding', Vector(384), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('model_name', 'text_sha'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_cache')
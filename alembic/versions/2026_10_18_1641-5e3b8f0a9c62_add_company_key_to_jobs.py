@@ -0,0 +1,32 @@
+"""add company_key to jobs, the folded company name near-duplicate bands are scoped to
+
+Revision ID: 5e3b8f0a9c62
+Revises: 2a7c5e9f1b83
+Create Date: 2026-10-18 16:41:09.734158
+
+Band keys now hash the folded company name instead of the lowercased one, so existing rows
+keep their old keys until `python -m src.insertion.near_duplicates` refingerprints every row
+whose company_key is still NULL (and links them again). Until then they are not linked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e3b8f0a9c62'
+down_revision: Union[str, Sequence[str], None] = '2a7c5e9f1b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without a default: metadata-only, no table rewrite.
+    op.add_column('jobs', sa.Column('company_key', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'company_key')
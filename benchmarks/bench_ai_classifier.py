@@ -0,0 +1,59 @@
+"""
+Throughput of the AI-role classifier versus the single combined AI_RE search on a large
+synthetic board built from src/sample_jobs.jsonl (mostly non-AI postings, as on a real board).
+
+    uv run python -m benchmarks.bench_ai_classifier --postings 5000 --ai-share 0.1
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from src.scrapers.ai_classifier import AIRoleClassifier
+from src.settings import AI_KEYWORD_PREFIXES, AI_KEYWORDS, AI_RE
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[1] / "src" / "sample_jobs.jsonl"
+
+
+def synthetic_board(n: int, ai_share: float, seed: int = 0) -> list[tuple[str, str]]:
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    rng = random.Random(seed)
+    board = []
+    for _ in range(n):
+        row = rng.choice(rows)
+        if rng.random() < ai_share:
+            board.append((row["title"], row["description"]))
+        else:
+            board.append(("Account Executive", AI_RE.sub("team", row["description"])))
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postings", type=int, default=5000)
+    parser.add_argument("--ai-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    board = synthetic_board(args.postings, args.ai_share)
+    mb = sum(len(t) + len(d) for t, d in board) / 1e6
+    classifier = AIRoleClassifier(AI_KEYWORDS, AI_KEYWORD_PREFIXES)
+
+    candidates = {
+        "AI_RE.search per posting": lambda: [bool(AI_RE.search(f"{t}\n{d}")) for t, d in board],
+        "AIRoleClassifier.classify": lambda: classifier.classify(board),
+    }
+    print(f"{len(board)} postings, {mb:.1f} MB, {args.ai_share:.0%} AI roles")
+    results = {}
+    for name, fn in candidates.items():
+        start = time.perf_counter()
+        results[name] = fn()
+        seconds = time.perf_counter() - start
+        print(f"{name:>26}: {seconds:7.3f}s  {len(board) / seconds:9.0f} postings/s  {mb / seconds:7.1f} MB/s")
+    first, second = results.values()
+    assert first == second, "classifier disagrees with AI_RE"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Embedding backends side by side: torch SentenceTransformer, ONNX Runtime, and ONNX Runtime
+with int8 weights. Each runs in a fresh process so import time and peak RSS are its own.
+Reports load time, batch throughput (texts/s) and single-query latency (p50/p99).
+
+    uv run --extra onnx python -m benchmarks.bench_embedding_backends --texts 2000 --queries 200
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import time
+from pathlib import Path
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[1] / "src" / "sample_jobs.jsonl"
+
+BACKENDS = {
+    "torch": ("torch", False),
+    "onnx": ("onnx", False),
+    "onnx int8": ("onnx", True),
+}
+
+
+def corpus(n: int) -> list[str]:
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    texts = []
+    for i in range(n):
+        j = jobs[i % len(jobs)]
+        texts.append(f"{j['title']} at {j['company']} in {', '.join(j.get('locations') or ['Remote'])} #{i}")
+    return texts
+
+
+def run_backend(name: str, n_texts: int, n_queries: int) -> dict[str, float]:
+    backend, quantized = BACKENDS[name]
+    started = time.perf_counter()
+    from src.settings import settings
+    settings.model_onnx_quantize = quantized
+    from src.embedding import embedding_service
+    model = embedding_service.load_model(backend)
+    model.encode(["warm up"], normalize_embeddings=True)
+    load_s = time.perf_counter() - started
+
+    texts = corpus(n_texts)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=settings.model_batch_size, normalize_embeddings=True)
+    batch_s = time.perf_counter() - start
+
+    latencies = []
+    for q in texts[:n_queries]:
+        start = time.perf_counter()
+        model.encode([q], normalize_embeddings=True)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "load_s": load_s,
+        "texts_per_s": n_texts / batch_s,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="texts in the batch throughput run")
+    parser.add_argument("--queries", type=int, default=200, help="single-text encodes for latency")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{args.texts} texts per batch run, {args.queries} single queries")
+    for name in args.backends:
+        with ctx.Pool(1) as pool:
+            r = pool.apply(run_backend, (name, args.texts, args.queries))
+        print(f"{name:>10}: load {r['load_s']:6.1f}s  {r['texts_per_s']:8.0f} texts/s  "
+              f"p50 {r['p50_ms']:6.1f}ms  p99 {r['p99_ms']:6.1f}ms  peak RSS {r['peak_rss_mb']:7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Micro-benchmark: html_to_text versus the legacy multi-pass regex strip_html on the
+descriptions in src/sample_jobs.jsonl.
+
+    uv run python -m benchmarks.bench_html_text --repeat 50
+"""
+from __future__ import annotations
+import argparse
+import html
+import json
+import re
+import timeit
+from pathlib import Path
+from src.text.html_text import html_to_text
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[1] / "src" / "sample_jobs.jsonl"
+
+
+def legacy_strip_html(text: str | None) -> str:
+    if not text:
+        return ""
+    no_tags = re.sub(r"<[^>]+>", " ", text)
+    return html.unescape(re.sub(r"\s+", " ", no_tags)).strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        docs = [json.loads(line)["description"] for line in f if line.strip()]
+    total_mb = sum(len(d) for d in docs) * args.repeat / 1e6
+
+    candidates = {
+        "legacy strip_html": legacy_strip_html,
+        "html_to_text": html_to_text,
+        "html_to_text (flat)": lambda d: html_to_text(d, preserve_blocks=False),
+    }
+    print(f"{len(docs)} descriptions, {total_mb:.1f} MB per candidate")
+    baseline = None
+    for name, fn in candidates.items():
+        seconds = min(timeit.repeat(lambda: [fn(d) for d in docs], number=args.repeat, repeat=3))
+        baseline = baseline or seconds
+        print(f"{name:>22}: {seconds:7.3f}s  {total_mb / seconds:7.1f} MB/s  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
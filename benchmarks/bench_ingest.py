@@ -0,0 +1,99 @@
+"""
+Rows/sec of the executemany upsert versus the COPY staging path.
+
+Runs against DATABASE_URL inside a single outer transaction that is rolled back
+at the end, so the target database is left untouched.
+
+    uv run python -m benchmarks.bench_ingest --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+from sqlalchemy.orm import sessionmaker
+from src.database import database_service
+from src.insertion import db_insertion_service
+
+_WORDS = (
+    "model training inference research safety team build scale data platform "
+    "engineer distributed systems python evaluation product users reliable"
+).split()
+
+
+def synthetic_jobs(n: int, prefix: str, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choices(_WORDS, k=60))}</p>" for _ in range(8)
+        )
+        rows.append({
+            "id": f"{prefix}-{i}",
+            "source": "bench",
+            "source_id": str(i),
+            "company": f"company-{i % 50}",
+            "title": f"Machine Learning Engineer {i}",
+            "locations": [rng.choice(["San Francisco, CA", "London, UK", "Remote"])],
+            "posted_at": "2025-09-03T19:24:37-04:00",
+            "url": f"https://example.test/jobs/{prefix}/{i}",
+            "description_html": paragraphs,
+            "tags": ["Research", "Engineering"],
+            "compensation": {"min": 150000 + i, "max": 250000 + i, "currency": "USD"},
+        })
+    return rows
+
+
+@contextmanager
+def rolled_back_session():
+    """Point database_service at a session whose work is discarded on exit."""
+    connection = database_service.engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+
+    @contextmanager
+    def get_db_context_override():
+        yield session
+
+    original = database_service.get_db_context
+    database_service.get_db_context = get_db_context_override
+    try:
+        yield session
+    finally:
+        database_service.get_db_context = original
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+def _timed(fn: Callable[[list[dict[str, Any]]], dict[str, int]], rows: list[dict[str, Any]]) -> tuple[float, dict[str, int]]:
+    start = time.perf_counter()
+    counts = fn(rows)
+    return time.perf_counter() - start, counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    paths = {
+        "executemany": db_insertion_service._executemany_upsert,
+        "copy": db_insertion_service._copy_upsert,
+    }
+    print(f"{'rows':>8} {'path':>12} {'phase':>10} {'seconds':>9} {'rows/sec':>11}")
+    with rolled_back_session():
+        for size in args.sizes:
+            for name, upsert in paths.items():
+                rows = db_insertion_service.prepare_job_rows(synthetic_jobs(size, f"{name}-{size}"))
+                changed = db_insertion_service.prepare_job_rows(
+                    [{**r, "title": r["title"] + " (updated)"} for r in synthetic_jobs(size, f"{name}-{size}")]
+                )
+                for phase, batch in (("insert", rows), ("unchanged", rows), ("update", changed)):
+                    elapsed, _ = _timed(upsert, batch)
+                    print(f"{size:>8} {name:>12} {phase:>10} {elapsed:>9.2f} {size / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
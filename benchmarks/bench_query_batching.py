@@ -0,0 +1,90 @@
+"""
+Query-embedding latency and throughput under concurrent search load: one model.encode per
+request (the path before micro-batching) versus the EmbeddingBatcher dispatcher. Every request
+embeds a distinct query, so the query cache plays no part.
+
+    uv run python -m benchmarks.bench_query_batching --clients 16 --seconds 10
+    uv run python -m benchmarks.bench_query_batching --clients 32 --max-wait-ms 5 --batch-size 64
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from src.embedding import embedding_service
+from src.embedding.batcher import EmbeddingBatcher
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[1] / "src" / "sample_jobs.jsonl"
+
+
+def query_stream() -> Callable[[], str]:
+    """Thread-safe source of distinct, realistic search strings."""
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        titles = [json.loads(line)["title"] for line in f if line.strip()]
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def next_query() -> str:
+        with lock:
+            n = next(counter)
+        return f"{titles[n % len(titles)]} remote {n}"
+
+    return next_query
+
+
+def run_load(embed_one: Callable[[str], list[float]], clients: int, seconds: float) -> dict[str, float]:
+    next_query = query_stream()
+    latencies: list[list[float]] = [[] for _ in range(clients)]
+    stop = time.perf_counter() + seconds
+
+    def client(i: int) -> None:
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            embed_one(next_query())
+            latencies[i].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    flat = sorted(itertools.chain.from_iterable(latencies))
+    return {
+        "requests": len(flat),
+        "qps": len(flat) / elapsed,
+        "p50_ms": statistics.median(flat) * 1000,
+        "p99_ms": flat[min(len(flat) - 1, int(len(flat) * 0.99))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent requesting threads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load duration per path")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    embedding_service.embed_texts(["warm up"])
+    batcher = EmbeddingBatcher(embedding_service.embed_texts, args.batch_size, args.max_wait_ms)
+    candidates = {
+        "encode per request": lambda q: embedding_service.embed_texts([q])[0],
+        "micro-batched": lambda q: batcher.encode([q])[0],
+    }
+    print(f"{args.clients} clients, {args.seconds:.0f}s per path, "
+          f"batch size {args.batch_size}, max wait {args.max_wait_ms}ms")
+    for name, fn in candidates.items():
+        r = run_load(fn, args.clients, args.seconds)
+        print(f"{name:>20}: {r['qps']:8.1f} q/s  p50 {r['p50_ms']:7.1f}ms  p99 {r['p99_ms']:7.1f}ms  "
+              f"({r['requests']} requests)")
+    print(f"batcher: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
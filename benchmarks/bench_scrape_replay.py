@@ -0,0 +1,111 @@
+"""
+End-to-end scrape throughput offline, replaying recorded board responses.
+
+Record fixtures once against the live APIs (any scrape with SCRAPE_HTTP_MODE=record), or
+let --synthesize write Greenhouse-shaped boards. Then replay them, optionally amplified,
+through the pipeline:
+
+    uv run python -m benchmarks.bench_scrape_replay --synthesize 20 --amplify 1 10 50
+    uv run python -m benchmarks.bench_scrape_replay --fixtures fixtures/scrape --amplify 10 --ingest
+
+Without --ingest only fetch + normalize run (no database needed). With --ingest rows are
+upserted inside a transaction that is rolled back, and embedding is skipped.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from src.scrapers import pipeline, scraper_service
+from src.scrapers.fetch_engine import FetchEngine
+from src.scrapers.http_fixtures import ReplayTransport, save_payload
+from benchmarks.bench_ingest import rolled_back_session, synthetic_jobs
+
+
+def synthesize_boards(directory: Path, boards: int, postings: int) -> list[str]:
+    names = [f"synthetic-{b}" for b in range(boards)]
+    for name in names:
+        spec = scraper_service.greenhouse_spec(name)
+        jobs = [
+            {
+                "id": 10_000 + i,
+                "title": row["title"],
+                "location": {"name": row["locations"][0]},
+                "content": row["description_html"],
+                "absolute_url": row["url"],
+                "updated_at": row["posted_at"],
+                "departments": [{"name": "Research"}],
+            }
+            for i, row in enumerate(synthetic_jobs(postings, name))
+        ]
+        save_payload(directory, spec.url, spec.params, {"jobs": jobs}, etag=f'"{name}-v1"')
+    return names
+
+
+async def fetch_and_parse(specs: list[pipeline.BoardSpec], transport: ReplayTransport) -> tuple[int, int]:
+    async with FetchEngine(rate_per_host=0, transport=transport) as engine:
+        async def one(spec: pipeline.BoardSpec) -> tuple[int, int]:
+            resp = await engine.get_board(spec.url, params=spec.params)
+            watermark = pipeline.BoardWatermark()
+            try:
+                rows = await asyncio.to_thread(lambda: list(spec.parse(spec.board, resp.body, watermark)))
+            finally:
+                resp.close()
+            return len(watermark.seen_ids), len(rows)
+
+        counts = await asyncio.gather(*(one(s) for s in specs))
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def run_ingest(specs: list[pipeline.BoardSpec], transport: ReplayTransport) -> tuple[int, int]:
+    original = pipeline.embedding_service.embed_data
+    pipeline.embedding_service.embed_data = lambda: None
+    try:
+        with rolled_back_session():
+            stats = asyncio.run(pipeline.run_pipeline(
+                specs, engine=FetchEngine(rate_per_host=0, transport=transport), full_refresh=True
+            ))
+    finally:
+        pipeline.embedding_service.embed_data = original
+    return stats["inserted"] + stats["updated"] + stats["unchanged"], stats["inserted"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="directory of recorded fixtures")
+    parser.add_argument("--boards", nargs="*", help="greenhouse boards to replay (default: boards in settings)")
+    parser.add_argument("--synthesize", type=int, metavar="N", help="write N synthetic boards to a temp dir")
+    parser.add_argument("--postings", type=int, default=50, help="postings per synthetic board")
+    parser.add_argument("--amplify", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--ingest", action="store_true", help="also upsert into DATABASE_URL (rolled back)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthesize:
+            directory = Path(tmp)
+            specs = [scraper_service.greenhouse_spec(b) for b in synthesize_boards(directory, args.synthesize, args.postings)]
+        elif args.fixtures:
+            directory = args.fixtures
+            specs = (
+                [scraper_service.greenhouse_spec(b) for b in args.boards]
+                if args.boards else scraper_service.settings_specs()
+            )
+        else:
+            parser.error("pass --fixtures DIR or --synthesize N")
+
+        print(f"{'amplify':>8} {'postings':>9} {'rows':>8} {'seconds':>9} {'postings/sec':>13}  phase")
+        for factor in args.amplify:
+            start = time.perf_counter()
+            postings, rows = asyncio.run(fetch_and_parse(specs, ReplayTransport(directory, amplify=factor)))
+            elapsed = time.perf_counter() - start
+            print(f"{factor:>8} {postings:>9} {rows:>8} {elapsed:>9.2f} {postings / elapsed:>13.0f}  fetch+normalize")
+            if args.ingest:
+                start = time.perf_counter()
+                rows, _ = run_ingest(specs, ReplayTransport(directory, amplify=factor))
+                elapsed = time.perf_counter() - start
+                print(f"{factor:>8} {postings:>9} {rows:>8} {elapsed:>9.2f} {postings / elapsed:>13.0f}  pipeline")
+
+
+if __name__ == "__main__":
+    main()
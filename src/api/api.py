@@ -1,4 +1,5 @@
 from __future__ import annotations
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 
 from starlette.middleware.cors import CORSMiddleware
@@ -8,9 +9,19 @@ import src.api.api_services as api_svc
 from src.auth import auth_router
 from src.search import search_router
 from src.scrapers import scraper_router
+from src.scrapers.scheduler import scheduler
 from src.settings import settings
 
-app = FastAPI(title="Jobs API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.scrape_scheduler_enabled:
+        scheduler.start()
+    yield
+    scheduler.stop()
+
+
+app = FastAPI(title="Jobs API", lifespan=lifespan)
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.secret_key,
@@ -4,11 +4,20 @@ from collections import Counter
 from sqlalchemy import text
 
 def get_job_by_id(job_id: str):
-    with database_service.get_db_context() as cur:
-        cur.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
-        row = cur.fetchone()
+    """One job with its detail columns (descriptions, compensation, source payload) joined back in."""
+    query = text("""
+        SELECT
+            j.id, j.source, j.source_id, j.company, j.title, j.locations, j.remote,
+            j.posted_at, j.url, j.tags, j.is_active, j.duplicate_of, j.inserted_at, j.updated_at,
+            d.description_html, d.description_text, d.compensation, d.source_payload
+        FROM jobs j
+        LEFT JOIN job_details d ON d.job_id = j.id
+        WHERE j.id = :job_id
+    """)
+    with database_service.get_db_context() as db:
+        row = db.execute(query, {"job_id": job_id}).mappings().one_or_none()
 
-    return row
+    return dict(row) if row else None
 
 def get_statistics(top_n_companies: int = 10, days_back: int = 30):
     """Get comprehensive job statistics using CTEs."""
@@ -22,7 +31,9 @@ def get_statistics(top_n_companies: int = 10, days_back: int = 30):
                 company,
                 title
             FROM jobs
-            WHERE posted_at >= now() - interval ':days_back days'
+            WHERE is_active
+              AND duplicate_of IS NULL
+              AND posted_at >= now() - make_interval(days => :days_back)
         ),
         jobs_per_day AS (
             SELECT posting_date AS date, COUNT(*) AS count
@@ -0,0 +1,273 @@
+"""
+Bulk import of job archives in the shape of src/sample_jobs.jsonl.
+
+Files are streamed line by line (.gz is decompressed on the fly), parsed and normalized in a
+process pool, and loaded through the COPY merge path in the main process. A checkpoint is
+written after every committed batch, so an interrupted import resumes where it stopped.
+
+    uv run python -m src.bulk_import archive-2025-*.jsonl.gz --workers 8
+    uv run python -m src.bulk_import src/sample_jobs.jsonl --embed
+"""
+from __future__ import annotations
+import argparse
+import collections
+import gzip
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Iterator
+from src.insertion import db_insertion_service
+from src.settings import settings
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def open_lines(path: str | Path) -> IO[str]:
+    """Text reader for a JSONL file, gzipped or not (detected from the content, not the name)."""
+    with open(path, "rb") as fh:
+        gzipped = fh.read(2) == _GZIP_MAGIC
+    if gzipped:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def archive_row(record: dict[str, Any]) -> dict[str, Any]:
+    """Map an archived job to the scraper's row shape; archives keep the HTML under `description`."""
+    row = dict(record)
+    if "description_html" not in row:
+        row["description_html"] = row.pop("description", None)
+    return row
+
+
+def normalize_lines(lines: list[str]) -> tuple[list[dict[str, Any]], dict[str, int]]:
+    """Parse and prepare one batch of JSONL lines. Runs in the worker processes."""
+    rows, bad = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            rows.append(archive_row(json.loads(line)))
+        except (ValueError, TypeError, AttributeError):
+            bad += 1
+    values = db_insertion_service.prepare_job_rows(rows)
+    return values, {"bad_lines": bad, "duplicates": len(rows) - len(values)}
+
+
+class Checkpoint:
+    """
+    Lines committed per input file, stored as JSON next to the data.
+    A file whose size or mtime changed since the checkpoint was taken starts over.
+    """
+
+    def __init__(self, path: str | Path | None) -> None:
+        self.path = Path(path) if path else None
+        self.files: dict[str, dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            self.files = json.loads(self.path.read_text(encoding="utf-8")).get("files", {})
+
+    @staticmethod
+    def _identity(path: str | Path) -> dict[str, int]:
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _entry(self, path: str | Path) -> dict[str, Any]:
+        key = str(Path(path).resolve())
+        entry = self.files.get(key)
+        identity = self._identity(path)
+        if entry is None or any(entry.get(k) != v for k, v in identity.items()):
+            entry = self.files[key] = {**identity, "lines": 0, "done": False}
+        return entry
+
+    def start_line(self, path: str | Path) -> int | None:
+        """Lines to skip in `path`, or None when it was imported completely."""
+        entry = self._entry(path)
+        return None if entry["done"] else entry["lines"]
+
+    def advance(self, path: str | Path, lines: int) -> None:
+        self._entry(path)["lines"] = lines
+        self._save()
+
+    def finish(self, path: str | Path) -> None:
+        self._entry(path)["done"] = True
+        self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"files": self.files}, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def iter_batches(path: str | Path, start_line: int, batch_size: int) -> Iterator[tuple[int, list[str]]]:
+    """(line number after the batch, lines) for `path`, skipping the first `start_line` lines."""
+    with open_lines(path) as fh:
+        line_no = start_line
+        lines = itertools.islice(fh, start_line, None)
+        while batch := list(itertools.islice(lines, batch_size)):
+            line_no += len(batch)
+            yield line_no, batch
+
+
+class _InlineExecutor(Executor):
+    """Runs work in the calling process; used for --workers 1."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class _Embedder:
+    """Background thread that embeds newly stored jobs while the import keeps loading."""
+
+    def __init__(self) -> None:
+        self.requested = threading.Event()
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, name="bulk-import-embed", daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        # Imported here so the spawned normalization workers don't each load the model stack.
+        from src.embedding import embedding_service
+        while True:
+            self.requested.wait()
+            self.requested.clear()
+            embedding_service.embed_data()
+            if self.finished and not self.requested.is_set():
+                return
+
+    def request(self) -> None:
+        self.requested.set()
+
+    def finish(self) -> None:
+        self.finished = True
+        self.requested.set()
+        self.thread.join()
+
+
+def import_files(
+    paths: list[str | Path],
+    workers: int = 1,
+    batch_size: int | None = None,
+    checkpoint: str | Path | None = None,
+    embed: bool = False,
+    rejects: str | Path | None = None,
+    report_every: float = 5.0,
+) -> dict[str, Any]:
+    """
+    Import JSONL archives and return counts plus `rows_per_sec`.
+    Batches are normalized `workers` at a time in separate processes and committed in file
+    order, so the checkpoint always points just past the last committed line.
+    """
+    batch_size = batch_size or settings.db_upsert_chunk_size
+    progress = Checkpoint(checkpoint)
+    stats: dict[str, Any] = {
+        "files": 0, "lines": 0, "bad_lines": 0, "duplicates": 0,
+        "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0,
+    }
+    embedder = _Embedder() if embed else None
+    reject_fh = open(rejects, "a", encoding="utf-8") if rejects else None
+    started = last_report = time.perf_counter()
+
+    def commit(path: str | Path, end_line: int, future: Future, line_count: int) -> None:
+        nonlocal last_report
+        values, parse_stats = future.result()
+        failed: list[dict[str, Any]] = []
+        counts = db_insertion_service.bulk_insert_prepared(values, failed)
+        if reject_fh and failed:
+            reject_fh.writelines(json.dumps(v, default=str) + "\n" for v in failed)
+            reject_fh.flush()
+        progress.advance(path, end_line)
+        for key in ("inserted", "updated", "unchanged", "failed"):
+            stats[key] += counts[key]
+        for key, value in parse_stats.items():
+            stats[key] += value
+        stats["lines"] += line_count
+        if embedder and (counts["inserted"] or counts["updated"]):
+            embedder.request()
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"{path}: line {end_line}, {stats['lines'] / (now - started):,.0f} rows/s "
+                  f"({stats['inserted']} inserted, {stats['updated']} updated, {stats['failed']} failed)")
+
+    if workers > 1:
+        pool: Executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = _InlineExecutor()
+    # Bounded look-ahead: at most two batches per worker are parsed but not yet committed.
+    inflight: collections.deque = collections.deque()
+    try:
+        with pool:
+            for path in paths:
+                start = progress.start_line(path)
+                if start is None:
+                    print(f"{path}: already imported, skipping")
+                    continue
+                if start:
+                    print(f"{path}: resuming after line {start}")
+                for end_line, lines in iter_batches(path, start, batch_size):
+                    inflight.append((path, end_line, pool.submit(normalize_lines, lines), len(lines)))
+                    while len(inflight) > 2 * max(workers, 1):
+                        commit(*inflight.popleft())
+                inflight.append((path, None, None, 0))
+                stats["files"] += 1
+                # Completed files are marked as they leave the queue, after their last batch.
+                while inflight and inflight[0][1] is None:
+                    progress.finish(inflight.popleft()[0])
+            while inflight:
+                item = inflight.popleft()
+                if item[1] is None:
+                    progress.finish(item[0])
+                else:
+                    commit(*item)
+    finally:
+        for _, _, future, _ in inflight:
+            if future is not None:
+                future.cancel()
+        if reject_fh:
+            reject_fh.close()
+        if embedder:
+            embedder.finish()
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_sec"] = round(stats["lines"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="JSONL files, optionally gzipped")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="normalization processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="lines per batch (default: db_upsert_chunk_size)")
+    parser.add_argument("--checkpoint", default=".bulk_import.checkpoint.json", help="resume file")
+    parser.add_argument("--restart", action="store_true", help="ignore and overwrite an existing checkpoint")
+    parser.add_argument("--embed", action="store_true", help="embed new jobs while importing")
+    parser.add_argument("--rejects", default=None, help="append rows the database rejected to this JSONL file")
+    args = parser.parse_args(argv)
+
+    if args.restart:
+        Path(args.checkpoint).unlink(missing_ok=True)
+    stats = import_files(
+        args.paths,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint=args.checkpoint,
+        embed=args.embed,
+        rejects=args.rejects,
+    )
+    print(f"imported {stats['lines']} lines from {stats['files']} file(s) in {stats['seconds']}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s): {stats}")
+
+
+if __name__ == "__main__":
+    main()
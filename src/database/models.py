@@ -1,5 +1,5 @@
 
-from sqlalchemy import ForeignKey, String, Index, func, Text, TIMESTAMP, Table, Column, CheckConstraint
+from sqlalchemy import ForeignKey, String, Index, Integer, func, Text, TIMESTAMP, Table, Column, CheckConstraint, BigInteger, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from typing import Any
 from datetime import datetime
@@ -21,10 +21,15 @@ class Job(Base):
     remote: Mapped[bool | None]
     posted_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), index=True)
     url: Mapped[str | None] = mapped_column(Text())
-    description_html: Mapped[str | None] = mapped_column(Text())
-    description_text: Mapped[str | None] = mapped_column(Text())
     tags: Mapped[list | None] = mapped_column(ARRAY(Text()), server_default='{}')
-    compensation: Mapped[dict | None] = mapped_column(JSONB)
+    content_hash: Mapped[str | None] = mapped_column(Text())
+    # SimHash of the description and its band keys (see src/text/simhash.py) for near-duplicate lookup,
+    # scoped to the folded company name in company_key.
+    company_key: Mapped[str | None] = mapped_column(Text())
+    simhash: Mapped[int | None] = mapped_column(BigInteger())
+    simhash_bands: Mapped[list | None] = mapped_column(ARRAY(Integer()))
+    # Canonical job this row near-duplicates; NULL for canonical rows.
+    duplicate_of: Mapped[str | None] = mapped_column(Text())
     is_active: Mapped[bool] = mapped_column(default=True)
     inserted_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -40,22 +45,57 @@ class Job(Base):
     back_populates="job",
     cascade="all, delete-orphan"
     )
+    details: Mapped["JobDetail | None"] = relationship(
+        back_populates="job",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
     
     __table_args__ = (
         Index('jobs_posted_at_idx', 'posted_at', postgresql_using='btree'),
         Index('jobs_company_idx', 'company'),
+        # Partial indexes over the live working set used by search, statistics and the sweep.
+        Index('jobs_active_posted_at_idx', posted_at.desc(), postgresql_where=is_active),
+        Index('jobs_active_source_company_idx', 'source', 'company', postgresql_where=is_active),
+        Index('jobs_active_id_idx', 'id', postgresql_where=is_active),
+        # Near-duplicate candidates are active canonical rows sharing a SimHash band key.
+        Index('jobs_simhash_bands_idx', 'simhash_bands', postgresql_using='gin',
+              postgresql_where=text('is_active AND duplicate_of IS NULL')),
+        Index('jobs_duplicate_of_idx', 'duplicate_of', postgresql_where=text('duplicate_of IS NOT NULL')),
     )
     
     def __repr__(self) -> str:
         return f"Job(id={self.id!r}, company={self.company!r}, title={self.title!r})"
 
     
+class JobDetail(Base):
+    """
+    Cold, wide half of a job: descriptions, compensation and the raw source payload.
+    Kept off `jobs` so search and statistics scan narrow heap pages; the large columns use
+    lz4 TOAST compression (see schema.sql).
+    """
+    __tablename__ = "job_details"
+
+    job_id: Mapped[str] = mapped_column(Text(), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    description_html: Mapped[str | None] = mapped_column(Text())
+    description_text: Mapped[str | None] = mapped_column(Text())
+    compensation: Mapped[dict | None] = mapped_column(JSONB)
+    source_payload: Mapped[dict | None] = mapped_column(JSONB)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    job: Mapped["Job"] = relationship(back_populates="details")
+
+    def __repr__(self) -> str:
+        return f"JobDetail(job_id={self.job_id!r})"
+
+
 class JobEmbedding(Base):
     __tablename__ = "job_embeddings"
 
     job_id: Mapped[str] = mapped_column(Text(), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True) 
     model_name: Mapped[str] = mapped_column(Text())
     embedding: Mapped[list] = mapped_column(Vector(384), nullable=False, default=list)
+    content_hash: Mapped[str | None] = mapped_column(Text())
     embedded_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
     job: Mapped["Job"] = relationship(back_populates="embeddings")
@@ -72,8 +112,105 @@ class JobEmbedding(Base):
     
     def __repr__(self) -> str:
         return f"JobEmbedding(job_id={self.job_id!r}, model={self.model_name!r})"
+
+
+class EmbeddingCacheEntry(Base):
+    """
+    Content-addressed job embeddings: one vector per (model, sha256 of the embedded text).
+    Jobs whose text_to_embed is identical (re-posts, the same role in another source) reuse it.
+    """
+    __tablename__ = "embedding_cache"
+
+    model_name: Mapped[str] = mapped_column(Text(), primary_key=True)
+    text_sha: Mapped[str] = mapped_column(Text(), primary_key=True)
+    embedding: Mapped[list] = mapped_column(Vector(384), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"EmbeddingCacheEntry(model={self.model_name!r}, text_sha={self.text_sha!r})"
+
+
+class QueryEmbedding(Base):
+    """Search query vectors shared by API workers (see src/embedding/query_cache.py)."""
+    __tablename__ = "query_embeddings"
+
+    model_name: Mapped[str] = mapped_column(Text(), primary_key=True)
+    # sha256 of the model name and normalized query text
+    query_key: Mapped[str] = mapped_column(Text(), primary_key=True)
+    embedding: Mapped[list] = mapped_column(Vector(384), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('query_embeddings_created_at_idx', 'created_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"QueryEmbedding(model={self.model_name!r}, query_key={self.query_key!r})"
     
 
+class ScrapeBoard(Base):
+    __tablename__ = "scrape_boards"
+
+    source: Mapped[str] = mapped_column(Text(), primary_key=True)
+    board: Mapped[str] = mapped_column(Text(), primary_key=True)
+    etag: Mapped[str | None] = mapped_column(Text())
+    last_modified: Mapped[str | None] = mapped_column(Text())
+    body_hash: Mapped[str | None] = mapped_column(Text())
+    high_water_mark: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    known_source_ids: Mapped[list | None] = mapped_column(ARRAY(Text()))
+    last_fetched_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    last_changed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    consecutive_failures: Mapped[int] = mapped_column(default=0, server_default='0')
+    circuit_open_until: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text())
+    # Registry and scheduling policy: scrape_interval adapts between the min/max bounds
+    # (NULL bounds fall back to settings.scrape_min_interval / scrape_max_interval).
+    enabled: Mapped[bool] = mapped_column(default=True, server_default='true')
+    scrape_interval: Mapped[int | None]
+    min_interval: Mapped[int | None]
+    max_interval: Mapped[int | None]
+    added_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"ScrapeBoard(source={self.source!r}, board={self.board!r})"
+
+
+class ScrapeTask(Base):
+    """One board fetch in the distributed work queue (see src/scrapers/task_queue.py)."""
+    __tablename__ = "scrape_tasks"
+
+    id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
+    source: Mapped[str] = mapped_column(Text())
+    board: Mapped[str] = mapped_column(Text())
+    full_refresh: Mapped[bool] = mapped_column(default=False, server_default='false')
+    status: Mapped[str] = mapped_column(Text(), default="pending", server_default='pending')
+    attempts: Mapped[int] = mapped_column(default=0, server_default='0')
+    max_attempts: Mapped[int] = mapped_column(default=3, server_default='3')
+    lease_owner: Mapped[str | None] = mapped_column(Text())
+    lease_expires_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    available_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+    enqueued_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text())
+    stats: Mapped[dict | None] = mapped_column(JSONB)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')",
+            name="scrape_tasks_status_check"
+        ),
+        # At most one open task per board, so re-enqueueing is idempotent.
+        Index('scrape_tasks_open_board_uq', 'source', 'board', unique=True,
+              postgresql_where=text("status IN ('pending', 'running')")),
+        Index('scrape_tasks_pending_idx', 'available_at', postgresql_where=text("status = 'pending'")),
+        Index('scrape_tasks_running_idx', 'lease_expires_at', postgresql_where=text("status = 'running'")),
+    )
+
+    def __repr__(self) -> str:
+        return f"ScrapeTask(id={self.id!r}, source={self.source!r}, board={self.board!r}, status={self.status!r})"
+
+
 user_roles = Table(
     'user_roles',
     Base.metadata,
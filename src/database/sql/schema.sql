@@ -13,22 +13,101 @@ CREATE TABLE IF NOT EXISTS jobs (
   remote           BOOLEAN,
   posted_at        TIMESTAMPTZ,
   url              TEXT,
-  description_html TEXT,
-  description_text TEXT,
   tags             TEXT[] DEFAULT '{}',
-  compensation     JSONB,
+  content_hash     TEXT,
+  company_key      TEXT,
+  simhash          BIGINT,
+  simhash_bands    INTEGER[],
+  duplicate_of     TEXT,
   is_active        BOOLEAN NOT NULL DEFAULT TRUE,
   inserted_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
   updated_at       TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Cold half of each job: large text and raw payloads, lz4-compressed in TOAST
+CREATE TABLE IF NOT EXISTS job_details (
+  job_id           TEXT PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+  description_html TEXT  COMPRESSION lz4,
+  description_text TEXT  COMPRESSION lz4,
+  compensation     JSONB COMPRESSION lz4,
+  source_payload   JSONB COMPRESSION lz4,
+  updated_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
 -- Embeddings
 CREATE TABLE IF NOT EXISTS job_embeddings (
-  job_id      TEXT PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
-  model_name  TEXT NOT NULL,
-  embedding   VECTOR(384) NOT NULL,
-  embedded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+  job_id       TEXT PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+  model_name   TEXT NOT NULL,
+  embedding    VECTOR(384) NOT NULL,
+  content_hash TEXT,
+  embedded_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Job embeddings by (model, sha256 of the embedded text), reused for identical texts
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  model_name TEXT NOT NULL,
+  text_sha   TEXT NOT NULL,
+  embedding  VECTOR(384) NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (model_name, text_sha)
+);
+
+-- Search query vectors shared by API workers; rows older than query_cache_ttl are ignored and pruned
+CREATE TABLE IF NOT EXISTS query_embeddings (
+  model_name TEXT NOT NULL,
+  query_key  TEXT NOT NULL,
+  embedding  VECTOR(384) NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (model_name, query_key)
 );
+CREATE INDEX IF NOT EXISTS query_embeddings_created_at_idx ON query_embeddings (created_at);
+
+-- Board registry and per-board fetch state (HTTP validators, high-water marks, circuit breaker, cadence)
+CREATE TABLE IF NOT EXISTS scrape_boards (
+  source               TEXT NOT NULL,
+  board                TEXT NOT NULL,
+  etag                 TEXT,
+  last_modified        TEXT,
+  body_hash            TEXT,
+  high_water_mark      TIMESTAMPTZ,
+  known_source_ids     TEXT[],
+  last_fetched_at      TIMESTAMPTZ,
+  last_changed_at      TIMESTAMPTZ,
+  consecutive_failures INTEGER NOT NULL DEFAULT 0,
+  circuit_open_until   TIMESTAMPTZ,
+  last_error           TEXT,
+  enabled              BOOLEAN NOT NULL DEFAULT TRUE,
+  scrape_interval      INTEGER,
+  min_interval         INTEGER,
+  max_interval         INTEGER,
+  added_at             TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (source, board)
+);
+
+-- Distributed scrape work queue, claimed with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS scrape_tasks (
+  id               BIGSERIAL PRIMARY KEY,
+  source           TEXT NOT NULL,
+  board            TEXT NOT NULL,
+  full_refresh     BOOLEAN NOT NULL DEFAULT FALSE,
+  status           TEXT NOT NULL DEFAULT 'pending'
+                   CONSTRAINT scrape_tasks_status_check CHECK (status IN ('pending', 'running', 'done', 'failed')),
+  attempts         INTEGER NOT NULL DEFAULT 0,
+  max_attempts     INTEGER NOT NULL DEFAULT 3,
+  lease_owner      TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  available_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  enqueued_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+  started_at       TIMESTAMPTZ,
+  finished_at      TIMESTAMPTZ,
+  last_error       TEXT,
+  stats            JSONB
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS scrape_tasks_open_board_uq
+  ON scrape_tasks (source, board) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS scrape_tasks_pending_idx ON scrape_tasks (available_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS scrape_tasks_running_idx ON scrape_tasks (lease_expires_at) WHERE status = 'running';
 
 CREATE INDEX IF NOT EXISTS job_embeddings_ivfflat_cos
   ON job_embeddings USING ivfflat (embedding vector_cosine_ops)
@@ -36,3 +115,12 @@ CREATE INDEX IF NOT EXISTS job_embeddings_ivfflat_cos
 
 CREATE INDEX IF NOT EXISTS jobs_posted_at_idx ON jobs (posted_at DESC);
 CREATE INDEX IF NOT EXISTS jobs_company_idx   ON jobs (company);
+
+-- Live working set: search, statistics and the per-board deactivation sweep
+CREATE INDEX IF NOT EXISTS jobs_active_posted_at_idx      ON jobs (posted_at DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS jobs_active_source_company_idx ON jobs (source, company) WHERE is_active;
+CREATE INDEX IF NOT EXISTS jobs_active_id_idx             ON jobs (id) WHERE is_active;
+
+-- Near-duplicate detection: SimHash band keys of canonical rows, and the reverse link
+CREATE INDEX IF NOT EXISTS jobs_simhash_bands_idx ON jobs USING gin (simhash_bands) WHERE is_active AND duplicate_of IS NULL;
+CREATE INDEX IF NOT EXISTS jobs_duplicate_of_idx  ON jobs (duplicate_of) WHERE duplicate_of IS NOT NULL;
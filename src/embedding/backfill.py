@@ -0,0 +1,178 @@
+"""
+Embedding backfill: encode every canonical job that has no embedding, or a stale one.
+
+Missing jobs are read in keyset pages (id order, `embed_page_size` rows each) up to the
+largest id that existed when the run started, so a run always ends, even while scrapers keep
+inserting. Texts whose vector is already in the embedding cache (the same title, company and
+locations seen before) are not encoded again; the rest are encoded in a pool (`--workers`
+processes, or a thread for 0) while the main thread writes finished pages, in page order,
+and advances the checkpoint.
+
+    uv run python -m src.embedding.backfill --workers 4
+    uv run python -m src.embedding.backfill --workers 4 --checkpoint .embed.checkpoint.json
+"""
+from __future__ import annotations
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from src.embedding import embedding_service
+from src.settings import settings
+
+
+def _init_worker(threads: int) -> None:
+    """Split the cores between the encoding processes and load the model once per process."""
+    if settings.model_backend == "onnx":
+        settings.model_onnx_threads = threads
+    else:
+        import torch
+        torch.set_num_threads(threads)
+    embedding_service.get_model()
+
+
+def _encode(texts: list[str]) -> list[list[float]]:
+    return embedding_service.embed_texts(texts)
+
+
+class Cursor:
+    """
+    Keyset position of a backfill, optionally persisted as JSON. Only ids whose page was
+    written are recorded, so resuming never skips unwritten rows.
+    """
+
+    def __init__(self, path: str | Path | None) -> None:
+        self.path = Path(path) if path else None
+        self.after = ""
+        if self.path and self.path.exists():
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            if saved.get("model_name") == settings.model_name:
+                self.after = saved.get("after", "")
+
+    def advance(self, after: str) -> None:
+        self.after = after
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"model_name": settings.model_name, "after": after}), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def finish(self) -> None:
+        """A complete run leaves no checkpoint: the next one scans from the start again."""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+def run_backfill(
+    workers: int = 0,
+    page_size: int | None = None,
+    checkpoint: str | Path | None = None,
+    report_every: float = 10.0,
+) -> dict[str, Any]:
+    """
+    Embed all missing or stale jobs with ids up to the current maximum and return counts.
+    At most two pages per worker are fetched but not yet written.
+    """
+    page_size = page_size or settings.embed_page_size
+    stats: dict[str, Any] = {"pages": 0, "rows": 0, "embedded": 0, "encoded": 0, "cache_hits": 0}
+    upper = embedding_service.max_job_id()
+    cursor = Cursor(checkpoint)
+    if upper is None:
+        cursor.finish()
+        return {**stats, "dedup_ratio": 0.0, "seconds": 0.0, "rows_per_sec": 0.0}
+    if cursor.after:
+        print(f"embedding backfill: resuming after {cursor.after}")
+
+    if workers > 0:
+        pool: Executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+    else:
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-backfill")
+    started = last_report = time.perf_counter()
+    inflight: collections.deque[tuple[Any, ...]] = collections.deque()
+    # Texts submitted for encoding but not yet written to the cache: later pages reuse the
+    # pending result instead of encoding the same string again.
+    pending: dict[str, tuple[Future, int]] = {}
+
+    def submit(rows: list[tuple[str, str, str | None]]) -> tuple[Any, ...]:
+        shas = [embedding_service.text_sha(t) for _, t, _ in rows]
+        cached = embedding_service.cached_embeddings(set(shas) - pending.keys())
+        # Only texts new to the cache reach the model, each once even if repeated in the page.
+        todo = {sha: t for sha, (_, t, _) in zip(shas, rows) if sha not in cached and sha not in pending}
+        borrowed = {sha: pending[sha] for sha in shas if sha in pending}
+        future = pool.submit(_encode, list(todo.values())) if todo else None
+        for i, sha in enumerate(todo):
+            pending[sha] = (future, i)
+        return rows, shas, cached, borrowed, list(todo), future
+
+    def write(rows, shas, cached, borrowed, new_shas, future: Future | None) -> None:
+        nonlocal last_report
+        fresh = dict(zip(new_shas, future.result())) if future else {}
+        embedding_service.cache_embeddings(fresh)
+        for sha in new_shas:
+            pending.pop(sha, None)
+        vectors = {**cached, **{sha: f.result()[i] for sha, (f, i) in borrowed.items()}, **fresh}
+        stats["embedded"] += embedding_service.insert_embeddings(
+            [(job_id, vectors[sha], content_hash) for (job_id, _, content_hash), sha in zip(rows, shas)]
+        )
+        stats["pages"] += 1
+        stats["rows"] += len(rows)
+        stats["encoded"] += len(fresh)
+        stats["cache_hits"] += sum(sha in cached for sha in shas)
+        cursor.advance(rows[-1][0])
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"embedding backfill: {stats['embedded']} rows in {stats['pages']} pages, "
+                  f"{stats['embedded'] / (now - started):,.0f} rows/s, "
+                  f"{stats['encoded']} encoded, at {cursor.after}")
+
+    after = cursor.after
+    with pool:
+        try:
+            # `after` strictly increases and is bounded by `upper`, so this loop terminates.
+            while True:
+                rows = embedding_service.fetch_missing_embeddings(after, upper, page_size)
+                if rows:
+                    inflight.append(submit(rows))
+                    after = rows[-1][0]
+                while inflight and (len(inflight) > 2 * max(workers, 1) or not rows):
+                    write(*inflight.popleft())
+                if len(rows) < page_size:
+                    break
+            while inflight:
+                write(*inflight.popleft())
+        finally:
+            for *_, future in inflight:
+                if future is not None:
+                    future.cancel()
+    cursor.finish()
+    elapsed = time.perf_counter() - started
+    # Share of rows served without a model call: cache hits plus repeats within a page.
+    stats["dedup_ratio"] = round(1 - stats["encoded"] / stats["rows"], 4) if stats["rows"] else 0.0
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_sec"] = round(stats["embedded"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.embed_workers,
+                        help="encoding processes (0: one thread in this process)")
+    parser.add_argument("--page-size", type=int, default=None, help="jobs per page (default: embed_page_size)")
+    parser.add_argument("--checkpoint", default=None, help="resume file, removed once the backfill completes")
+    args = parser.parse_args(argv)
+    stats = run_backfill(workers=args.workers, page_size=args.page_size, checkpoint=args.checkpoint)
+    print(f"embedding backfill: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+# Concurrent /search/ requests each need one query vector. Encoding them one at a time from
+# every threadpool worker leaves most of the model's batch throughput unused and has the
+# workers compete for the same cores. The batcher funnels them through one dispatcher thread
+# that encodes whatever arrived within `max_wait_ms` (or `max_batch` texts) as one batch.
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front for an `encode(texts) -> vectors` function.
+    `encode` has the same signature as the wrapped function, so it can stand in for it.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[list[str]], list[list[float]]],
+        max_batch: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self._encode = encode
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: queue.SimpleQueue[tuple[str, Future]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stats = {"requests": 0, "batches": 0, "max_batch_seen": 0}
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        futures = [self.submit(t) for t in texts]
+        return [f.result() for f in futures]
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list[tuple[str, Future]]:
+        """Block for the first request, then gather more until the batch is full or the wait is over."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [(t, f) for t, f in self._collect() if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            # Identical texts in one batch (the same query from several users) are encoded once.
+            unique = list(dict.fromkeys(t for t, _ in batch))
+            try:
+                vecs = dict(zip(unique, self._encode(unique)))
+            except BaseException as e:
+                for _, f in batch:
+                    f.set_exception(e)
+            else:
+                for t, f in batch:
+                    f.set_result(vecs[t])
+            with self._lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(unique))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+        stats["mean_batch"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats.update({"max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000})
+        return stats
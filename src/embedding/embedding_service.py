@@ -1,27 +1,57 @@
 from __future__ import annotations
-import re, html
-from sentence_transformers import SentenceTransformer
+import hashlib
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 from src.settings import settings
 from src.database import database_service
-from src.embedding.embedding_sql import _SQL_SELECT_MISSING_EMBEDDINGS, _SQL_UPSERT_EMBEDDINGS
+from src.embedding.embedding_sql import (
+    _SQL_SELECT_MISSING_EMBEDDINGS,
+    _SQL_UPSERT_EMBEDDINGS,
+    _SQL_MAX_JOB_ID,
+    _SQL_TRY_EMBED_LOCK,
+    _SQL_RELEASE_EMBED_LOCK,
+    _SQL_SELECT_CACHED_EMBEDDINGS,
+    _SQL_INSERT_CACHED_EMBEDDINGS,
+)
+from src.embedding.batcher import EmbeddingBatcher
+from src.embedding.query_cache import PostgresQueryStore, QueryEmbeddingCache
+from src.text.html_text import html_to_text
 from sqlalchemy import text
 
-_HTML_TAG_RE = re.compile(r"<[^>]+>")
-_WS_RE = re.compile(r"\s+")
-_model: SentenceTransformer | None = None
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from src.embedding.onnx_backend import OnnxEncoder
+
+_model: SentenceTransformer | OnnxEncoder | None = None
+_query_cache: QueryEmbeddingCache | None = None
+_query_batcher: EmbeddingBatcher | None = None
 
 
 def strip_html(text: str | None) -> str:
-    if not text:
-        return ""
-    text = _HTML_TAG_RE.sub(" ", text)
-    text = _WS_RE.sub(" ", text)
-    return html.unescape(text).strip()
+    """Flatten HTML to a single line of text."""
+    return html_to_text(text, preserve_blocks=False)
+
+def load_model(backend: str | None = None) -> SentenceTransformer | OnnxEncoder:
+    """The embedding model on `backend` (default: settings.model_backend); imported on demand."""
+    match backend or settings.model_backend:
+        case "torch":
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(settings.model_name)
+        case "onnx":
+            from src.embedding.onnx_backend import OnnxEncoder
+            return OnnxEncoder(
+                settings.model_name,
+                quantized=settings.model_onnx_quantize,
+                cache_dir=settings.model_onnx_dir,
+                threads=settings.model_onnx_threads,
+            )
+        case other:
+            raise ValueError(f"Unknown model backend: {other}")
 
-def get_model() -> SentenceTransformer:
+def get_model() -> SentenceTransformer | OnnxEncoder:
     global _model
     if _model is None:
-        _model = SentenceTransformer(settings.model_name)
+        _model = load_model()
     return _model
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
@@ -29,26 +59,98 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
     vecs = model.encode(texts, batch_size=settings.model_batch_size, normalize_embeddings=True)
     return [v.tolist() for v in vecs]
 
+def get_query_batcher() -> EmbeddingBatcher:
+    global _query_batcher
+    if _query_batcher is None:
+        _query_batcher = EmbeddingBatcher(
+            embed_texts,
+            max_batch=settings.query_batch_size,
+            max_wait_ms=settings.query_batch_max_wait_ms,
+        )
+    return _query_batcher
+
+def get_query_cache() -> QueryEmbeddingCache:
+    global _query_cache
+    if _query_cache is None:
+        store = PostgresQueryStore(settings.model_name, settings.query_cache_ttl) if settings.query_cache_shared else None
+        _query_cache = QueryEmbeddingCache(
+            get_query_batcher().encode if settings.query_batching else embed_texts,
+            settings.model_name,
+            maxsize=settings.query_cache_size,
+            ttl=settings.query_cache_ttl,
+            store=store,
+        )
+    return _query_cache
+
+def embed_query(q: str) -> list[float]:
+    """Embedding of a search query; repeated queries (e.g. further pages) are served from cache."""
+    return get_query_cache().get(q)
+
+
+def max_job_id() -> str | None:
+    with database_service.get_db_context() as db:
+        return db.execute(text(_SQL_MAX_JOB_ID)).scalar()
+
 
-def fetch_missing_embeddings() -> list[tuple[str, str]]:
+def fetch_missing_embeddings(after: str, upper: str, limit: int) -> list[tuple[str, str, str | None]]:
+    """
+    Up to `limit` jobs with ids in (after, upper] that have no embedding, or whose content
+    changed since they were embedded, in id order.
+    """
     with database_service.get_db_context() as db:
-        result = db.execute(text(_SQL_SELECT_MISSING_EMBEDDINGS))
+        result = db.execute(
+            text(_SQL_SELECT_MISSING_EMBEDDINGS), {"after": after, "upper": upper, "limit": limit}
+        )
         rows = result.mappings().all()
-        print('fetched missing embeddings:', len(rows))
-    return [(r["id"], r['text_to_embed']) for r in rows]
+    return [(r["id"], r['text_to_embed'], r['content_hash']) for r in rows]
+
+
+def text_sha(text_to_embed: str) -> str:
+    """Key of a text in the embedding cache (the model name is a separate key column)."""
+    return hashlib.sha256(text_to_embed.encode("utf-8")).hexdigest()
+
+
+def cached_embeddings(shas: Iterable[str]) -> dict[str, list[float]]:
+    """Vectors the current model already produced for these text hashes."""
+    shas = list(shas)
+    if not shas:
+        return {}
+    with database_service.get_db_context() as db:
+        rows = db.execute(
+            text(_SQL_SELECT_CACHED_EMBEDDINGS), {"model_name": settings.model_name, "shas": shas}
+        ).all()
+    return {sha: embedding for sha, embedding in rows}
+
+
+def cache_embeddings(vectors: dict[str, list[float]]) -> None:
+    """Remember freshly encoded vectors by text hash; existing entries are kept."""
+    if not vectors:
+        return
+    with database_service.get_db_context() as db:
+        try:
+            db.execute(
+                text(_SQL_INSERT_CACHED_EMBEDDINGS),
+                [{"model_name": settings.model_name, "text_sha": sha, "embedding": vec} for sha, vec in vectors.items()],
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
 
 
-def insert_embeddings(pairs: list[tuple[str, list[float]]]) -> int:
-    if not pairs:
+def insert_embeddings(rows: list[tuple[str, list[float], str | None]]) -> int:
+    """Upsert (job_id, embedding, content_hash) triples; the hash marks the embedding fresh."""
+    if not rows:
         return 0
 
     data_to_insert = [
             {
                 'job_id': job_id,
                 'model_name': settings.model_name,
-                'embedding': embedding
+                'embedding': embedding,
+                'content_hash': content_hash,
             }
-            for job_id, embedding in pairs
+            for job_id, embedding, content_hash in rows
         ]
 
     with database_service.get_db_context() as db:
@@ -60,12 +162,25 @@ def insert_embeddings(pairs: list[tuple[str, list[float]]]) -> int:
             db.rollback()
             raise e
     
-def embed_data():
-    total = 0
-    while True:
-        todo = fetch_missing_embeddings()
-        if not todo: break
-        ids, texts = zip(*todo)
-        vecs = embed_texts(list(texts))
-        total += insert_embeddings(list(zip(ids, vecs)))
-    print(f"embedded {total} rows")
\ No newline at end of file
+@contextmanager
+def embed_lock() -> Iterator[bool]:
+    """
+    Try to take the cluster-wide backfill lock; yields whether it was acquired. Held on a
+    dedicated autocommit connection, like board_service.scrape_lock.
+    """
+    with database_service.engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = bool(conn.execute(text(_SQL_TRY_EMBED_LOCK)).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text(_SQL_RELEASE_EMBED_LOCK))
+
+
+def embed_data(workers: int | None = None) -> dict[str, Any]:
+    """Embed every job missing a fresh embedding; see src/embedding/backfill.py."""
+    from src.embedding import backfill
+    stats = backfill.run_backfill(workers=settings.embed_workers if workers is None else workers)
+    print(f"embedded {stats['embedded']} rows, {stats['encoded']} encoded ({stats['dedup_ratio']:.1%} reused)")
+    return stats
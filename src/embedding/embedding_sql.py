@@ -1,6 +1,10 @@
+# One keyset page of jobs without a fresh embedding, in id order between :after and :upper.
+# It reads the jobs primary key from the cursor and stops after :limit matches, instead of
+# materializing the anti-join over the whole table.
 _SQL_SELECT_MISSING_EMBEDDINGS = """
 SELECT
 j.id,
+j.content_hash,
 j.title || ' at ' || j.company || ' in ' || COALESCE(locations_str, 'Remote') AS text_to_embed
 FROM
 jobs j
@@ -11,14 +15,68 @@ SELECT string_agg(value, ', ')
 FROM jsonb_array_elements_text(j.locations)
 ) AS locs(locations_str)
 WHERE
-e.job_id IS NULL
+j.id > :after
+AND j.id <= :upper
+AND j.duplicate_of IS NULL
+AND (e.job_id IS NULL OR e.content_hash IS DISTINCT FROM j.content_hash)
+ORDER BY j.id
+LIMIT :limit
+"""
+
+_SQL_MAX_JOB_ID = """
+SELECT max(id) FROM jobs
+"""
+
+# Session-level lock held for a whole backfill, so idle queue workers don't embed the same rows.
+_SQL_TRY_EMBED_LOCK = """
+SELECT pg_try_advisory_lock(hashtext('embed_backfill'))
+"""
+
+_SQL_RELEASE_EMBED_LOCK = """
+SELECT pg_advisory_unlock(hashtext('embed_backfill'))
 """
 
 _SQL_UPSERT_EMBEDDINGS = """
-INSERT INTO job_embeddings (job_id, model_name, embedding)
-VALUES (:job_id, :model_name, :embedding)
+INSERT INTO job_embeddings (job_id, model_name, embedding, content_hash)
+VALUES (:job_id, :model_name, :embedding, :content_hash)
 ON CONFLICT (job_id) DO UPDATE SET
   model_name = EXCLUDED.model_name,
   embedding  = EXCLUDED.embedding,
+  content_hash = EXCLUDED.content_hash,
   embedded_at= now();
-"""
\ No newline at end of file
+"""
+
+_SQL_SELECT_CACHED_EMBEDDINGS = """
+SELECT text_sha, embedding
+FROM embedding_cache
+WHERE model_name = :model_name
+  AND text_sha = ANY(:shas)
+"""
+
+_SQL_INSERT_CACHED_EMBEDDINGS = """
+INSERT INTO embedding_cache (model_name, text_sha, embedding)
+VALUES (:model_name, :text_sha, :embedding)
+ON CONFLICT (model_name, text_sha) DO NOTHING;
+"""
+
+
+_SQL_SELECT_QUERY_EMBEDDING = """
+SELECT embedding
+FROM query_embeddings
+WHERE model_name = :model_name
+  AND query_key = :query_key
+  AND created_at > now() - make_interval(secs => :ttl)
+"""
+
+_SQL_UPSERT_QUERY_EMBEDDING = """
+INSERT INTO query_embeddings (model_name, query_key, embedding)
+VALUES (:model_name, :query_key, :embedding)
+ON CONFLICT (model_name, query_key) DO UPDATE SET
+  embedding  = EXCLUDED.embedding,
+  created_at = now();
+"""
+
+_SQL_PRUNE_QUERY_EMBEDDINGS = """
+DELETE FROM query_embeddings
+WHERE created_at <= now() - make_interval(secs => :ttl)
+"""
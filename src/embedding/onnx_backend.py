@@ -0,0 +1,97 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any
+import numpy as np
+
+# The sentence-transformers model run directly on ONNX Runtime: the Hub repo's tokenizer.json
+# and exported ONNX graph, plus the repo's pooling config reimplemented in numpy. Neither
+# torch nor sentence-transformers is imported, which keeps API workers small and quick to
+# start on CPU-only nodes. Needs the `onnx` extra (onnxruntime).
+
+_ONNX_FILE = "onnx/model.onnx"
+_QUANTIZED_FILE = "model_qint8_dynamic.onnx"
+
+
+def _hub_file(repo_id: str, filename: str) -> Path:
+    from huggingface_hub import hf_hub_download
+    return Path(hf_hub_download(repo_id, filename))
+
+
+def quantize(model_path: Path, out_path: Path) -> Path:
+    """int8 dynamic quantization of the weights (activations stay float); done once and reused."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    if not out_path.exists():
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out_path.with_suffix(".tmp.onnx")
+        quantize_dynamic(model_path, tmp, weight_type=QuantType.QInt8)
+        tmp.replace(out_path)
+    return out_path
+
+
+class OnnxEncoder:
+    """
+    Drop-in for the `SentenceTransformer.encode` calls in embedding_service: same texts in,
+    same (optionally L2-normalized) float32 matrix out.
+    """
+
+    def __init__(self, model_name: str, quantized: bool = False, cache_dir: str | Path = "models/onnx",
+                 threads: int = 0) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("model_backend='onnx' needs onnxruntime: install the `onnx` extra") from e
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        st_config = json.loads(_hub_file(model_name, "sentence_bert_config.json").read_text())
+        pooling = json.loads(_hub_file(model_name, "1_Pooling/config.json").read_text())
+        self.pooling = self._pooling_mode(pooling)
+
+        self.tokenizer = Tokenizer.from_file(str(_hub_file(model_name, "tokenizer.json")))
+        self.tokenizer.enable_truncation(max_length=st_config.get("max_seq_length", 256))
+        self.tokenizer.enable_padding()
+
+        model_path = _hub_file(model_name, _ONNX_FILE)
+        if quantized:
+            model_path = quantize(model_path, Path(cache_dir) / model_name.replace("/", "__") / _QUANTIZED_FILE)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    def _pooling_mode(config: dict[str, Any]) -> str:
+        if config.get("pooling_mode_mean_tokens"):
+            return "mean"
+        if config.get("pooling_mode_cls_token"):
+            return "cls"
+        raise ValueError(f"Unsupported pooling config for the ONNX backend: {config}")
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feed = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feed.items() if k in self.input_names})[0]
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = feed["attention_mask"][..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, texts: list[str], batch_size: int = 32, normalize_embeddings: bool = False) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        # Sorting by length keeps padding per batch small, as SentenceTransformer.encode does.
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out = np.concatenate([
+            self._encode_batch([texts[i] for i in order[start:start + batch_size]])
+            for start in range(0, len(texts), batch_size)
+        ]).astype(np.float32)
+        out = out[np.argsort(order, kind="stable")]
+        if normalize_embeddings:
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out
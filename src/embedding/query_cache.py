@@ -0,0 +1,174 @@
+from __future__ import annotations
+import collections
+import hashlib
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+from typing import Any, Callable
+from sqlalchemy import text
+from src.database import database_service
+from src.embedding.embedding_sql import (
+    _SQL_SELECT_QUERY_EMBEDDING,
+    _SQL_UPSERT_QUERY_EMBEDDING,
+    _SQL_PRUNE_QUERY_EMBEDDINGS,
+)
+
+# Search embeds the query text on every request, including every page of the same results.
+# Query vectors are cached per process (LRU + TTL), optionally backed by a table shared by all
+# API workers, and concurrent misses for one query wait on a single model call.
+
+
+def normalize_query(q: str) -> str:
+    """NFKC text with surrounding whitespace stripped and inner runs collapsed to one space."""
+    return " ".join(unicodedata.normalize("NFKC", q).split())
+
+
+def query_key(model_name: str, q: str) -> str:
+    return hashlib.sha256(f"{model_name}\x1f{q}".encode("utf-8")).hexdigest()
+
+
+class PostgresQueryStore:
+    """Shared second level: vectors other workers computed, valid for `ttl` seconds."""
+
+    # Expired rows are deleted every this many writes rather than on each one.
+    PRUNE_EVERY = 500
+
+    def __init__(self, model_name: str, ttl: float) -> None:
+        self.model_name = model_name
+        self.ttl = ttl
+        self._writes = 0
+
+    def get(self, key: str) -> list[float] | None:
+        with database_service.get_db_context() as db:
+            vec = db.execute(
+                text(_SQL_SELECT_QUERY_EMBEDDING),
+                {"model_name": self.model_name, "query_key": key, "ttl": self.ttl},
+            ).scalar()
+        return None if vec is None else [float(v) for v in vec]
+
+    def put(self, key: str, vec: list[float]) -> None:
+        self._writes += 1
+        with database_service.get_db_context() as db:
+            try:
+                db.execute(
+                    text(_SQL_UPSERT_QUERY_EMBEDDING),
+                    {"model_name": self.model_name, "query_key": key, "embedding": vec},
+                )
+                if self._writes % self.PRUNE_EVERY == 0:
+                    db.execute(text(_SQL_PRUNE_QUERY_EMBEDDINGS), {"ttl": self.ttl})
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise e
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe map from normalized query text to its embedding for one model.
+    `encode` is only called on a miss in both levels; the store is best effort, so a database
+    hiccup degrades to computing the vector locally instead of failing the search.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[list[str]], list[list[float]]],
+        model_name: str,
+        maxsize: int = 1024,
+        ttl: float = 3600.0,
+        store: PostgresQueryStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.encode = encode
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.clock = clock
+        self._entries: collections.OrderedDict[str, tuple[float, list[float]]] = collections.OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "store_hits": 0,
+                       "store_errors": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, q: str) -> list[float]:
+        normalized = normalize_query(q)
+        key = query_key(self.model_name, normalized)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.clock() < entry[0]:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+            else:
+                self._stats["coalesced"] += 1
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            vec = self._load(key, normalized)
+            with self._lock:
+                self._entries[key] = (self.clock() + self.ttl, vec)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+            pending.set_result(vec)
+            return vec
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _load(self, key: str, normalized: str) -> list[float]:
+        if self.store is not None:
+            try:
+                vec = self.store.get(key)
+            except Exception as e:
+                vec = None
+                self._count("store_errors")
+                print(f"query cache store lookup failed: {e}")
+            if vec is not None:
+                self._count("store_hits")
+                return vec
+        self._count("misses")
+        vec = self.encode([normalized])[0]
+        if self.store is not None:
+            try:
+                self.store.put(key, vec)
+            except Exception as e:
+                self._count("store_errors")
+                print(f"query cache store write failed: {e}")
+        return vec
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["coalesced"] + stats["store_hits"] + stats["misses"]
+        stats.update({
+            "model_name": self.model_name,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "shared_store": self.store is not None,
+            "hit_ratio": round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0,
+        })
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
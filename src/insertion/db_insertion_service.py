@@ -1,55 +1,348 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Iterator
+import psycopg2
 from psycopg2.extras import Json
 from src.database import database_service
-from src.embedding.embedding_service import strip_html
-from datetime import datetime
+from src.insertion import near_duplicates
+from src.text.html_text import html_to_text
+from datetime import datetime, timezone
+import csv
 import hashlib
-from src.insertion.insertion_sql import _SQL_INSERT_INTO_DB
+import io
+import itertools
+import json
+from src.settings import settings
+from src.insertion.insertion_sql import (
+    _SQL_SET_LOCK_TIMEOUT,
+    _SQL_INSERT_INTO_DB,
+    _SQL_UPSERT_JOB_DETAILS,
+    _SQL_SELECT_EXISTING_HASHES,
+    _SQL_CREATE_STAGE,
+    _SQL_COPY_STAGE,
+    _SQL_MERGE_STAGE,
+    _SQL_DEACTIVATE_UNSEEN,
+)
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
 
-def _dedupe_key(company: str,
-                title: str,
-                loc: str | None,
-                url: str | None) -> str:
+_FINGERPRINT_FIELDS = (
+    "source", "source_id", "company", "title", "locations", "remote", "posted_at",
+    "url", "description_html", "description_text", "tags", "compensation",
+)
+
+def dedupe_key(company: str,
+               title: str,
+               loc: str | None,
+               url: str | None) -> str:
+    """Exact identity of a posting without a source id; near-identical copies are caught by SimHash."""
     base = f"{(company or '').strip().lower()}|{(title or '').strip().lower()}|{(loc or '').strip().lower()}|{(url or '').strip().lower()}"
     return hashlib.sha1(base.encode("utf-8")).hexdigest()
 
-def insert_jobs_into_db(rows: list[dict[str, Any]]) -> int:
-    values = []
+def content_fingerprint(row: dict[str, Any]) -> str:
+    """Stable hash over every stored field of a job row (bookkeeping columns excluded)."""
+    canonical = json.dumps(
+        {k: row.get(k) for k in _FINGERPRINT_FIELDS},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def _as_datetime(value: Any) -> datetime | None:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        # Naive and aware timestamps can't be compared; treat naive ones as UTC.
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return None
+
+def _supersedes(row: dict[str, Any], current: dict[str, Any]) -> bool:
+    """
+    Last write wins: the later `updated_at` replaces, then the later `posted_at` (scraped rows
+    only carry the latter), and when neither pair is comparable the later row does.
+    """
+    for field in ("updated_at", "posted_at"):
+        new, old = _as_datetime(row.get(field)), _as_datetime(current.get(field))
+        if new is not None and old is not None:
+            return new >= old
+    return True
+
+def prepare_job_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Normalize scraped rows into `jobs` column values plus their content fingerprint, one per id.
+    Rows sharing an id are collapsed (ON CONFLICT can't touch a row twice in one statement):
+    the one with the latest `updated_at` (else `posted_at`) wins, ties going to the later row.
+    """
+    latest: dict[str, dict[str, Any]] = {}
     for r in rows:
+        company = r.get("company") or ""
+        jid = r.get("id") or dedupe_key(company, r.get("title") or "", (r.get("locations") or [None])[0], r.get("url"))
+        current = latest.get(jid)
+        if current is None or _supersedes(r, current):
+            # Re-inserting keeps the winner at the position of its last occurrence.
+            latest.pop(jid, None)
+            latest[jid] = {**r, "id": jid}
+    values = []
+    for jid, r in latest.items():
         company = r.get("company") or ""
         title = r.get("title") or ""
-        loc = (r.get("locations") or [None])[0]
         url = r.get("url")
-        jid = r.get("id") or _dedupe_key(company, title, loc, url)
         desc_html = r.get("description_html") or ""
-        desc_text = r.get("description_text") or strip_html(desc_html)
+        desc_text = r.get("description_text") or html_to_text(desc_html)
 
-        values.append({
+        row = {
             'id': jid,
             'source': r.get("source"),
             'source_id': r.get("source_id"),
             'company': company,
             'title': title,
-            'locations': Json(r.get("locations") or []),
+            'locations': r.get("locations") or [],
             'remote': r.get("remote"),
             'posted_at': r.get("posted_at"),
             'url': url,
             'description_html': desc_html,
             'description_text': desc_text,
             'tags': r.get("tags") or [],
-            'compensation': Json(r.get("compensation")) if r.get("compensation") is not None else None,
-            'is_active': True,
-            'updated_at': datetime.now(),
-        })
+            'compensation': r.get("compensation"),
+        }
+        row['content_hash'] = content_fingerprint(row)
+        # Kept for reference only: not fingerprinted, so payload-only changes cause no rewrite.
+        row['source_payload'] = r.get("source_payload")
+        row.update(near_duplicates.fingerprint_columns(company, title, desc_text))
+        values.append(row)
+    return values
+
+def insert_jobs_into_db(
+    rows: list[dict[str, Any]],
+    failed: list[dict[str, Any]] | None = None,
+) -> dict[str, int]:
+    """
+    Upsert scraped rows and return {"inserted", "updated", "unchanged", "duplicates", "failed"} counts.
+    Rows whose content fingerprint matches the stored one are not written at all.
+    Rows are written in chunks of `settings.db_upsert_chunk_size`, one transaction each; chunks
+    of at least `settings.db_copy_threshold` rows go through the COPY path.
+    Written rows are linked to a canonical job when they near-duplicate one.
+    A chunk that fails is reported in the counts (and its rows appended to `failed`) instead of
+    aborting the batch; see `_upsert_isolated`.
+    """
+    return _upsert_chunks(rows, _upsert_chunk, failed)
+
+def bulk_insert_jobs(
+    rows: list[dict[str, Any]],
+    failed: list[dict[str, Any]] | None = None,
+) -> dict[str, int]:
+    """Like `insert_jobs_into_db`, but every chunk is COPYed into a temp staging table and merged with one statement."""
+    return _upsert_chunks(rows, _copy_upsert, failed)
+
+def bulk_insert_prepared(
+    values: list[dict[str, Any]],
+    failed: list[dict[str, Any]] | None = None,
+) -> dict[str, int]:
+    """COPY path for rows that already went through `prepare_job_rows`, e.g. in worker processes."""
+    return _write_chunks(values, _copy_upsert, failed)
+
+def _upsert_chunk(values: list[dict[str, Any]]) -> dict[str, int]:
+    if len(values) >= settings.db_copy_threshold:
+        return _copy_upsert(values)
+    return _executemany_upsert(values)
+
+def _upsert_chunks(
+    rows: list[dict[str, Any]],
+    upsert: Callable[[list[dict[str, Any]]], dict[str, int]],
+    failed: list[dict[str, Any]] | None,
+) -> dict[str, int]:
+    values = prepare_job_rows(rows)
+    counts = _write_chunks(values, upsert, failed)
+    counts["duplicates"] = len(rows) - len(values)
+    return counts
+
+def _write_chunks(
+    values: list[dict[str, Any]],
+    upsert: Callable[[list[dict[str, Any]]], dict[str, int]],
+    failed: list[dict[str, Any]] | None,
+) -> dict[str, int]:
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0, "failed": 0}
+    for chunk in itertools.batched(values, settings.db_upsert_chunk_size):
+        _upsert_isolated(list(chunk), upsert, counts, failed)
+    return counts
+
+def _upsert_isolated(
+    values: list[dict[str, Any]],
+    upsert: Callable[[list[dict[str, Any]]], dict[str, int]],
+    counts: dict[str, int],
+    failed: list[dict[str, Any]] | None,
+) -> None:
+    """
+    Write one chunk. When the database rejects it because of its data, the chunk is halved and
+    retried until the offending rows are alone; lock timeouts and connection errors fail the
+    whole chunk at once, since retrying the halves would only wait again.
+    """
+    try:
+        chunk_counts = upsert(values)
+    except (DBAPIError, psycopg2.Error) as e:
+        if len(values) > 1 and not isinstance(e, (OperationalError, psycopg2.OperationalError)):
+            mid = len(values) // 2
+            _upsert_isolated(values[:mid], upsert, counts, failed)
+            _upsert_isolated(values[mid:], upsert, counts, failed)
+            return
+        print(f"upsert of {len(values)} row(s) failed, first id {values[0]['id']!r}: {str(e).splitlines()[0]}")
+        counts["failed"] += len(values)
+        if failed is not None:
+            failed.extend(values)
+        return
+    for key in ("inserted", "updated", "unchanged"):
+        counts[key] += chunk_counts[key]
+
+def _set_lock_timeout(db) -> None:
+    db.execute(text(_SQL_SET_LOCK_TIMEOUT), {"lock_timeout": f"{settings.db_upsert_lock_timeout_ms}ms"})
+
+def _executemany_upsert(values: list[dict[str, Any]]) -> dict[str, int]:
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not values:
+        return counts
+    with database_service.get_db_context() as db:
+        try:
+            _set_lock_timeout(db)
+            existing = {
+                r["id"]: r
+                for r in db.execute(
+                    text(_SQL_SELECT_EXISTING_HASHES), {"ids": [v["id"] for v in values]}
+                ).mappings()
+            }
+            to_write = []
+            for v in values:
+                current = existing.get(v["id"])
+                if current is None:
+                    counts["inserted"] += 1
+                elif current["content_hash"] != v["content_hash"] or not current["is_active"]:
+                    counts["updated"] += 1
+                else:
+                    counts["unchanged"] += 1
+                    continue
+                to_write.append({
+                    **v,
+                    'locations': Json(v['locations']),
+                    'compensation': Json(v['compensation']) if v['compensation'] is not None else None,
+                    'source_payload': Json(v['source_payload']) if v['source_payload'] is not None else None,
+                    'is_active': True,
+                    'updated_at': datetime.now(),
+                })
+            if to_write:
+                # Bulk insert using executemany
+                db.execute(text(_SQL_INSERT_INTO_DB), to_write)
+                db.execute(text(_SQL_UPSERT_JOB_DETAILS), to_write)
+                near_duplicates.link_near_duplicates(db, [v["id"] for v in to_write])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+    return counts
+
+def _copy_upsert(values: list[dict[str, Any]]) -> dict[str, int]:
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
     if not values:
+        return counts
+    with database_service.get_db_context() as db:
+        try:
+            _set_lock_timeout(db)
+            db.execute(text(_SQL_CREATE_STAGE))
+            dbapi_conn = db.connection().connection
+            with dbapi_conn.cursor() as cur:
+                cur.copy_expert(_SQL_COPY_STAGE, _CopyStream(_csv_lines(values)))
+            result = db.execute(text(_SQL_MERGE_STAGE)).mappings().one()
+            near_duplicates.link_near_duplicates(db, result["written_ids"])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+    counts["inserted"] = result["inserted"]
+    counts["updated"] = result["updated"]
+    counts["unchanged"] = result["staged"] - result["inserted"] - result["updated"]
+    return counts
+
+def _pg_text_array(items: list[str | None]) -> str:
+    """Render a Postgres text[] literal, quoting every element."""
+    def quote(item: str | None) -> str:
+        if item is None:
+            return "NULL"
+        return '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return "{" + ",".join(quote(i) for i in items) + "}"
+
+def _pg_int_array(items: list[int] | None) -> str | None:
+    return None if items is None else "{" + ",".join(str(i) for i in items) + "}"
+
+def _csv_lines(values: list[dict[str, Any]]) -> Iterator[str]:
+    """Yield one CSV line per row in `_SQL_COPY_STAGE` column order; None becomes an unquoted NULL."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_NOTNULL, lineterminator="\n")
+    for v in values:
+        writer.writerow([
+            v["id"],
+            v["source"],
+            v["source_id"],
+            v["company"],
+            v["title"],
+            json.dumps(v["locations"]),
+            v["remote"],
+            v["posted_at"],
+            v["url"],
+            v["description_html"],
+            v["description_text"],
+            _pg_text_array(v["tags"]),
+            json.dumps(v["compensation"]) if v["compensation"] is not None else None,
+            json.dumps(v["source_payload"]) if v["source_payload"] is not None else None,
+            v["content_hash"],
+            v["company_key"],
+            v["simhash"],
+            _pg_int_array(v["simhash_bands"]),
+        ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+class _CopyStream:
+    """Minimal file-like reader so COPY FROM STDIN pulls rows lazily instead of from one big string."""
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self._lines = lines
+        self._buf = ""
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buf]
+        have = len(self._buf)
+        while size < 0 or have < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            have += len(line)
+        data = "".join(parts)
+        if size < 0 or len(data) <= size:
+            self._buf = ""
+            return data
+        self._buf = data[size:]
+        return data[:size]
+
+def deactivate_unseen_jobs(source: str, company: str, seen_source_ids: list[str]) -> int:
+    """
+    Mark the board's active postings that were missing from its latest payload inactive.
+    An empty payload is treated as a glitch and never sweeps the whole board.
+    """
+    if not seen_source_ids:
         return 0
     with database_service.get_db_context() as db:
         try:
-            # Bulk insert using executemany
-            db.execute(text(_SQL_INSERT_INTO_DB), values)
+            deactivated = db.execute(
+                text(_SQL_DEACTIVATE_UNSEEN),
+                {"source": source, "company": company, "seen_source_ids": list(seen_source_ids)},
+            ).scalars().all()
+            near_duplicates.release_duplicates(db, deactivated)
             db.commit()
+            return len(deactivated)
         except Exception as e:
             db.rollback()
-            raise e
\ No newline at end of file
+            raise e
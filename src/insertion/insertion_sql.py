@@ -1,11 +1,18 @@
-_SQL_INSERT_INTO_DB = """
-INSERT INTO jobs (
-  id, source, source_id, company, title, locations, remote, posted_at, url,
-  description_html, description_text, tags, compensation, is_active, updated_at
-) VALUES (
-  :id, :source, :source_id, :company, :title, :locations, :remote, :posted_at, :url,
-  :description_html, :description_text, :tags, :compensation, :is_active, :updated_at
-)
+# Transaction-scoped, so the pooled connection goes back with the server default.
+_SQL_SET_LOCK_TIMEOUT = """
+SELECT set_config('lock_timeout', :lock_timeout, true)
+"""
+
+_SQL_SELECT_EXISTING_HASHES = """
+SELECT id, content_hash, is_active
+FROM jobs
+WHERE id = ANY(:ids)
+"""
+
+# Shared by the row-by-row and the COPY merge path: only rows whose fingerprint moved,
+# or that were deactivated and came back, are rewritten. The fingerprint covers the detail
+# columns too, so job_details is only written for these rows.
+_SQL_ON_CONFLICT_UPDATE = """
 ON CONFLICT (id) DO UPDATE SET
   source = EXCLUDED.source,
   source_id = EXCLUDED.source_id,
@@ -15,10 +22,197 @@ ON CONFLICT (id) DO UPDATE SET
   remote = EXCLUDED.remote,
   posted_at = EXCLUDED.posted_at,
   url = EXCLUDED.url,
+  tags = EXCLUDED.tags,
+  content_hash = EXCLUDED.content_hash,
+  company_key = EXCLUDED.company_key,
+  simhash = EXCLUDED.simhash,
+  simhash_bands = EXCLUDED.simhash_bands,
+  is_active = TRUE,
+  updated_at = now()
+WHERE jobs.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+   OR NOT jobs.is_active
+"""
+
+_SQL_INSERT_INTO_DB = """
+INSERT INTO jobs (
+  id, source, source_id, company, title, locations, remote, posted_at, url,
+  tags, content_hash, company_key, simhash, simhash_bands, is_active, updated_at
+) VALUES (
+  :id, :source, :source_id, :company, :title, :locations, :remote, :posted_at, :url,
+  :tags, :content_hash, :company_key, :simhash, :simhash_bands, :is_active, :updated_at
+)
+""" + _SQL_ON_CONFLICT_UPDATE
+
+_SQL_ON_CONFLICT_UPDATE_DETAILS = """
+ON CONFLICT (job_id) DO UPDATE SET
   description_html = EXCLUDED.description_html,
   description_text = EXCLUDED.description_text,
-  tags = EXCLUDED.tags,
   compensation = EXCLUDED.compensation,
-  is_active = TRUE,
+  source_payload = EXCLUDED.source_payload,
   updated_at = now()
-"""
\ No newline at end of file
+"""
+
+_SQL_UPSERT_JOB_DETAILS = """
+INSERT INTO job_details (job_id, description_html, description_text, compensation, source_payload)
+VALUES (:id, :description_html, :description_text, :compensation, :source_payload)
+""" + _SQL_ON_CONFLICT_UPDATE_DETAILS
+
+# Temp table lives for one transaction; no WAL, no indexes, dropped on commit.
+_SQL_CREATE_STAGE = """
+CREATE TEMP TABLE IF NOT EXISTS jobs_stage (
+  id               TEXT,
+  source           TEXT,
+  source_id        TEXT,
+  company          TEXT,
+  title            TEXT,
+  locations        JSONB,
+  remote           BOOLEAN,
+  posted_at        TIMESTAMPTZ,
+  url              TEXT,
+  description_html TEXT,
+  description_text TEXT,
+  tags             TEXT[],
+  compensation     JSONB,
+  source_payload   JSONB,
+  content_hash     TEXT,
+  company_key      TEXT,
+  simhash          BIGINT,
+  simhash_bands    INTEGER[]
+) ON COMMIT DROP
+"""
+
+_SQL_COPY_STAGE = """
+COPY jobs_stage (
+  id, source, source_id, company, title, locations, remote, posted_at, url,
+  description_html, description_text, tags, compensation, source_payload, content_hash,
+  company_key, simhash, simhash_bands
+) FROM STDIN WITH (FORMAT csv)
+"""
+
+# One statement upserts the hot rows and the detail rows of exactly those that were written.
+_SQL_MERGE_STAGE = """
+WITH upserted AS (
+  INSERT INTO jobs (
+    id, source, source_id, company, title, locations, remote, posted_at, url,
+    tags, content_hash, company_key, simhash, simhash_bands, is_active, updated_at
+  )
+  SELECT
+    id, source, source_id, company, title, locations, remote, posted_at, url,
+    tags, content_hash, company_key, simhash, simhash_bands, TRUE, now()
+  FROM jobs_stage
+""" + _SQL_ON_CONFLICT_UPDATE + """
+  RETURNING id, (xmax = 0) AS inserted
+),
+details AS (
+  INSERT INTO job_details (job_id, description_html, description_text, compensation, source_payload)
+  SELECT s.id, s.description_html, s.description_text, s.compensation, s.source_payload
+  FROM jobs_stage s
+  JOIN upserted u ON u.id = s.id
+""" + _SQL_ON_CONFLICT_UPDATE_DETAILS + """
+)
+SELECT
+  count(*) FILTER (WHERE inserted) AS inserted,
+  count(*) FILTER (WHERE NOT inserted) AS updated,
+  (SELECT count(*) FROM jobs_stage) AS staged,
+  coalesce(array_agg(id), '{}') AS written_ids
+FROM upserted
+"""
+
+# Postings of one board that were not in its latest payload; served by jobs_active_source_company_idx.
+_SQL_DEACTIVATE_UNSEEN = """
+UPDATE jobs
+SET is_active = FALSE,
+    updated_at = now()
+WHERE source = :source
+  AND company = :company
+  AND is_active
+  AND source_id <> ALL(:seen_source_ids)
+RETURNING id
+"""
+
+# Near-duplicate linking for freshly written rows. Candidates are active canonical rows sharing
+# a SimHash band key (keys are scoped to company_key and title, one GIN probe per row); any pair
+# within :max_distance bits is a duplicate and the row stored first stays canonical. Probed rows
+# without a match lose a stale duplicate_of. Returns the ids whose duplicate_of changed.
+_SQL_LINK_NEAR_DUPLICATES = """
+WITH probe AS (
+  SELECT id, company_key, simhash, simhash_bands, inserted_at
+  FROM jobs
+  WHERE id = ANY(:ids) AND is_active
+),
+pairs AS (
+  SELECT
+    p.id AS probe_id,
+    c.id AS candidate_id,
+    (c.inserted_at, c.id) < (p.inserted_at, p.id) AS candidate_older,
+    bit_count((c.simhash # p.simhash)::bit(64)) AS distance
+  FROM probe p
+  JOIN jobs c
+    ON c.simhash_bands && p.simhash_bands
+   AND c.is_active
+   AND c.duplicate_of IS NULL
+   AND c.id <> p.id
+   AND c.company_key = p.company_key
+),
+best AS (
+  SELECT DISTINCT ON (newer) newer, canonical
+  FROM (
+    SELECT
+      CASE WHEN candidate_older THEN probe_id ELSE candidate_id END AS newer,
+      CASE WHEN candidate_older THEN candidate_id ELSE probe_id END AS canonical,
+      distance
+    FROM pairs
+    WHERE distance <= :max_distance
+  ) ranked
+  ORDER BY newer, distance, canonical
+),
+decisions AS (
+  SELECT newer AS id, canonical FROM best
+  UNION ALL
+  SELECT p.id, NULL::text FROM probe p
+  WHERE NOT EXISTS (SELECT 1 FROM best b WHERE b.newer = p.id)
+)
+UPDATE jobs
+SET duplicate_of = d.canonical
+FROM decisions d
+WHERE jobs.id = d.id
+  AND jobs.duplicate_of IS DISTINCT FROM d.canonical
+RETURNING jobs.id
+"""
+
+# Point rows at the canonical of their canonical when linking created a chain.
+_SQL_FLATTEN_DUPLICATES = """
+UPDATE jobs d
+SET duplicate_of = c.duplicate_of
+FROM jobs c
+WHERE d.duplicate_of = c.id
+  AND c.duplicate_of IS NOT NULL
+  AND (d.id = ANY(:ids) OR c.id = ANY(:ids))
+RETURNING d.id
+"""
+
+# Duplicates of rows that went inactive become canonical candidates again.
+_SQL_RELEASE_DUPLICATES = """
+UPDATE jobs
+SET duplicate_of = NULL
+WHERE duplicate_of = ANY(:ids)
+RETURNING id
+"""
+
+# Keyset walk for fingerprinting rows stored before SimHash, or before company_key, existed.
+_SQL_SELECT_UNFINGERPRINTED = """
+SELECT j.id, j.company, j.title, d.description_text
+FROM jobs j
+LEFT JOIN job_details d ON d.job_id = j.id
+WHERE (j.simhash IS NULL OR j.company_key IS NULL) AND j.id > :after
+ORDER BY j.id
+LIMIT :limit
+"""
+
+_SQL_SET_FINGERPRINT = """
+UPDATE jobs
+SET company_key = :company_key,
+    simhash = :simhash,
+    simhash_bands = :simhash_bands
+WHERE id = :id
+"""
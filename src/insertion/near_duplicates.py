@@ -0,0 +1,105 @@
+from __future__ import annotations
+import argparse
+import time
+from typing import Any, Iterable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.database import database_service
+from src.settings import settings
+from src.text import simhash
+from src.insertion.insertion_sql import (
+    _SQL_LINK_NEAR_DUPLICATES,
+    _SQL_FLATTEN_DUPLICATES,
+    _SQL_RELEASE_DUPLICATES,
+    _SQL_SELECT_UNFINGERPRINTED,
+    _SQL_SET_FINGERPRINT,
+)
+
+# Cross-posted roles (same company and title, near-identical description, different URL or
+# location string) are kept as rows but pointed at one canonical job through `duplicate_of`.
+# Search, statistics and embedding only look at canonical rows.
+
+
+def fingerprint_columns(company: str | None, title: str | None, description_text: str | None) -> dict[str, Any]:
+    """
+    `simhash` of the description, its band keys and the `company_key` they are scoped to.
+    Keys are scoped to the folded company name (so a board slug and the company's display
+    name agree) and the normalized title: one description template reused for different
+    roles is not a duplicate.
+    """
+    fp = simhash.simhash(description_text)
+    company_key = simhash.company_key(company)
+    scope = f"{company_key}\x1f{simhash.normalize(title)}"
+    return {"company_key": company_key, "simhash": fp, "simhash_bands": simhash.band_keys(fp, scope)}
+
+
+def link_near_duplicates(db: Session, ids: Iterable[str]) -> int:
+    """
+    Re-evaluate `duplicate_of` for the given (just written) jobs inside the caller's transaction.
+    Returns the number of rows whose link changed.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    changed = db.execute(
+        text(_SQL_LINK_NEAR_DUPLICATES),
+        {"ids": ids, "max_distance": settings.dedupe_max_distance},
+    ).scalars().all()
+    total = len(changed)
+    # Canonicals are always strictly older than their duplicates, so chains are finite.
+    while changed:
+        changed = db.execute(text(_SQL_FLATTEN_DUPLICATES), {"ids": list(changed)}).scalars().all()
+    return total
+
+
+def release_duplicates(db: Session, canonical_ids: Iterable[str]) -> int:
+    """Detach duplicates of deactivated jobs and link them again among the remaining rows."""
+    canonical_ids = list(canonical_ids)
+    if not canonical_ids:
+        return 0
+    released = db.execute(text(_SQL_RELEASE_DUPLICATES), {"ids": canonical_ids}).scalars().all()
+    link_near_duplicates(db, released)
+    return len(released)
+
+
+def backfill_fingerprints(batch_size: int = 1000) -> dict[str, int]:
+    """Fingerprint and link jobs stored before SimHash existed, one keyset batch per transaction."""
+    stats = {"scanned": 0, "fingerprinted": 0, "linked": 0}
+    after = ""
+    while True:
+        with database_service.get_db_context() as db:
+            try:
+                rows = db.execute(
+                    text(_SQL_SELECT_UNFINGERPRINTED), {"after": after, "limit": batch_size}
+                ).mappings().all()
+                if not rows:
+                    break
+                updates = [
+                    {"id": r["id"], **fingerprint_columns(r["company"], r["title"], r["description_text"])}
+                    for r in rows
+                ]
+                updates = [u for u in updates if u["simhash"] is not None]
+                if updates:
+                    db.execute(text(_SQL_SET_FINGERPRINT), updates)
+                    stats["linked"] += link_near_duplicates(db, [u["id"] for u in updates])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise e
+        stats["scanned"] += len(rows)
+        stats["fingerprinted"] += len(updates)
+        after = rows[-1]["id"]
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fingerprint and link existing jobs for near-duplicate detection.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    stats = backfill_fingerprints(args.batch_size)
+    print(f"near-duplicate backfill: {stats} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import re
+from typing import Iterable, Mapping, Sequence
+from src.settings import AI_KEYWORD_PREFIXES, AI_KEYWORDS
+
+
+class AIRoleClassifier:
+    """
+    Keyword matcher for AI/ML postings.
+    Titles are checked first with the combined regex. Descriptions are lowercased once and
+    scanned with a single alternation of the keywords' literal prefixes (`prefixes`); the
+    combined regex of those keywords is only run, anchored, where a prefix occurs. Keywords
+    without prefixes are searched in full.
+    """
+
+    def __init__(self, keywords: Sequence[str], prefixes: Mapping[str, Sequence[str]] | None = None) -> None:
+        prefixes = prefixes or {}
+        self.combined = re.compile("|".join(keywords), flags=re.I)
+        filtered = [kw for kw in keywords if prefixes.get(kw)]
+        self._unfiltered = [re.compile(kw, flags=re.I) for kw in keywords if not prefixes.get(kw)]
+        self._confirm = re.compile("|".join(filtered), flags=re.I) if filtered else None
+        literals = sorted({lit.lower() for kw in filtered for lit in prefixes[kw]}, key=len, reverse=True)
+        self._scan = re.compile("|".join(map(re.escape, literals))) if literals else None
+
+    def _description_matches(self, description: str) -> bool:
+        if not description:
+            return False
+        low = description.lower()
+        if self._scan is not None:
+            # Resume one character past each rejected hit, so a literal starting inside
+            # another one's match is still found.
+            m = self._scan.search(low)
+            while m is not None:
+                if self._confirm.match(low, m.start()):
+                    return True
+                m = self._scan.search(low, m.start() + 1)
+        return any(kw.search(low) for kw in self._unfiltered)
+
+    def matches(self, title: str, description: str) -> bool:
+        if title and self.combined.search(title):
+            return True
+        return self._description_matches(description)
+
+    def classify(self, postings: Iterable[tuple[str, str]]) -> list[bool]:
+        """Classify (title, description) pairs; titles are matched in one pass over the batch."""
+        postings = list(postings)
+        titles = [title or "" for title, _ in postings]
+        title_hits = [False] * len(postings)
+        # NUL never occurs in titles and is neither whitespace nor a word char, so keywords
+        # can't match across two titles.
+        joined = "\x00".join(titles)
+        starts, offset = [], 0
+        for t in titles:
+            starts.append(offset)
+            offset += len(t) + 1
+        idx = 0
+        for m in self.combined.finditer(joined):
+            while idx + 1 < len(starts) and starts[idx + 1] <= m.start():
+                idx += 1
+            title_hits[idx] = True
+        return [
+            hit or self._description_matches(desc or "")
+            for hit, (_, desc) in zip(title_hits, postings)
+        ]
+
+
+_classifier: AIRoleClassifier | None = None
+
+
+def get_classifier() -> AIRoleClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = AIRoleClassifier(AI_KEYWORDS, AI_KEYWORD_PREFIXES)
+    return _classifier
+
+
+def is_ai_role(title: str, description: str) -> bool:
+    return get_classifier().matches(title, description)
+
+
+def classify_ai_roles(postings: Iterable[tuple[str, str]]) -> list[bool]:
+    return get_classifier().classify(postings)
@@ -0,0 +1,210 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
+from sqlalchemy import text
+from src.database import database_service
+from src.insertion import near_duplicates
+from src.settings import settings
+from src.scrapers.scraper_sql import (
+    _SQL_SELECT_BOARD_STATES,
+    _SQL_UPSERT_BOARD_STATE,
+    _SQL_RECORD_BOARD_FAILURE,
+    _SQL_TRY_SCRAPE_LOCK,
+    _SQL_TRY_BOARD_LOCK,
+    _SQL_RELEASE_BOARD_LOCK,
+    _SQL_RELEASE_SCRAPE_LOCK,
+    _SQL_SELECT_LAST_SCRAPE,
+    _SQL_COUNT_BOARDS,
+    _SQL_SEED_BOARD,
+    _SQL_SELECT_DUE_BOARDS,
+    _SQL_SELECT_REGISTRY,
+    _SQL_UPSERT_REGISTRY_BOARD,
+    _SQL_UPDATE_REGISTRY_BOARD,
+    _SQL_DISABLE_BOARD,
+    _SQL_DEACTIVATE_BOARD_JOBS,
+)
+
+
+def _interval_params() -> dict[str, int]:
+    return {
+        "default_interval": settings.scrape_interval,
+        "min_interval": settings.scrape_min_interval,
+        "max_interval": settings.scrape_max_interval,
+    }
+
+
+def load_board_states() -> dict[tuple[str, str], dict[str, Any]]:
+    """Stored fetch state per (source, board)."""
+    with database_service.get_db_context() as db:
+        rows = db.execute(text(_SQL_SELECT_BOARD_STATES)).mappings().all()
+    return {(r["source"], r["board"]): dict(r) for r in rows}
+
+
+def save_board_states(states: list[dict[str, Any]]) -> None:
+    """
+    Persist validators after a board has been ingested; this also closes its circuit breaker
+    and adapts its scrape interval to whether the body changed.
+    Each dict holds source, board, etag, last_modified, body_hash and changed.
+    """
+    if not states:
+        return
+    with database_service.get_db_context() as db:
+        try:
+            db.execute(text(_SQL_UPSERT_BOARD_STATE), [{**_interval_params(), **state} for state in states])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+
+def record_board_failure(source: str, board: str, error: str) -> dict[str, Any]:
+    """Count a failed fetch; returns the board's consecutive_failures and circuit_open_until."""
+    with database_service.get_db_context() as db:
+        try:
+            row = db.execute(
+                text(_SQL_RECORD_BOARD_FAILURE),
+                {
+                    "source": source,
+                    "board": board,
+                    "error": error[:1000],
+                    "threshold": settings.scrape_breaker_threshold,
+                    "cooldown": settings.scrape_breaker_cooldown,
+                    "max_cooldown": settings.scrape_breaker_max_cooldown,
+                },
+            ).mappings().one()
+            db.commit()
+            return dict(row)
+        except Exception as e:
+            db.rollback()
+            raise e
+
+
+def circuit_open(state: dict[str, Any] | None, now: datetime | None = None) -> bool:
+    """True while a board's breaker is open; once it expires the next fetch is the probe."""
+    open_until = (state or {}).get("circuit_open_until")
+    return open_until is not None and open_until > (now or datetime.now(timezone.utc))
+
+
+@contextmanager
+def scrape_lock() -> Iterator[bool]:
+    """
+    Try to take the cluster-wide scrape lock; yields whether it was acquired.
+    The lock lives on a dedicated autocommit connection, so it is released when the block
+    exits or, if this process dies, when Postgres drops the connection.
+    """
+    with database_service.engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = bool(conn.execute(text(_SQL_TRY_SCRAPE_LOCK)).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text(_SQL_RELEASE_SCRAPE_LOCK))
+
+
+@contextmanager
+def board_locks(boards: Iterable[tuple[str, str]]) -> Iterator[set[tuple[str, str]]]:
+    """
+    Try to lock each (source, board); yields the ones acquired. Like `scrape_lock`, the locks
+    live on a dedicated autocommit connection and are released when the block exits.
+    """
+    with database_service.engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        held: set[tuple[str, str]] = set()
+        try:
+            for source, board in boards:
+                if conn.execute(text(_SQL_TRY_BOARD_LOCK), {"source": source, "board": board}).scalar():
+                    held.add((source, board))
+            yield held
+        finally:
+            for source, board in held:
+                conn.execute(text(_SQL_RELEASE_BOARD_LOCK), {"source": source, "board": board})
+
+
+def last_scraped_at() -> datetime | None:
+    """When any process last finished fetching a board."""
+    with database_service.get_db_context() as db:
+        return db.execute(text(_SQL_SELECT_LAST_SCRAPE)).scalar()
+
+
+# ---------------------- Board registry ----------------------
+
+def _execute(sql: str, params: dict[str, Any] | list[dict[str, Any]]) -> list[Any]:
+    with database_service.get_db_context() as db:
+        try:
+            result = db.execute(text(sql), params)
+            rows = result.all() if result.returns_rows else []
+            db.commit()
+            return rows
+        except Exception as e:
+            db.rollback()
+            raise e
+
+
+def ensure_registry(boards: Iterable[tuple[str, str]]) -> None:
+    """Seed an empty registry with `boards`; once it has rows, the database is authoritative."""
+    with database_service.get_db_context() as db:
+        if db.execute(text(_SQL_COUNT_BOARDS)).scalar():
+            return
+    params = [{"source": source, "board": board, **_interval_params()} for source, board in boards]
+    if params:
+        _execute(_SQL_SEED_BOARD, params)
+
+
+def due_boards(all_boards: bool = False) -> list[tuple[str, str]]:
+    """Enabled boards whose interval has elapsed, or every enabled board with `all_boards`."""
+    with database_service.get_db_context() as db:
+        rows = db.execute(text(_SQL_SELECT_DUE_BOARDS), {"all": all_boards, **_interval_params()}).all()
+    return [(r.source, r.board) for r in rows]
+
+
+def list_boards(source: str | None = None, board: str | None = None) -> list[dict[str, Any]]:
+    with database_service.get_db_context() as db:
+        rows = db.execute(
+            text(_SQL_SELECT_REGISTRY), {"source": source, "board": board, **_interval_params()}
+        ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def add_board(
+    source: str,
+    board: str,
+    min_interval: int | None = None,
+    max_interval: int | None = None,
+) -> dict[str, Any]:
+    """Register (or re-enable) a board; it is due on the next scheduled run."""
+    _execute(_SQL_UPSERT_REGISTRY_BOARD, {
+        **_interval_params(),
+        "source": source, "board": board, "min_interval": min_interval, "max_interval": max_interval,
+    })
+    return list_boards(source, board)[0]
+
+
+def update_board(source: str, board: str, **fields: Any) -> dict[str, Any] | None:
+    """Change enabled, scrape_interval, min_interval or max_interval; None values are left alone."""
+    params = {"enabled": None, "scrape_interval": None, "min_interval": None, "max_interval": None}
+    params.update({k: v for k, v in fields.items() if k in params})
+    if not _execute(_SQL_UPDATE_REGISTRY_BOARD, {"source": source, "board": board, **params}):
+        return None
+    return list_boards(source, board)[0]
+
+
+def remove_board(source: str, board: str) -> bool:
+    """
+    Disable a board and retire its postings. The row (and its fetch state) is kept, so
+    re-adding the board resumes incrementally.
+    """
+    with database_service.get_db_context() as db:
+        try:
+            found = db.execute(text(_SQL_DISABLE_BOARD), {"source": source, "board": board}).all()
+            if found:
+                retired = db.execute(
+                    text(_SQL_DEACTIVATE_BOARD_JOBS), {"source": source, "board": board}
+                ).scalars().all()
+                near_duplicates.release_duplicates(db, retired)
+            db.commit()
+            return bool(found)
+        except Exception as e:
+            db.rollback()
+            raise e
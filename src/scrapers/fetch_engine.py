@@ -0,0 +1,280 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import IO, Any, Awaitable, Callable, TypeVar
+from urllib.parse import urlsplit
+import httpx
+from src.scrapers import http_fixtures
+from src.settings import settings
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+T = TypeVar("T")
+
+
+@dataclass
+class BoardResponse:
+    """
+    Outcome of a conditional board fetch. `body` is the spooled payload (in memory up to
+    `scrape_spool_max_bytes`, on disk beyond); it is None when the board did not change.
+    """
+    status_code: int
+    body: IO[bytes] | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    body_hash: str | None = None
+    not_modified: bool = False
+
+    @property
+    def data(self) -> Any:
+        """The whole payload decoded at once; prefer streaming `body` for large boards."""
+        if self.body is None:
+            return None
+        self.body.seek(0)
+        return json.load(self.body)
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+
+
+class TokenBucket:
+    """Async token bucket: refills `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        # The lock keeps this host's waiters in FIFO order. FetchEngine waits here before taking
+        # a global fetch slot, so callers queued on a throttled host don't hold up other hosts.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FetchEngine:
+    """
+    Shared async HTTP client for the board scrapers.
+    One pooled keep-alive client, a global concurrency cap and a token bucket per host.
+    Use as `async with FetchEngine() as engine: ...`.
+    Without an explicit `transport`, `settings.scrape_http_mode` picks live, record or replay;
+    replay serves local fixtures, so it skips per-host rate limiting.
+    Transport errors and 429/5xx answers are retried up to `max_retries` times with full-jitter
+    exponential backoff; a Retry-After header sets the minimum wait.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        rate_per_host: float | None = None,
+        burst_per_host: int | None = None,
+        timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_retries: int | None = None,
+        backoff_base: float | None = None,
+        backoff_cap: float | None = None,
+    ) -> None:
+        self.concurrency = concurrency or settings.scrape_concurrency
+        self.max_retries = settings.scrape_max_retries if max_retries is None else max_retries
+        self.backoff_base = settings.scrape_retry_base_delay if backoff_base is None else backoff_base
+        self.backoff_cap = settings.scrape_retry_max_delay if backoff_cap is None else backoff_cap
+        self.retries = 0
+        if rate_per_host is None and transport is None and settings.scrape_http_mode == "replay":
+            rate_per_host = 0
+        if rate_per_host is None:
+            rate_per_host = 1 / settings.sleep_between_calls if settings.sleep_between_calls > 0 else 0
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host or settings.scrape_host_burst
+        self.timeout = timeout or settings.time_out
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> FetchEngine:
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        transport = self._transport or http_fixtures.transport_for_mode(limits=limits)
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": settings.headers},
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=True,
+            transport=transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate_per_host, self.burst_per_host)
+        return bucket
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(resp: httpx.Response) -> float | None:
+        """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), if any."""
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _retry_delay(self, resp: httpx.Response, attempt: int) -> float | None:
+        """Seconds to wait before retrying `resp`, or None to hand it back as is."""
+        if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt)
+        requested = self.retry_after(resp)
+        if requested is not None:
+            if requested > self.backoff_cap:
+                # Not worth waiting for within this run; the caller sees the 429/503.
+                return None
+            delay = max(delay, requested)
+        return delay
+
+    async def _request(
+        self,
+        url: str,
+        params: dict[str, str] | None,
+        headers: dict[str, str] | None,
+        handle: Callable[[httpx.Response], Awaitable[T]],
+    ) -> T:
+        """
+        GET with retries. `handle` reads the streamed response while the fetch slot is still
+        held, so the concurrency cap covers body downloads too.
+        """
+        if self._client is None:
+            raise RuntimeError("FetchEngine must be used as an async context manager")
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            try:
+                # A fresh token per attempt, taken before the fetch slot (see TokenBucket.acquire).
+                await self._bucket(host).acquire()
+                async with self._semaphore:
+                    request = self._client.build_request("GET", url, params=params, headers=headers)
+                    resp = await self._client.send(request, stream=True)
+                    try:
+                        delay = self._retry_delay(resp, attempt)
+                        if delay is None:
+                            return await handle(resp)
+                    finally:
+                        await resp.aclose()
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            attempt += 1
+            self.retries += 1
+            # Sleep outside the semaphore so a backing-off board doesn't hold a fetch slot.
+            await asyncio.sleep(delay)
+
+    async def get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        async def read(resp: httpx.Response) -> httpx.Response:
+            await resp.aread()
+            return resp
+
+        return await self._request(url, params, headers, read)
+
+    async def get_json(self, url: str, params: dict[str, str] | None = None) -> Any:
+        resp = await self.get(url, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_board(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        validators: dict[str, Any] | None = None,
+    ) -> BoardResponse:
+        """
+        Conditional GET for a board payload.
+        Sends If-None-Match / If-Modified-Since from the stored validators and, for servers
+        that ignore them, falls back to comparing a SHA-256 of the body with the stored hash.
+        """
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        async def spool(resp: httpx.Response) -> BoardResponse:
+            if resp.status_code == 304:
+                return BoardResponse(
+                    status_code=304,
+                    etag=resp.headers.get("ETag") or validators.get("etag"),
+                    last_modified=resp.headers.get("Last-Modified") or validators.get("last_modified"),
+                    body_hash=validators.get("body_hash"),
+                    not_modified=True,
+                )
+            resp.raise_for_status()
+            # Hash while spooling: the body never has to sit in memory as one bytes object.
+            digest = hashlib.sha256()
+            body = tempfile.SpooledTemporaryFile(max_size=settings.scrape_spool_max_bytes)
+            try:
+                async for chunk in resp.aiter_bytes():
+                    digest.update(chunk)
+                    body.write(chunk)
+            except BaseException:
+                body.close()
+                raise
+            result = BoardResponse(
+                status_code=resp.status_code,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                body_hash=digest.hexdigest(),
+            )
+            if result.body_hash == validators.get("body_hash"):
+                result.not_modified = True
+                body.close()
+            else:
+                body.seek(0)
+                result.body = body
+            return result
+
+        return await self._request(url, params, headers, spool)
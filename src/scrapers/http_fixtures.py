@@ -0,0 +1,166 @@
+from __future__ import annotations
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any
+import httpx
+from src.settings import settings
+
+# Record/replay of raw board responses, plugged into FetchEngine as an httpx transport.
+#   record: real network, every response is also written to <fixtures_dir>/<name>.json.gz
+#   replay: no network, responses are served from those files (404 when one is missing)
+# Replay can amplify each board's postings list to benchmark ingest at realistic sizes.
+
+HTTP_MODES = ("live", "record", "replay")
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+_POSTING_KEYS = ("jobs", "jobPostings", "postings")
+_ID_KEYS = ("id", "jobId", "guid")
+_URL_KEYS = ("absolute_url", "applyUrl", "jobUrl", "hostedUrl")
+
+
+def fixture_name(url: httpx.URL) -> str:
+    """Stable file name for a request URL: a readable path slug plus a hash of host, path and query."""
+    query = "&".join(sorted(url.query.decode("ascii").split("&"))) if url.query else ""
+    digest = hashlib.sha1(f"{url.host}{url.path}?{query}".encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", url.path).strip("_")[-80:]
+    return f"{slug}-{digest}.json.gz"
+
+
+def write_fixture(path: Path, fixture: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+        json.dump(fixture, fh)
+    tmp.replace(path)
+
+
+def read_fixture(path: Path) -> dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_payload(
+    directory: str | Path,
+    url: str,
+    params: dict[str, str] | None,
+    payload: Any,
+    etag: str | None = None,
+) -> Path:
+    """Write a fixture for a JSON payload directly, e.g. to build synthetic boards."""
+    headers = {"content-type": "application/json"}
+    if etag:
+        headers["etag"] = etag
+    request_url = httpx.URL(url, params=params)
+    path = Path(directory) / fixture_name(request_url)
+    write_fixture(path, {"url": str(request_url), "status": 200, "headers": headers, "body": json.dumps(payload)})
+    return path
+
+
+def amplify_payload(data: Any, factor: int) -> Any:
+    """
+    Scale a board payload to `factor` times its postings. Copies keep their content, get ids
+    suffixed with `~<n>` and URLs tagged with `copy=<n>`; stored job ids are derived from the
+    URL (see db_insertion_service.dedupe_key), so the copies ingest as distinct jobs.
+    """
+    if factor <= 1 or not isinstance(data, dict):
+        return data
+    for key in _POSTING_KEYS:
+        postings = data.get(key)
+        if isinstance(postings, list) and postings:
+            scaled = list(postings)
+            for n in range(1, factor):
+                for p in postings:
+                    copy = dict(p)
+                    for id_key in _ID_KEYS:
+                        if copy.get(id_key) is not None:
+                            copy[id_key] = f"{copy[id_key]}~{n}"
+                    for url_key in _URL_KEYS:
+                        if copy.get(url_key):
+                            sep = "&" if "?" in copy[url_key] else "?"
+                            copy[url_key] = f"{copy[url_key]}{sep}copy={n}"
+                    scaled.append(copy)
+            return {**data, key: scaled}
+    return data
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to `inner` and writes each response body and validators to disk."""
+
+    def __init__(self, directory: str | Path, inner: httpx.AsyncBaseTransport | None = None) -> None:
+        self.directory = Path(directory)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Record the full body, not a 304 the live server might answer with.
+        for header in ("If-None-Match", "If-Modified-Since"):
+            request.headers.pop(header, None)
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        headers = {k: v for k, v in response.headers.items() if k.lower() in _KEPT_HEADERS}
+        fixture = {
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": headers,
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        await asyncio.to_thread(write_fixture, self.directory / fixture_name(request.url), fixture)
+        # The body is already decoded, so Content-Encoding/Length must not be passed on.
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded fixtures without touching the network; honours If-None-Match."""
+
+    def __init__(self, directory: str | Path, amplify: int = 1) -> None:
+        self.directory = Path(directory)
+        self.amplify = max(1, amplify)
+        self._cache: dict[str, tuple[dict[str, Any], bytes]] = {}
+
+    def _load(self, name: str) -> tuple[dict[str, Any], bytes] | None:
+        cached = self._cache.get(name)
+        if cached is None:
+            path = self.directory / name
+            if not path.exists():
+                return None
+            fixture = read_fixture(path)
+            body = fixture["body"].encode("utf-8")
+            if self.amplify > 1 and fixture["status"] == 200:
+                body = json.dumps(amplify_payload(json.loads(body), self.amplify)).encode("utf-8")
+                if fixture["headers"].get("etag"):
+                    fixture["headers"]["etag"] = f'{fixture["headers"]["etag"]}-x{self.amplify}'
+            cached = self._cache[name] = (fixture, body)
+        return cached
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loaded = self._load(fixture_name(request.url))
+        if loaded is None:
+            return httpx.Response(404, json={"error": f"no fixture for {request.url}"}, request=request)
+        fixture, body = loaded
+        headers = fixture["headers"]
+        etag = headers.get("etag")
+        if etag and request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"etag": etag}, request=request)
+        return httpx.Response(fixture["status"], headers=headers, content=body, request=request)
+
+
+def transport_for_mode(
+    mode: str | None = None,
+    limits: httpx.Limits | None = None,
+) -> httpx.AsyncBaseTransport | None:
+    """The transport for `settings.scrape_http_mode`; None means the client's default (live)."""
+    mode = mode or settings.scrape_http_mode
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown scrape_http_mode {mode!r}; expected one of {HTTP_MODES}")
+    if mode == "record":
+        inner = httpx.AsyncHTTPTransport(limits=limits) if limits else None
+        return RecordingTransport(settings.scrape_fixtures_dir, inner=inner)
+    if mode == "replay":
+        return ReplayTransport(settings.scrape_fixtures_dir, amplify=settings.scrape_replay_amplify)
+    return None
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import codecs
+import json
+from typing import IO, Any, Iterator
+
+# Incremental reader for board payloads shaped like {"...": ..., "jobs": [{...}, {...}], ...}.
+# Only the current posting is ever decoded into Python objects; the text buffer holds one
+# posting plus at most a read chunk, however large the payload is.
+
+_WS = " \t\n\r"
+_END = object()
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, fh: IO[bytes], chunk_size: int) -> None:
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, at_least: int) -> bool:
+        """Read until `at_least` unread characters are buffered; False at end of input."""
+        if self.pos > self.chunk_size:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        while len(self.buf) - self.pos < at_least and not self.eof:
+            chunk = self.fh.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                self.buf += self.utf8.decode(b"", final=True)
+            else:
+                self.buf += self.utf8.decode(chunk)
+        return len(self.buf) - self.pos >= at_least
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill(1):
+                return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one JSON value, reading more input until it is complete."""
+        self.peek()
+        want = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number at the buffer edge may continue in the next chunk.
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            # Grow geometrically so one huge posting costs O(n log n), not O(n^2), to decode.
+            self.fill(len(self.buf) - self.pos + want)
+            want *= 2
+
+
+def _array_items(reader: _Reader) -> Iterator[Any]:
+    """Items of the array at the reader's position, consuming it through the closing bracket."""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        sep = reader.peek()
+        reader.expect(sep if sep in ",]" else ",")
+        if sep == "]":
+            return
+
+
+def iter_array_items(
+    fh: IO[bytes],
+    keys: tuple[str, ...] = ("jobs", "jobPostings", "postings"),
+    chunk_size: int = 64 * 1024,
+) -> Iterator[Any]:
+    """
+    Yield, one at a time, the items of the top-level array under the first key in `keys`
+    whose array is non-empty, as `data.get(keys[0]) or data.get(keys[1]) or ...` picks it.
+    Other top-level values are decoded and discarded, arrays item by item. An array that
+    comes before a higher-priority key in the document is skipped, and `fh` (which must
+    then be seekable) is read again from the start to stream it once no better key was found.
+    """
+    origin = fh.tell()
+    reader = _Reader(fh, chunk_size)
+    # Keys seen with an empty array or a non-array value, and the rank of the highest-priority
+    # non-empty array skipped so far. An array streams at once when every key ahead of it is
+    # ruled out.
+    ruled_out: set[str] = set()
+    best: int | None = None
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key in keys and key not in ruled_out and reader.peek() == "[":
+            items = _array_items(reader)
+            first = next(items, _END)
+            rank = keys.index(key)
+            if first is _END:
+                ruled_out.add(key)
+            elif all(k in ruled_out for k in keys[:rank]):
+                yield first
+                yield from items
+                return
+            else:
+                for _ in items:
+                    pass
+                best = rank if best is None else min(best, rank)
+        else:
+            if key in keys:
+                ruled_out.add(key)
+            if reader.peek() == "[":
+                for _ in _array_items(reader):
+                    pass
+            else:
+                reader.value()
+        sep = reader.peek()
+        reader.expect(sep if sep in ",}" else ",")
+        if sep == "}":
+            break
+    if best is not None:
+        fh.seek(origin)
+        yield from iter_array_items(fh, (keys[best],), chunk_size)
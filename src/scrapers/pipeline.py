@@ -0,0 +1,401 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Iterable, Iterator
+from src.embedding import embedding_service
+from src.insertion import db_insertion_service
+from src.scrapers import board_service
+from src.scrapers.fetch_engine import BoardResponse, FetchEngine
+from src.settings import settings
+
+# Staged scrape: fetch -> normalize -> upsert -> embed.
+# Stages are connected by bounded queues, so at most `scrape_concurrency` payloads are in
+# flight plus `pipeline_queue_size` waiting per queue, however many boards are configured.
+
+_DONE = object()
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class BoardWatermark:
+    """
+    Incremental-scrape state for one board: the newest posting timestamp seen so far and
+    the source ids present last time. Postings that are known and not newer are skipped.
+    """
+    high_water_mark: datetime | None = None
+    known_ids: frozenset[str] = frozenset()
+    seen_ids: set[str] = field(default_factory=set)
+    max_seen: datetime | None = None
+    skipped: int = 0
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any] | None, full_refresh: bool = False) -> BoardWatermark:
+        if not state or full_refresh:
+            return cls()
+        return cls(
+            high_water_mark=state.get("high_water_mark"),
+            known_ids=frozenset(state.get("known_source_ids") or ()),
+        )
+
+    def observe(self, source_id: str, updated_at: str | None) -> bool:
+        """Record a posting from the payload; returns False when it can be skipped."""
+        ts = _parse_ts(updated_at)
+        self.seen_ids.add(source_id)
+        if ts is not None and (self.max_seen is None or ts > self.max_seen):
+            self.max_seen = ts
+        if (
+            source_id in self.known_ids
+            and ts is not None
+            and self.high_water_mark is not None
+            and ts <= self.high_water_mark
+        ):
+            self.skipped += 1
+            return False
+        return True
+
+    def next_mark(self) -> datetime | None:
+        marks = [m for m in (self.high_water_mark, self.max_seen) if m is not None]
+        return max(marks) if marks else None
+
+
+# (board, payload dict or spooled body, watermark) -> job rows, possibly lazily.
+ParseFn = Callable[[str, dict[str, Any] | IO[bytes], BoardWatermark | None], Iterable[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class BoardSpec:
+    """Where to fetch one board and how to turn its payload into job rows."""
+    source: str
+    board: str
+    url: str
+    params: dict[str, str]
+    parse: ParseFn
+
+
+@dataclass
+class BoardFetch:
+    """One fetched board. `changed` is False when the stored validators said nothing moved."""
+    source: str
+    board: str
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    ok: bool = True
+    changed: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    body_hash: str | None = None
+    watermark: BoardWatermark | None = None
+
+    @classmethod
+    def from_response(cls, spec: BoardSpec, resp: BoardResponse) -> BoardFetch:
+        return cls(
+            source=spec.source,
+            board=spec.board,
+            changed=not resp.not_modified,
+            etag=resp.etag,
+            last_modified=resp.last_modified,
+            body_hash=resp.body_hash,
+        )
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "source": self.source,
+            "board": self.board,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "body_hash": self.body_hash,
+            "changed": self.changed,
+            # None keeps the stored mark, e.g. when the board answered 304.
+            "high_water_mark": self.watermark.next_mark() if self.watermark else None,
+            "known_source_ids": sorted(self.watermark.seen_ids) if self.watermark else None,
+        }
+
+
+class PipelineProgress:
+    """
+    Progress hooks, called from the pipeline's event loop. The base class ignores them;
+    background runs subclass it to publish per-board state, counts and stage timings.
+    Board statuses go pending -> changed/unchanged/failed -> ingested.
+    """
+
+    def boards_planned(self, specs: list[BoardSpec]) -> None:
+        pass
+
+    def board_status(self, source: str, board: str, status: str, rows: int | None = None) -> None:
+        pass
+
+    def stats_changed(self, stats: dict[str, int]) -> None:
+        pass
+
+    def stage_time(self, stage: str, seconds: float) -> None:
+        pass
+
+
+@contextmanager
+def _timed(progress: PipelineProgress, stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        progress.stage_time(stage, time.perf_counter() - start)
+
+
+class _EmbedSignal:
+    """Coalesces "new rows landed" notifications from the upsert stage into embed runs."""
+
+    def __init__(self) -> None:
+        self.event = asyncio.Event()
+        self.dirty = False
+        self.finished = False
+
+    def request(self) -> None:
+        self.dirty = True
+        self.event.set()
+
+    def finish(self) -> None:
+        self.finished = True
+        self.event.set()
+
+
+async def run_pipeline(
+    specs: list[BoardSpec],
+    states: dict[tuple[str, str], dict[str, Any]] | None = None,
+    queue_size: int | None = None,
+    chunk_size: int | None = None,
+    engine: FetchEngine | None = None,
+    full_refresh: bool = False,
+    progress: PipelineProgress | None = None,
+    embed: bool = True,
+) -> dict[str, int]:
+    """
+    Run every board through the pipeline and return row and board counts.
+    `engine` may be an un-entered FetchEngine to override the default client settings.
+    `full_refresh` ignores stored validators and high-water marks and re-processes everything.
+    `embed=False` leaves new rows for a later `embed_data` run, e.g. one per queue drain.
+    """
+    states = states or {}
+    progress = progress or PipelineProgress()
+    queue_size = queue_size or settings.pipeline_queue_size
+    chunk_size = chunk_size or settings.pipeline_chunk_size
+    stats = {
+        "inserted": 0, "updated": 0, "unchanged": 0,
+        "boards_changed": 0, "boards_unchanged": 0, "boards_failed": 0,
+        "postings_skipped": 0, "deactivated": 0, "boards_circuit_open": 0, "retries": 0,
+        "rows_failed": 0,
+    }
+    raw_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    row_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    signal = _EmbedSignal()
+    progress.boards_planned(specs)
+
+    async with engine or FetchEngine() as fetch_engine:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_fetch_stage(fetch_engine, specs, states, full_refresh, raw_q, stats, progress))
+            tg.create_task(_normalize_stage(raw_q, row_q, states, full_refresh, chunk_size, stats, progress))
+            tg.create_task(_upsert_stage(row_q, chunk_size, signal, stats, progress))
+            if embed:
+                tg.create_task(_embed_stage(signal, progress))
+        stats["retries"] = fetch_engine.retries
+    progress.stats_changed(stats)
+    return stats
+
+
+async def _fetch_stage(
+    engine: FetchEngine,
+    specs: list[BoardSpec],
+    states: dict[tuple[str, str], dict[str, Any]],
+    full_refresh: bool,
+    raw_q: asyncio.Queue,
+    stats: dict[str, int],
+    progress: PipelineProgress,
+) -> None:
+    todo = list(reversed(specs))
+
+    async def worker() -> None:
+        while todo:
+            spec = todo.pop()
+            state = states.get((spec.source, spec.board))
+            # Chronically failing boards are skipped until their cooldown ends, even on a full refresh.
+            if board_service.circuit_open(state):
+                print(f"[{spec.source}] {spec.board} circuit open until {state['circuit_open_until']}, skipping")
+                stats["boards_circuit_open"] += 1
+                progress.board_status(spec.source, spec.board, "circuit_open")
+                continue
+            try:
+                with _timed(progress, "fetch"):
+                    resp = await engine.get_board(
+                        spec.url, params=spec.params, validators=None if full_refresh else state
+                    )
+            except Exception as e:
+                print(f"[{spec.source}] {spec.board} error: {e}")
+                stats["boards_failed"] += 1
+                progress.board_status(spec.source, spec.board, "failed")
+                await _record_failure(spec, e)
+                continue
+            # Blocks while normalization is behind, which is what keeps memory flat.
+            await raw_q.put((spec, resp))
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(max(1, min(engine.concurrency, len(specs)))):
+            tg.create_task(worker())
+    await raw_q.put(_DONE)
+
+
+async def _record_failure(spec: BoardSpec, error: Exception) -> None:
+    try:
+        breaker = await asyncio.to_thread(
+            board_service.record_board_failure, spec.source, spec.board, f"{type(error).__name__}: {error}"
+        )
+    except Exception as e:
+        print(f"[{spec.source}] {spec.board} could not record failure: {e}")
+        return
+    if breaker["circuit_open_until"] is not None:
+        print(
+            f"[{spec.source}] {spec.board} failed {breaker['consecutive_failures']} times in a row, "
+            f"circuit open until {breaker['circuit_open_until']}"
+        )
+
+
+def _take(rows: Iterator[dict[str, Any]], n: int) -> list[dict[str, Any]]:
+    return list(itertools.islice(rows, n))
+
+
+async def _normalize_stage(
+    raw_q: asyncio.Queue,
+    row_q: asyncio.Queue,
+    states: dict[tuple[str, str], dict[str, Any]],
+    full_refresh: bool,
+    chunk_size: int,
+    stats: dict[str, int],
+    progress: PipelineProgress,
+) -> None:
+    while (item := await raw_q.get()) is not _DONE:
+        spec, resp = item
+        fetch = BoardFetch.from_response(spec, resp)
+        if resp.not_modified:
+            print(f"[{spec.source}] {spec.board} unchanged since last run, skipping")
+            stats["boards_unchanged"] += 1
+            progress.board_status(spec.source, spec.board, "unchanged")
+        else:
+            stats["boards_changed"] += 1
+            fetch.watermark = BoardWatermark.from_state(states.get((spec.source, spec.board)), full_refresh)
+            # Parsing streams the spooled body and runs off the event loop so fetches keep
+            # going; rows are handed on chunk by chunk, so a huge board never sits in memory.
+            rows = iter(spec.parse(spec.board, resp.body, fetch.watermark))
+            produced = 0
+            try:
+                while True:
+                    with _timed(progress, "normalize"):
+                        chunk = await asyncio.to_thread(_take, rows, chunk_size)
+                    if not chunk:
+                        break
+                    produced += len(chunk)
+                    await row_q.put(chunk)
+            except ValueError as e:
+                # Truncated or malformed payload: rows already handed on are kept, but without a
+                # board marker neither its validators nor the deactivation sweep are applied.
+                print(f"[{spec.source}] {spec.board} bad payload: {e}")
+                stats["boards_changed"] -= 1
+                stats["boards_failed"] += 1
+                progress.board_status(spec.source, spec.board, "failed")
+                await _record_failure(spec, e)
+                continue
+            finally:
+                resp.close()
+            stats["postings_skipped"] += fetch.watermark.skipped
+            progress.board_status(spec.source, spec.board, "changed", rows=produced)
+        # Board marker follows its rows; validators are saved once those rows are committed.
+        await row_q.put(fetch)
+    await row_q.put(_DONE)
+
+
+async def _upsert_stage(
+    row_q: asyncio.Queue,
+    chunk_size: int,
+    signal: _EmbedSignal,
+    stats: dict[str, int],
+    progress: PipelineProgress,
+) -> None:
+    pending: list[dict[str, Any]] = []
+    boards: list[tuple[int, BoardFetch]] = []
+    # Boards with rows in a failed chunk: their validators are not saved, so the next run
+    # fetches them in full again instead of getting a 304 for postings that were never stored.
+    tainted: set[tuple[str, str]] = set()
+    received = flushed = 0
+
+    async def flush(rows: list[dict[str, Any]]) -> None:
+        with _timed(progress, "upsert"):
+            await _flush(rows)
+
+    async def _flush(rows: list[dict[str, Any]]) -> None:
+        nonlocal flushed
+        if rows:
+            failed: list[dict[str, Any]] = []
+            counts = await asyncio.to_thread(db_insertion_service.insert_jobs_into_db, rows, failed)
+            for key in ("inserted", "updated", "unchanged"):
+                stats[key] += counts[key]
+            stats["rows_failed"] += counts["failed"]
+            tainted.update((r["source"], r["company"]) for r in failed)
+            if counts["inserted"] or counts["updated"]:
+                signal.request()
+            flushed += len(rows)
+        ready = [b for mark, b in boards if mark <= flushed]
+        boards[:] = [(mark, b) for mark, b in boards if mark > flushed]
+        for b in ready:
+            if (b.source, b.board) in tainted:
+                print(f"[{b.source}] {b.board} has rows that failed to store; keeping its previous state")
+                stats["boards_changed"] -= 1
+                stats["boards_failed"] += 1
+                progress.board_status(b.source, b.board, "failed")
+        ready = [b for b in ready if (b.source, b.board) not in tainted]
+        for b in ready:
+            # Only a fully parsed payload says what vanished; 304s leave the board untouched.
+            if b.watermark is not None:
+                stats["deactivated"] += await asyncio.to_thread(
+                    db_insertion_service.deactivate_unseen_jobs, b.source, b.board, sorted(b.watermark.seen_ids)
+                )
+        if ready:
+            await asyncio.to_thread(board_service.save_board_states, [b.state() for b in ready])
+            for b in ready:
+                progress.board_status(b.source, b.board, "ingested")
+        progress.stats_changed(stats)
+
+    try:
+        while (item := await row_q.get()) is not _DONE:
+            if isinstance(item, BoardFetch):
+                boards.append((received, item))
+                if received == flushed:
+                    await flush([])
+                continue
+            pending.extend(item)
+            received += len(item)
+            while len(pending) >= chunk_size:
+                chunk, pending = pending[:chunk_size], pending[chunk_size:]
+                await flush(chunk)
+        await flush(pending)
+    finally:
+        signal.finish()
+
+
+async def _embed_stage(signal: _EmbedSignal, progress: PipelineProgress) -> None:
+    while True:
+        await signal.event.wait()
+        signal.event.clear()
+        while signal.dirty:
+            signal.dirty = False
+            with _timed(progress, "embed"):
+                await asyncio.to_thread(embedding_service.embed_data)
+        if signal.finished:
+            return
@@ -0,0 +1,152 @@
+"""
+Scrape workers that claim boards from the scrape_tasks queue.
+
+Any number of these can run, on any number of hosts, against the same database:
+claims use FOR UPDATE SKIP LOCKED, so each board is fetched by exactly one worker, and a
+per-board advisory lock keeps scheduled scrapes and workers off the same board.
+
+Jobs are embedded once the queue is drained or, when polling forever, whenever a worker
+that stored rows finds the queue idle.
+
+    uv run python -m src.scrapers.queue_worker --enqueue --workers 4 --drain
+    uv run python -m src.scrapers.queue_worker --workers 8          # poll forever
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+from typing import Any
+from uuid import uuid4
+from src.embedding import embedding_service
+from src.scrapers import board_service, pipeline, scraper_service, task_queue
+from src.scrapers.task_queue import ClaimedTask
+from src.settings import settings
+
+
+def worker_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+
+
+async def _heartbeat(task: ClaimedTask, owner: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if not await asyncio.to_thread(task_queue.heartbeat, task.id, owner):
+            print(f"[worker {owner}] lost lease on task {task.id}")
+            return
+
+
+async def process_task(task: ClaimedTask, owner: str) -> dict[str, int]:
+    """Run one board through the pipeline while keeping its lease alive. Embedding is left to the caller."""
+    spec = scraper_service.spec_for(task.source, task.board)
+    states = await asyncio.to_thread(board_service.load_board_states)
+    beat = asyncio.create_task(_heartbeat(task, owner, settings.scrape_task_lease_seconds / 3))
+    try:
+        return await pipeline.run_pipeline([spec], states, full_refresh=task.full_refresh, embed=False)
+    finally:
+        beat.cancel()
+
+
+def _embed_when_idle(owner: str) -> bool:
+    """Embed new rows unless another process is already at it; returns whether a backfill ran."""
+    with embedding_service.embed_lock() as acquired:
+        if not acquired:
+            return False
+        try:
+            embedding_service.embed_data()
+        except Exception as e:
+            print(f"[worker {owner}] embedding pass failed: {e}")
+            return False
+        return True
+
+
+def run_worker(
+    drain: bool = False,
+    poll_interval: float | None = None,
+    max_tasks: int | None = None,
+    embed: bool = False,
+) -> int:
+    """
+    Claim and process tasks one at a time. With `drain`, return once the queue has no open
+    tasks; otherwise poll forever. With `embed`, run the embedding backfill each time the
+    queue goes idle after this worker completed tasks; a skipped or failed pass is retried
+    on the next idle poll. Returns the number of tasks processed.
+    """
+    owner = worker_owner()
+    poll_interval = poll_interval or settings.scrape_task_poll_interval
+    processed = 0
+    unembedded = False
+    while max_tasks is None or processed < max_tasks:
+        claimed = task_queue.claim_tasks(owner)
+        if not claimed:
+            if drain and task_queue.open_task_count() == 0:
+                break
+            if embed and unembedded:
+                unembedded = not _embed_when_idle(owner)
+            time.sleep(poll_interval)
+            continue
+        task = claimed[0]
+        # The board lock keeps a scheduled scrape off this board until its rows and state are stored.
+        with board_service.board_locks([(task.source, task.board)]) as held:
+            if not held:
+                task_queue.defer_task(task.id, owner, settings.scrape_task_retry_delay)
+                print(f"[worker {owner}] task {task.id} ({task.source}/{task.board}) board busy, deferred")
+                continue
+            try:
+                stats: dict[str, Any] = asyncio.run(process_task(task, owner))
+            except Exception as e:
+                status = task_queue.fail_task(task.id, owner, f"{type(e).__name__}: {e}")
+                print(f"[worker {owner}] task {task.id} ({task.source}/{task.board}) error: {e} -> {status}")
+            else:
+                if stats["boards_failed"]:
+                    status = task_queue.fail_task(task.id, owner, "board fetch or store failed")
+                    print(f"[worker {owner}] task {task.id} ({task.source}/{task.board}) failed -> {status}")
+                else:
+                    task_queue.complete_task(task.id, owner, stats)
+                    unembedded = True
+        processed += 1
+    return processed
+
+
+def run_workers(workers: int, drain: bool = False, embed: bool = False) -> None:
+    """Run `workers` workers. A draining run embeds once at the end (see `main`), not per worker."""
+    kwargs = {"drain": drain, "embed": embed and not drain}
+    if workers <= 1:
+        run_worker(**kwargs)
+        return
+    # Separate processes: normalization is CPU-bound, so threads would share one GIL.
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=run_worker, kwargs=kwargs, name=f"scrape-worker-{i}") for i in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to start")
+    parser.add_argument("--enqueue", action="store_true", help="queue every due board first (all with --full-refresh)")
+    parser.add_argument("--full-refresh", action="store_true", help="enqueued tasks ignore stored board state")
+    parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    parser.add_argument("--no-embed", action="store_true",
+                        help="don't embed stored jobs (after draining, or when the queue goes idle)")
+    args = parser.parse_args()
+
+    if args.enqueue:
+        specs = scraper_service.configured_specs(all_boards=args.full_refresh)
+        added = task_queue.enqueue_boards(((s.source, s.board) for s in specs), full_refresh=args.full_refresh)
+        print(f"enqueued {added} of {len(specs)} boards")
+
+    start = time.perf_counter()
+    run_workers(args.workers, drain=args.drain, embed=not args.no_embed)
+    if args.drain:
+        print(f"queue drained by {args.workers} workers in {time.perf_counter() - start:.1f}s")
+        if not args.no_embed:
+            embedding_service.embed_data()
+
+
+if __name__ == "__main__":
+    main()
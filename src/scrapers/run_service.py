@@ -0,0 +1,212 @@
+from __future__ import annotations
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+from uuid import uuid4
+from src.scrapers import scraper_service
+from src.scrapers.pipeline import BoardSpec, PipelineProgress
+
+# Scrape runs execute on a background thread; the HTTP request only submits them.
+# At most one run is active per process: triggering while one is running returns it.
+# Across processes the advisory lock in scrape_jobs_exclusive decides; losers end "skipped".
+
+TERMINAL_STATUSES = ("succeeded", "failed", "skipped")
+RUN_HISTORY = 20
+KEEPALIVE_SECONDS = 15.0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ScrapeRun(PipelineProgress):
+    """One scrape run: status, per-board progress, counts and busy seconds per stage."""
+
+    def __init__(self, full_refresh: bool = False, trigger: str = "manual", min_gap: float | None = None) -> None:
+        self.run_id = uuid4().hex
+        self.full_refresh = full_refresh
+        self.trigger = trigger
+        self.min_gap = min_gap
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.error: str | None = None
+        self.boards: dict[str, dict[str, Any]] = {}
+        self.stats: dict[str, int] = {}
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+        self.version = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def _changed(self) -> None:
+        # Caller holds the condition.
+        self.version += 1
+        self._cond.notify_all()
+
+    # Pipeline hooks; they run on the run's event loop thread.
+
+    def boards_planned(self, specs: list[BoardSpec]) -> None:
+        with self._cond:
+            for spec in specs:
+                self.boards[f"{spec.source}:{spec.board}"] = {
+                    "source": spec.source, "board": spec.board, "status": "pending", "rows": None,
+                }
+            self._changed()
+
+    def board_status(self, source: str, board: str, status: str, rows: int | None = None) -> None:
+        with self._cond:
+            entry = self.boards.setdefault(
+                f"{source}:{board}", {"source": source, "board": board, "status": status, "rows": None}
+            )
+            entry["status"] = status
+            if rows is not None:
+                entry["rows"] = rows
+            self._changed()
+
+    def stats_changed(self, stats: dict[str, int]) -> None:
+        with self._cond:
+            self.stats = dict(stats)
+            self._changed()
+
+    def stage_time(self, stage: str, seconds: float) -> None:
+        with self._cond:
+            self.stage_seconds[stage] += seconds
+            self._changed()
+
+    # Lifecycle, driven by the registry.
+
+    def start(self) -> None:
+        with self._cond:
+            self.status = "running"
+            self.started_at = _now()
+            self._changed()
+
+    def succeed(self, stats: dict[str, int]) -> None:
+        with self._cond:
+            self.stats = dict(stats)
+            self.status = "succeeded"
+            self.finished_at = _now()
+            self._changed()
+
+    def fail(self, error: BaseException) -> None:
+        with self._cond:
+            self.error = f"{type(error).__name__}: {error}"
+            self.status = "failed"
+            self.finished_at = _now()
+            self._changed()
+
+    def skip(self, reason: str) -> None:
+        with self._cond:
+            self.error = reason
+            self.status = "skipped"
+            self.finished_at = _now()
+            self._changed()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "run_id": self.run_id,
+                "status": self.status,
+                "trigger": self.trigger,
+                "full_refresh": self.full_refresh,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "stats": dict(self.stats),
+                "stage_seconds": {k: round(v, 3) for k, v in self.stage_seconds.items()},
+                "boards": [dict(b) for b in self.boards.values()],
+                "version": self.version,
+            }
+
+    def wait(self, version: int, timeout: float | None = None) -> int:
+        """Block until the run moves past `version` (or `timeout` elapses); returns the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def events(self, keepalive: float = KEEPALIVE_SECONDS) -> Iterator[str]:
+        """Server-sent events: one `progress` event per change, ending after the terminal status."""
+        version = -1
+        while True:
+            current = self.wait(version, timeout=keepalive)
+            if current == version:
+                yield ": keepalive\n\n"
+                continue
+            version = current
+            snap = self.snapshot()
+            yield f"event: progress\ndata: {json.dumps(snap)}\n\n"
+            if snap["status"] in TERMINAL_STATUSES:
+                return
+
+
+class RunRegistry:
+    """In-memory record of recent runs that also guarantees a single active run."""
+
+    def __init__(self, target: Callable[..., dict[str, int]] | None = None, history: int = RUN_HISTORY) -> None:
+        self._target = target
+        self._history = history
+        self._lock = threading.Lock()
+        self._runs: OrderedDict[str, ScrapeRun] = OrderedDict()
+        self._active: ScrapeRun | None = None
+
+    def submit(
+        self,
+        full_refresh: bool = False,
+        trigger: str = "manual",
+        min_gap: float | None = None,
+    ) -> tuple[ScrapeRun, bool]:
+        """
+        Start a run in the background; returns (run, created). An active run is returned as is.
+        `min_gap` skips the run if any process scraped within that many seconds.
+        """
+        with self._lock:
+            if self._active is not None and not self._active.finished:
+                return self._active, False
+            run = ScrapeRun(full_refresh=full_refresh, trigger=trigger, min_gap=min_gap)
+            self._runs[run.run_id] = run
+            while len(self._runs) > self._history:
+                self._runs.popitem(last=False)
+            self._active = run
+        threading.Thread(target=self._execute, args=(run,), name=f"scrape-{run.run_id[:8]}", daemon=True).start()
+        return run, True
+
+    def get(self, run_id: str) -> ScrapeRun | None:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def recent(self) -> list[ScrapeRun]:
+        with self._lock:
+            return list(reversed(self._runs.values()))
+
+    def active(self) -> ScrapeRun | None:
+        with self._lock:
+            return self._active if self._active is not None and not self._active.finished else None
+
+    def last_finished(self) -> ScrapeRun | None:
+        with self._lock:
+            return next((r for r in reversed(self._runs.values()) if r.finished), None)
+
+    def _execute(self, run: ScrapeRun) -> None:
+        target = self._target or scraper_service.scrape_jobs_exclusive
+        run.start()
+        try:
+            stats = target(full_refresh=run.full_refresh, progress=run, min_gap=run.min_gap)
+        except scraper_service.ScrapeSkipped as e:
+            print(f"scrape run {run.run_id} skipped: {e}")
+            run.skip(str(e))
+            return
+        except Exception as e:
+            print(f"scrape run {run.run_id} failed: {e}")
+            run.fail(e)
+            return
+        run.succeed(stats)
+
+
+registry = RunRegistry()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from src.scrapers import board_service
+from src.scrapers.run_service import RunRegistry, registry as default_registry
+from src.settings import settings
+
+
+class ScrapeScheduler:
+    """
+    Submits a scheduled scrape every `interval` seconds, +/- `jitter` (a fraction of the
+    interval) so that replicas started together drift apart. Every replica runs one; the
+    advisory lock and the `min_gap` freshness check leave the actual scrape to one of them.
+    The tick defaults to the shortest per-board interval; each run only fetches due boards.
+    """
+
+    def __init__(
+        self,
+        registry: RunRegistry | None = None,
+        interval: float | None = None,
+        jitter: float | None = None,
+    ) -> None:
+        self.registry = registry or default_registry
+        self.interval = interval if interval is not None else settings.scrape_min_interval
+        self.jitter = jitter if jitter is not None else settings.scrape_jitter
+        self.next_run_at: datetime | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def next_delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scrape-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.next_run_at = None
+
+    def _loop(self) -> None:
+        while True:
+            delay = self.next_delay()
+            self.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            if self._stop.wait(delay):
+                return
+            # Half an interval: a replica whose timer fires right after another's scrape stands down.
+            run, created = self.registry.submit(trigger="scheduled", min_gap=self.interval / 2)
+            if not created:
+                print(f"scheduled scrape skipped: run {run.run_id} is still {run.status}")
+
+    def describe(self) -> dict[str, Any]:
+        last = self.registry.last_finished()
+        active = self.registry.active()
+        try:
+            last_scraped_at = board_service.last_scraped_at()
+        except Exception as e:
+            print(f"could not read last scrape time: {e}")
+            last_scraped_at = None
+        return {
+            "enabled": self.running,
+            "interval_seconds": self.interval,
+            "jitter": self.jitter,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "active_run_id": active.run_id if active else None,
+            "last_run": {k: v for k, v in last.snapshot().items() if k != "boards"} if last else None,
+            # Across all replicas, from scrape_boards.
+            "last_scraped_at": last_scraped_at.isoformat() if last_scraped_at else None,
+        }
+
+
+scheduler = ScrapeScheduler()
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field, model_validator
+
+BoardSource = Literal["ashby", "greenhouse"]
+
+
+class _IntervalBounds(BaseModel):
+    min_interval: int | None = Field(default=None, ge=60)
+    max_interval: int | None = Field(default=None, ge=60)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.min_interval and self.max_interval and self.min_interval > self.max_interval:
+            raise ValueError("min_interval must not exceed max_interval")
+        return self
+
+
+class BoardCreate(_IntervalBounds):
+    """Register a board; intervals are in seconds and default to the global bounds."""
+    source: BoardSource
+    board: str = Field(min_length=1, max_length=200, pattern=r"^[A-Za-z0-9._-]+$")
+
+
+class BoardUpdate(_IntervalBounds):
+    enabled: bool | None = None
+    scrape_interval: int | None = Field(default=None, ge=60)
+
+
+class BoardResponse(BaseModel):
+    source: str
+    board: str
+    enabled: bool
+    scrape_interval: int
+    min_interval: int | None
+    max_interval: int | None
+    last_fetched_at: datetime | None
+    last_changed_at: datetime | None
+    next_scrape_at: datetime | None
+    consecutive_failures: int
+    circuit_open_until: datetime | None
+    last_error: str | None
+    added_at: datetime
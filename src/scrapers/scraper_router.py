@@ -1,9 +1,76 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from src.auth import deps as auth_deps
-from src.scrapers import scraper_service
+from src.scrapers import board_service
+from src.scrapers.schemas import BoardCreate, BoardResponse, BoardUpdate
+from src.scrapers.run_service import ScrapeRun, registry
+from src.scrapers.scheduler import scheduler
 
 router = APIRouter(prefix="/data", tags=["scraper"])
 
-@router.get('/external_retrieval')
-def scraper_data(admin = Depends(auth_deps.require_admin)):
-    scraper_service.scrape_jobs()
\ No newline at end of file
+
+def _get_run(run_id: str) -> ScrapeRun:
+    run = registry.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scrape run not found")
+    return run
+
+
+@router.get('/external_retrieval', status_code=status.HTTP_202_ACCEPTED)
+def scraper_data(full_refresh: bool = False, admin = Depends(auth_deps.require_admin)):
+    """Start a background scrape, or return the one already running."""
+    run, created = registry.submit(full_refresh=full_refresh)
+    return {"created": created, **run.snapshot()}
+
+
+@router.get('/scrape_runs')
+def list_scrape_runs(admin = Depends(auth_deps.require_admin)):
+    return [run.snapshot() for run in registry.recent()]
+
+
+@router.get('/scrape_runs/{run_id}')
+def get_scrape_run(run_id: str, admin = Depends(auth_deps.require_admin)):
+    return _get_run(run_id).snapshot()
+
+
+@router.get('/scrape_runs/{run_id}/events')
+def stream_scrape_run(run_id: str, admin = Depends(auth_deps.require_admin)):
+    """Server-sent progress events until the run finishes."""
+    run = _get_run(run_id)
+    return StreamingResponse(
+        run.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get('/schedule')
+def get_schedule(admin = Depends(auth_deps.require_admin)):
+    """Periodic scrape schedule: next run on this replica and the last run anywhere."""
+    return scheduler.describe()
+
+
+@router.get('/boards', response_model=list[BoardResponse])
+def list_boards(admin = Depends(auth_deps.require_admin)):
+    """Board registry with each board's cadence, next scrape time and breaker state."""
+    return board_service.list_boards()
+
+
+@router.post('/boards', response_model=BoardResponse, status_code=status.HTTP_201_CREATED)
+def add_board(body: BoardCreate, admin = Depends(auth_deps.require_admin)):
+    return board_service.add_board(body.source, body.board, body.min_interval, body.max_interval)
+
+
+@router.patch('/boards/{source}/{board}', response_model=BoardResponse)
+def update_board(source: str, board: str, body: BoardUpdate, admin = Depends(auth_deps.require_admin)):
+    updated = board_service.update_board(source, board, **body.model_dump(exclude_none=True))
+    if updated is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
+    return updated
+
+
+@router.delete('/boards/{source}/{board}', status_code=status.HTTP_204_NO_CONTENT)
+def remove_board(source: str, board: str, admin = Depends(auth_deps.require_admin)):
+    """Stop scraping a board and deactivate its postings."""
+    if not board_service.remove_board(source, board):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import re
-import time
-import hashlib
-import html
-from typing import Any, Iterable
-from datetime import datetime
-import requests
-from src.embedding import embedding_service
-from src.insertion import db_insertion_service
-from src.settings import settings, AI_RE
+import asyncio
+import itertools
+from typing import IO, Any, Iterable, Iterator
+from datetime import datetime, timezone
+from src.scrapers import board_service, pipeline
+from src.scrapers.fetch_engine import FetchEngine
+from src.scrapers.pipeline import BoardFetch, BoardSpec, BoardWatermark, PipelineProgress
+from src.settings import settings
+from src.scrapers import ai_classifier, json_stream
+from src.text.html_text import html_to_text
 
 def parse_dt(s: str | None) -> str | None:
     """Parse many ISO-ish timestamps to ISO 8601 (UTC if possible). Return None if unknown."""
@@ -25,136 +25,337 @@ def parse_dt(s: str | None) -> str | None:
 
 
 def strip_html(text: str | None) -> str:
-    if not text:
-        return ""
-    # Remove HTML tags quickly; for production consider Bleach/BS4
-    no_tags = re.sub(r"<[^>]+>", " ", text)
-    return html.unescape(re.sub(r"\s+", " ", no_tags)).strip()
+    """Flatten HTML to a single line of text."""
+    return html_to_text(text, preserve_blocks=False)
 
 
 def is_ai_role(title: str, description: str) -> bool:
-    blob = f"{title}\n{description}"
-    return bool(AI_RE.search(blob))
+    return ai_classifier.is_ai_role(title, description)
 
 
-def dedupe_key(company: str, title: str, location: str | None, url: str | None) -> str:
-    canonical = f"{(company or '').strip().lower()}|{(title or '').strip().lower()}|{(location or '').strip().lower()}|{(url or '').strip().lower()}"
-    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+# A board payload is either an already decoded dict or the spooled response body, which
+# is parsed incrementally so only one posting at a time is materialized.
+BoardPayload = dict[str, Any] | IO[bytes]
+_CLASSIFY_BATCH = 200
 
-def fetch_ashby(orgs: Iterable[str]) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
-    print('orgs:', orgs)
-    for org in orgs:
-        print(f'fetching org: {org}')
-        request_headers = {
-            "User-Agent": settings.headers
-        }
-
-        url = f"https://api.ashbyhq.com/posting-api/job-board/{org}"
-        params = {"includeCompensation": "true"}
-        try:
-            print('requesting URL:', url, 'with params:', params)
-            resp = requests.get(url, params=params, headers=request_headers, timeout=settings.time_out)
-            print('response status code:', resp.status_code)
-            resp.raise_for_status()
-            data = resp.json() or {}
-        except Exception as e:
-            print(f"[ashby] {org} error: {e}")
-            continue
-
-        # Ashby responses vary; common keys include 'jobs', 'jobPostings', or 'postings'
-        postings = (
-            data.get("jobs")
-            or data.get("jobPostings")
-            or data.get("postings")
-            or []
-        )
 
-        for p in postings:
-            title = p.get("title") or p.get("jobTitle") or ""
-            company = org
-            # location variants
-            loc = (
-                p.get("locationName")
-                or p.get("location")
-                or (p.get("locations") or [{}])[0].get("name") if p.get("locations") else None
-            )
-            desc = p.get("description") or p.get("jobDescription") or p.get("descriptionHtml") or ""
-            url_post = p.get("applyUrl") or p.get("jobUrl") or p.get("jobUrl") or None
-            if not is_ai_role(title, desc):
-                continue
-            out.append(
-                {
-                    "source": "ashby",
-                    "source_id": str(p.get("id") or p.get("jobId") or p.get("guid") or ""),
-                    "company": company,
-                    "title": title,
-                    "locations": [loc] if loc else [],
-                    "remote": None,
-                    "posted_at": parse_dt(p.get("publishedAt") or p.get("updatedAt") or p.get("createdAt")),
-                    "url": url_post,
-                    "description": strip_html(desc),
-                    "tags": [t.get("name") for t in (p.get("teams") or []) if isinstance(t, dict)] if p.get("teams") else [],
-                    'compensation': p.get("compensation") or p.get("salary") or None,
-                    "raw": p,
-                }
+def _postings(data: BoardPayload, keys: tuple[str, ...]) -> Iterator[dict[str, Any]]:
+    if isinstance(data, dict):
+        for key in keys:
+            if data.get(key):
+                return iter(data[key])
+        return iter(())
+    return json_stream.iter_array_items(data, keys)
+
+
+# The raw posting is stored in job_details.source_payload minus its description, which is
+# already kept as description_html.
+_ASHBY_DESCRIPTION_KEYS = ("description", "jobDescription", "descriptionHtml", "descriptionPlain")
+
+
+def _payload_without(posting: dict[str, Any], keys: tuple[str, ...]) -> dict[str, Any]:
+    return {k: v for k, v in posting.items() if k not in keys}
+
+
+def _ashby_row(org: str, p: dict[str, Any]) -> dict[str, Any]:
+    title = p.get("title") or p.get("jobTitle") or ""
+    company = org
+    # location variants
+    loc = (
+        p.get("locationName")
+        or p.get("location")
+        or (p.get("locations") or [{}])[0].get("name") if p.get("locations") else None
+    )
+    desc = p.get("description") or p.get("jobDescription") or p.get("descriptionHtml") or ""
+    url_post = p.get("applyUrl") or p.get("jobUrl") or p.get("jobUrl") or None
+    return {
+        "source": "ashby",
+        "source_id": _ashby_source_id(p),
+        "company": company,
+        "title": title,
+        "locations": [loc] if loc else [],
+        "remote": None,
+        "posted_at": parse_dt(p.get("publishedAt") or p.get("updatedAt") or p.get("createdAt")),
+        "url": url_post,
+        "description_html": desc,
+        "description_text": html_to_text(desc),
+        "tags": [t.get("name") for t in (p.get("teams") or []) if isinstance(t, dict)] if p.get("teams") else [],
+        'compensation': p.get("compensation") or p.get("salary") or None,
+        "source_payload": _payload_without(p, _ASHBY_DESCRIPTION_KEYS),
+    }
+
+
+def iter_ashby_rows(
+    org: str,
+    data: BoardPayload,
+    watermark: BoardWatermark | None = None,
+) -> Iterator[dict[str, Any]]:
+    """AI postings of an Ashby board as job rows, streamed in classification batches."""
+    watermark = watermark or BoardWatermark()
+    # Ashby responses vary; common keys include 'jobs', 'jobPostings', or 'postings'
+    # Known postings not updated since the last run are dropped before any parsing work.
+    postings = (
+        p for p in _postings(data, ("jobs", "jobPostings", "postings"))
+        if watermark.observe(
+            _ashby_source_id(p),
+            p.get("updatedAt") or p.get("publishedAt") or p.get("createdAt"),
+        )
+    )
+    for batch in itertools.batched(postings, _CLASSIFY_BATCH):
+        keep = ai_classifier.classify_ai_roles(
+            (
+                p.get("title") or p.get("jobTitle") or "",
+                p.get("description") or p.get("jobDescription") or p.get("descriptionHtml") or "",
             )
-        time.sleep(settings.sleep_between_calls)
-    return out
+            for p in batch
+        )
+        for p, is_ai in zip(batch, keep):
+            if is_ai:
+                yield _ashby_row(org, p)
+
+
+def parse_ashby_board(
+    org: str,
+    data: BoardPayload,
+    watermark: BoardWatermark | None = None,
+) -> list[dict[str, Any]]:
+    return list(iter_ashby_rows(org, data, watermark))
+
+
+def _ashby_source_id(p: dict[str, Any]) -> str:
+    return str(p.get("id") or p.get("jobId") or p.get("guid") or "")
+
+
+async def fetch_ashby_org(
+    engine: FetchEngine,
+    org: str,
+    validators: dict[str, Any] | None = None,
+) -> BoardFetch:
+    print(f'fetching org: {org}')
+    return await _fetch_board(engine, ashby_spec(org), validators)
+
+
+async def fetch_ashby_async(
+    engine: FetchEngine,
+    orgs: Iterable[str],
+    states: dict[tuple[str, str], dict[str, Any]] | None = None,
+) -> list[BoardFetch]:
+    print('orgs:', orgs)
+    states = states or {}
+    return list(await asyncio.gather(
+        *(fetch_ashby_org(engine, org, states.get(("ashby", org))) for org in orgs)
+    ))
+
+
+def fetch_ashby(orgs: Iterable[str]) -> list[dict[str, Any]]:
+    fetches = asyncio.run(_run_with_engine(fetch_ashby_async, orgs))
+    return [row for f in fetches for row in f.rows]
 
 
 # ---------------------- Source: Greenhouse (per board) ----------------------
 
-def fetch_greenhouse(boards: Iterable[str]) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
+def _greenhouse_row(board: str, j: dict[str, Any]) -> dict[str, Any]:
+    title = j.get("title") or ""
+    company = board
+    loc_obj = j.get("location") or {}
+    location = loc_obj.get("name") if isinstance(loc_obj, dict) else None
+    desc = j.get("content") or ""
+    return {
+        "source": "greenhouse",
+        "source_id": str(j.get("id")),
+        "company": company,
+        "title": title,
+        "locations": [location] if location else [],
+        "remote": None,
+        "posted_at": parse_dt(j.get("updated_at") or j.get("created_at")),
+        "url": j.get("absolute_url"),
+        "description_html": desc,
+        "description_text": html_to_text(desc),
+        "tags": [d.get("name") for d in (j.get("departments") or []) if isinstance(d, dict)],
+        'compensation': j.get("compensation") or j.get("salary") or None,
+        "source_payload": _payload_without(j, ("content",)),
+    }
+
+
+def iter_greenhouse_rows(
+    board: str,
+    data: BoardPayload,
+    watermark: BoardWatermark | None = None,
+) -> Iterator[dict[str, Any]]:
+    """AI postings of a Greenhouse board as job rows, streamed in classification batches."""
+    watermark = watermark or BoardWatermark()
+    jobs = (
+        j for j in _postings(data, ("jobs",))
+        if watermark.observe(str(j.get("id")), j.get("updated_at") or j.get("created_at"))
+    )
+    for batch in itertools.batched(jobs, _CLASSIFY_BATCH):
+        keep = ai_classifier.classify_ai_roles(
+            (j.get("title") or "", j.get("content") or "") for j in batch
+        )
+        for j, is_ai in zip(batch, keep):
+            if is_ai:
+                yield _greenhouse_row(board, j)
+
+
+def parse_greenhouse_board(
+    board: str,
+    data: BoardPayload,
+    watermark: BoardWatermark | None = None,
+) -> list[dict[str, Any]]:
+    return list(iter_greenhouse_rows(board, data, watermark))
+
+
+async def fetch_greenhouse_board(
+    engine: FetchEngine,
+    board: str,
+    validators: dict[str, Any] | None = None,
+) -> BoardFetch:
+    return await _fetch_board(engine, greenhouse_spec(board), validators)
+
+
+async def fetch_greenhouse_async(
+    engine: FetchEngine,
+    boards: Iterable[str],
+    states: dict[tuple[str, str], dict[str, Any]] | None = None,
+) -> list[BoardFetch]:
     print('greenhouse orgs:', boards)
+    states = states or {}
+    return list(await asyncio.gather(
+        *(fetch_greenhouse_board(engine, board, states.get(("greenhouse", board))) for board in boards)
+    ))
+
+
+def fetch_greenhouse(boards: Iterable[str]) -> list[dict[str, Any]]:
+    fetches = asyncio.run(_run_with_engine(fetch_greenhouse_async, boards))
+    return [row for f in fetches for row in f.rows]
+
+
+# ---------------------- Shared fetch plumbing ----------------------
+
+def ashby_spec(org: str) -> BoardSpec:
+    return BoardSpec(
+        source="ashby",
+        board=org,
+        url=f"{settings.ashby_api_url}/{org}",
+        params={"includeCompensation": "true"},
+        parse=iter_ashby_rows,
+    )
+
+
+def greenhouse_spec(board: str) -> BoardSpec:
+    return BoardSpec(
+        source="greenhouse",
+        board=board,
+        url=f"{settings.greenhouse_api_url}/{board}/jobs",
+        params={"content": "true"},
+        parse=iter_greenhouse_rows,
+    )
+
+
+_SPEC_BUILDERS = {"ashby": ashby_spec, "greenhouse": greenhouse_spec}
+
+
+def spec_for(source: str, board: str) -> BoardSpec:
+    try:
+        return _SPEC_BUILDERS[source](board)
+    except KeyError:
+        raise ValueError(f"Unknown board source {source!r}") from None
+
 
-    for board in boards:
-        url = f"https://boards-api.greenhouse.io/v1/boards/{board}/jobs"
-        params = {"content": "true"}
-        request_headers = {
-            "User-Agent": settings.headers
-        }
+def settings_specs() -> list[BoardSpec]:
+    """Boards listed in settings; only used to seed the registry (and for offline benchmarks)."""
+    return (
+        [ashby_spec(org) for org in settings.ashby_orgs or []]
+        + [greenhouse_spec(board) for board in settings.greenhouse_boards or []]
+    )
+
+
+def configured_specs(all_boards: bool = False) -> list[BoardSpec]:
+    """
+    Enabled boards from the scrape_boards registry that are due, or all of them with
+    `all_boards`. An empty registry is seeded from settings first.
+    """
+    board_service.ensure_registry((s.source, s.board) for s in settings_specs())
+    specs = []
+    for source, board in board_service.due_boards(all_boards):
         try:
-            resp = requests.get(url, params=params, headers=request_headers, timeout=settings.time_out)
-            resp.raise_for_status()
-            data = resp.json() or {}
-        except Exception as e:
-            print(f"[greenhouse] {board} error: {e}")
-            continue
-        jobs = data.get("jobs", [])
-        for j in jobs:
-            title = j.get("title") or ""
-            company = board
-            loc_obj = j.get("location") or {}
-            location = loc_obj.get("name") if isinstance(loc_obj, dict) else None
-            desc = j.get("content") or ""
-            if not is_ai_role(title, desc):
-                continue
-            out.append(
-                {
-                    "source": "greenhouse",
-                    "source_id": str(j.get("id")),
-                    "company": company,
-                    "title": title,
-                    "locations": [location] if location else [],
-                    "remote": None,
-                    "posted_at": parse_dt(j.get("updated_at") or j.get("created_at")),
-                    "url": j.get("absolute_url"),
-                    "description": strip_html(desc),
-                    "tags": [d.get("name") for d in (j.get("departments") or []) if isinstance(d, dict)],
-                    'compensation': j.get("compensation") or j.get("salary") or None,
-                    "raw": j,
-                }
-            )
-        time.sleep(settings.sleep_between_calls)
-    return out
-
-def scrape_jobs() -> None:
-    print("Starting scraping jobs...")
-    batch = []
-    if settings.ashby_orgs: batch += fetch_ashby(settings.ashby_orgs)
-    if settings.greenhouse_boards: batch += fetch_greenhouse(settings.greenhouse_boards)
-    n = db_insertion_service.insert_jobs_into_db(batch)
-    embedding_service.embed_data()
-    print(f"ingested {n} rows")
+            specs.append(spec_for(source, board))
+        except ValueError as e:
+            print(f"[{source}] {board} skipped: {e}")
+    return specs
+
+
+async def _fetch_board(
+    engine: FetchEngine,
+    spec: BoardSpec,
+    validators: dict[str, Any] | None,
+) -> BoardFetch:
+    try:
+        resp = await engine.get_board(spec.url, params=spec.params, validators=validators)
+    except Exception as e:
+        print(f"[{spec.source}] {spec.board} error: {e}")
+        return BoardFetch(source=spec.source, board=spec.board, ok=False)
+
+    fetch = BoardFetch.from_response(spec, resp)
+    if resp.not_modified:
+        print(f"[{spec.source}] {spec.board} unchanged since last run, skipping")
+    else:
+        try:
+            fetch.rows = list(spec.parse(spec.board, resp.body, None))
+        finally:
+            resp.close()
+    return fetch
+
+
+async def _run_with_engine(fetch_fn, boards: Iterable[str]) -> list[BoardFetch]:
+    async with FetchEngine() as engine:
+        return await fetch_fn(engine, boards)
+
+
+def scrape_jobs(full_refresh: bool = False, progress: PipelineProgress | None = None) -> dict[str, int]:
+    """
+    Scrape every configured board. Boards and postings that did not change since the last
+    run are skipped; `full_refresh` ignores that state and re-processes everything.
+    """
+    print("Starting scraping jobs..." + (" (full refresh)" if full_refresh else ""))
+    specs = configured_specs(full_refresh)
+    # Boards a queue worker is processing right now are left to it.
+    with board_service.board_locks((s.source, s.board) for s in specs) as held:
+        busy = len(specs) - len(held)
+        if busy:
+            print(f"skipping {busy} boards locked by another scraper")
+        states = board_service.load_board_states()
+        stats = asyncio.run(pipeline.run_pipeline(
+            [s for s in specs if (s.source, s.board) in held], states, full_refresh=full_refresh, progress=progress,
+        ))
+    print(
+        f"ingested {stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged rows, "
+        f"{stats['postings_skipped']} postings below the high-water mark, {stats['deactivated']} deactivated; "
+        f"boards: {stats['boards_changed']} changed, {stats['boards_unchanged']} unchanged, "
+        f"{stats['boards_failed']} failed, {stats['boards_circuit_open']} skipped by open circuit; "
+        f"{stats['retries']} retries"
+    )
+    return stats
+
+
+class ScrapeSkipped(Exception):
+    """A run that did not scrape because another process holds the lock or scraped recently."""
+
+
+def scrape_jobs_exclusive(
+    full_refresh: bool = False,
+    progress: PipelineProgress | None = None,
+    min_gap: float | None = None,
+) -> dict[str, int]:
+    """
+    `scrape_jobs` under the cluster-wide advisory lock. With `min_gap` (seconds), the run is
+    also skipped when any process fetched boards more recently than that.
+    """
+    with board_service.scrape_lock() as acquired:
+        if not acquired:
+            raise ScrapeSkipped("another process is already scraping")
+        if min_gap:
+            last = board_service.last_scraped_at()
+            if last is not None and (datetime.now(timezone.utc) - last).total_seconds() < min_gap:
+                raise ScrapeSkipped(f"boards were scraped at {last.isoformat()}")
+        return scrape_jobs(full_refresh=full_refresh, progress=progress)
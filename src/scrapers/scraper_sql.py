@@ -0,0 +1,248 @@
+_SQL_SELECT_BOARD_STATES = """
+SELECT source, board, etag, last_modified, body_hash, high_water_mark, known_source_ids,
+       consecutive_failures, circuit_open_until
+FROM scrape_boards
+"""
+
+_SQL_UPSERT_BOARD_STATE = """
+INSERT INTO scrape_boards (
+  source, board, etag, last_modified, body_hash, high_water_mark, known_source_ids,
+  last_fetched_at, last_changed_at, scrape_interval
+) VALUES (
+  :source, :board, :etag, :last_modified, :body_hash, :high_water_mark, :known_source_ids,
+  now(), CASE WHEN :changed THEN now() END, :default_interval
+)
+ON CONFLICT (source, board) DO UPDATE SET
+  etag = EXCLUDED.etag,
+  last_modified = EXCLUDED.last_modified,
+  body_hash = EXCLUDED.body_hash,
+  high_water_mark = COALESCE(EXCLUDED.high_water_mark, scrape_boards.high_water_mark),
+  known_source_ids = COALESCE(EXCLUDED.known_source_ids, scrape_boards.known_source_ids),
+  last_fetched_at = now(),
+  last_changed_at = COALESCE(EXCLUDED.last_changed_at, scrape_boards.last_changed_at),
+  consecutive_failures = 0,
+  circuit_open_until = NULL,
+  last_error = NULL,
+  -- Adaptive cadence: a board whose body changed is polled twice as often, an unchanged one
+  -- 1.5x less often, clamped to its bounds. The body hash catches changes on full refreshes too.
+  scrape_interval = LEAST(
+    GREATEST(
+      CASE WHEN EXCLUDED.body_hash IS DISTINCT FROM scrape_boards.body_hash
+        THEN COALESCE(scrape_boards.scrape_interval, :default_interval) / 2
+        ELSE COALESCE(scrape_boards.scrape_interval, :default_interval) * 3 / 2
+      END,
+      COALESCE(scrape_boards.min_interval, :min_interval)
+    ),
+    COALESCE(scrape_boards.max_interval, :max_interval)
+  )
+"""
+
+# Opens the breaker once a board has failed :threshold times in a row; each further failure
+# (including a failed half-open probe) doubles the cooldown up to :max_cooldown seconds.
+_SQL_RECORD_BOARD_FAILURE = """
+INSERT INTO scrape_boards (source, board, consecutive_failures, last_error, circuit_open_until)
+VALUES (
+  :source, :board, 1, :error,
+  CASE WHEN 1 >= :threshold THEN now() + make_interval(secs => :cooldown) END
+)
+ON CONFLICT (source, board) DO UPDATE SET
+  consecutive_failures = scrape_boards.consecutive_failures + 1,
+  last_error = EXCLUDED.last_error,
+  circuit_open_until = CASE
+    WHEN scrape_boards.consecutive_failures + 1 >= :threshold THEN now() + make_interval(secs => LEAST(
+      :cooldown * power(2, scrape_boards.consecutive_failures + 1 - :threshold), :max_cooldown
+    ))
+  END
+RETURNING consecutive_failures, circuit_open_until
+"""
+
+# ---------------------- Board registry ----------------------
+
+_SQL_COUNT_BOARDS = """
+SELECT count(*) FROM scrape_boards
+"""
+
+_SQL_SEED_BOARD = """
+INSERT INTO scrape_boards (source, board, scrape_interval)
+VALUES (:source, :board, :default_interval)
+ON CONFLICT (source, board) DO NOTHING
+"""
+
+# Boards whose interval has elapsed since their last successful fetch (or all, with :all).
+_SQL_SELECT_DUE_BOARDS = """
+SELECT source, board
+FROM scrape_boards
+WHERE enabled
+  AND (
+    :all
+    OR last_fetched_at IS NULL
+    OR last_fetched_at + make_interval(secs => COALESCE(scrape_interval, :default_interval)) <= now()
+  )
+ORDER BY source, board
+"""
+
+_SQL_SELECT_REGISTRY = """
+SELECT source, board, enabled,
+       COALESCE(scrape_interval, :default_interval) AS scrape_interval,
+       min_interval, max_interval,
+       last_fetched_at, last_changed_at,
+       CASE WHEN enabled THEN
+         COALESCE(last_fetched_at + make_interval(secs => COALESCE(scrape_interval, :default_interval)), now())
+       END AS next_scrape_at,
+       consecutive_failures, circuit_open_until, last_error, added_at
+FROM scrape_boards
+WHERE (CAST(:source AS TEXT) IS NULL OR source = :source)
+  AND (CAST(:board AS TEXT) IS NULL OR board = :board)
+ORDER BY source, board
+"""
+
+_SQL_UPSERT_REGISTRY_BOARD = """
+INSERT INTO scrape_boards (source, board, enabled, scrape_interval, min_interval, max_interval)
+VALUES (:source, :board, TRUE, :default_interval, :min_interval, :max_interval)
+ON CONFLICT (source, board) DO UPDATE SET
+  enabled = TRUE,
+  min_interval = EXCLUDED.min_interval,
+  max_interval = EXCLUDED.max_interval
+"""
+
+_SQL_UPDATE_REGISTRY_BOARD = """
+UPDATE scrape_boards
+SET enabled = COALESCE(:enabled, enabled),
+    min_interval = COALESCE(:min_interval, min_interval),
+    max_interval = COALESCE(:max_interval, max_interval),
+    scrape_interval = COALESCE(:scrape_interval, scrape_interval)
+WHERE source = :source AND board = :board
+RETURNING source
+"""
+
+_SQL_DISABLE_BOARD = """
+UPDATE scrape_boards
+SET enabled = FALSE
+WHERE source = :source AND board = :board
+RETURNING source
+"""
+
+# A removed board no longer gets swept, so its postings are retired with it.
+_SQL_DEACTIVATE_BOARD_JOBS = """
+UPDATE jobs
+SET is_active = FALSE,
+    updated_at = now()
+WHERE source = :source AND company = :board AND is_active
+RETURNING id
+"""
+
+# Session-level lock held for a whole scrape, so replicas and workers never scrape concurrently.
+_SQL_TRY_SCRAPE_LOCK = """
+SELECT pg_try_advisory_lock(hashtext('scrape_jobs'))
+"""
+
+_SQL_RELEASE_SCRAPE_LOCK = """
+SELECT pg_advisory_unlock(hashtext('scrape_jobs'))
+"""
+
+# Per-board session locks, held from loading a board's state until its rows, sweep and state
+# are stored. Scheduled scrapes and queue workers both take them, so a board is never
+# processed by two of them at once. Two-key form: a separate key space from 'scrape_jobs'.
+_SQL_TRY_BOARD_LOCK = """
+SELECT pg_try_advisory_lock(hashtext('scrape_board'), hashtext(:source || '/' || :board))
+"""
+
+_SQL_RELEASE_BOARD_LOCK = """
+SELECT pg_advisory_unlock(hashtext('scrape_board'), hashtext(:source || '/' || :board))
+"""
+
+_SQL_SELECT_LAST_SCRAPE = """
+SELECT max(last_fetched_at) FROM scrape_boards
+"""
+
+# ---------------------- scrape_tasks work queue ----------------------
+
+_SQL_ENQUEUE_TASK = """
+INSERT INTO scrape_tasks (source, board, full_refresh, max_attempts)
+VALUES (:source, :board, :full_refresh, :max_attempts)
+ON CONFLICT (source, board) WHERE status IN ('pending', 'running') DO NOTHING
+RETURNING id
+"""
+
+# Expired leases whose attempts are used up will never be claimed again: fail them.
+_SQL_FAIL_EXHAUSTED_TASKS = """
+UPDATE scrape_tasks
+SET status = 'failed',
+    finished_at = now(),
+    lease_owner = NULL,
+    last_error = COALESCE(last_error, 'lease expired')
+WHERE status = 'running'
+  AND lease_expires_at < now()
+  AND attempts >= max_attempts
+"""
+
+# Pending tasks that are due, plus running tasks whose worker stopped heartbeating.
+# SKIP LOCKED lets any number of workers run this concurrently without blocking each other.
+_SQL_CLAIM_TASKS = """
+WITH next AS (
+  SELECT id
+  FROM scrape_tasks
+  WHERE (status = 'pending' AND available_at <= now())
+     OR (status = 'running' AND lease_expires_at < now() AND attempts < max_attempts)
+  ORDER BY available_at, id
+  LIMIT :limit
+  FOR UPDATE SKIP LOCKED
+)
+UPDATE scrape_tasks t
+SET status = 'running',
+    attempts = t.attempts + 1,
+    lease_owner = :owner,
+    lease_expires_at = now() + make_interval(secs => :lease_seconds),
+    started_at = now()
+FROM next
+WHERE t.id = next.id
+RETURNING t.id, t.source, t.board, t.full_refresh, t.attempts, t.max_attempts
+"""
+
+_SQL_HEARTBEAT_TASK = """
+UPDATE scrape_tasks
+SET lease_expires_at = now() + make_interval(secs => :lease_seconds)
+WHERE id = :id AND lease_owner = :owner AND status = 'running'
+RETURNING id
+"""
+
+_SQL_COMPLETE_TASK = """
+UPDATE scrape_tasks
+SET status = 'done',
+    finished_at = now(),
+    lease_owner = NULL,
+    lease_expires_at = NULL,
+    last_error = NULL,
+    stats = :stats
+WHERE id = :id AND lease_owner = :owner AND status = 'running'
+RETURNING id
+"""
+
+# Back to pending with a delay, or failed for good once attempts run out.
+_SQL_FAIL_TASK = """
+UPDATE scrape_tasks
+SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+    available_at = now() + make_interval(secs => :retry_delay * power(2, attempts - 1)),
+    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END,
+    lease_owner = NULL,
+    lease_expires_at = NULL,
+    last_error = :error
+WHERE id = :id AND lease_owner = :owner AND status = 'running'
+RETURNING status
+"""
+
+# Hand a claimed task back without spending an attempt, e.g. while its board is locked.
+_SQL_DEFER_TASK = """
+UPDATE scrape_tasks
+SET status = 'pending',
+    attempts = greatest(attempts - 1, 0),
+    available_at = now() + make_interval(secs => :delay),
+    lease_owner = NULL,
+    lease_expires_at = NULL
+WHERE id = :id AND lease_owner = :owner AND status = 'running'
+RETURNING id
+"""
+
+_SQL_COUNT_OPEN_TASKS = """
+SELECT count(*) FROM scrape_tasks WHERE status IN ('pending', 'running')
+"""
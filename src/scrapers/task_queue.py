@@ -0,0 +1,106 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Iterable
+from psycopg2.extras import Json
+from sqlalchemy import text
+from src.database import database_service
+from src.settings import settings
+from src.scrapers.scraper_sql import (
+    _SQL_ENQUEUE_TASK,
+    _SQL_FAIL_EXHAUSTED_TASKS,
+    _SQL_CLAIM_TASKS,
+    _SQL_HEARTBEAT_TASK,
+    _SQL_COMPLETE_TASK,
+    _SQL_FAIL_TASK,
+    _SQL_DEFER_TASK,
+    _SQL_COUNT_OPEN_TASKS,
+)
+
+# Board fetches as rows in scrape_tasks. Workers claim them with FOR UPDATE SKIP LOCKED
+# and hold a lease they extend by heartbeating; a task whose lease lapses (worker died)
+# is claimed again by someone else until its attempts run out.
+
+
+@dataclass(frozen=True)
+class ClaimedTask:
+    id: int
+    source: str
+    board: str
+    full_refresh: bool
+    attempts: int
+    max_attempts: int
+
+
+def _write(sql: str, params: dict[str, Any] | list[dict[str, Any]]):
+    with database_service.get_db_context() as db:
+        try:
+            result = db.execute(text(sql), params)
+            rows = result.all() if result.returns_rows else []
+            db.commit()
+            return rows
+        except Exception as e:
+            db.rollback()
+            raise e
+
+
+def enqueue_boards(boards: Iterable[tuple[str, str]], full_refresh: bool = False) -> int:
+    """Queue (source, board) pairs; boards that already have an open task are left alone."""
+    enqueued = 0
+    for source, board in boards:
+        enqueued += len(_write(_SQL_ENQUEUE_TASK, {
+            "source": source,
+            "board": board,
+            "full_refresh": full_refresh,
+            "max_attempts": settings.scrape_task_max_attempts,
+        }))
+    return enqueued
+
+
+def claim_tasks(owner: str, limit: int = 1, lease_seconds: int | None = None) -> list[ClaimedTask]:
+    with database_service.get_db_context() as db:
+        try:
+            db.execute(text(_SQL_FAIL_EXHAUSTED_TASKS))
+            rows = db.execute(text(_SQL_CLAIM_TASKS), {
+                "owner": owner,
+                "limit": limit,
+                "lease_seconds": lease_seconds or settings.scrape_task_lease_seconds,
+            }).mappings().all()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+    return [ClaimedTask(**r) for r in rows]
+
+
+def heartbeat(task_id: int, owner: str, lease_seconds: int | None = None) -> bool:
+    """Extend the lease; False means it was lost (expired and claimed by another worker)."""
+    return bool(_write(_SQL_HEARTBEAT_TASK, {
+        "id": task_id,
+        "owner": owner,
+        "lease_seconds": lease_seconds or settings.scrape_task_lease_seconds,
+    }))
+
+
+def complete_task(task_id: int, owner: str, stats: dict[str, Any]) -> bool:
+    return bool(_write(_SQL_COMPLETE_TASK, {"id": task_id, "owner": owner, "stats": Json(stats)}))
+
+
+def fail_task(task_id: int, owner: str, error: str) -> str | None:
+    """Returns the new status ('pending' for a retry, 'failed' once out of attempts), or None if the lease was lost."""
+    rows = _write(_SQL_FAIL_TASK, {
+        "id": task_id,
+        "owner": owner,
+        "error": error[:1000],
+        "retry_delay": settings.scrape_task_retry_delay,
+    })
+    return rows[0].status if rows else None
+
+
+def defer_task(task_id: int, owner: str, delay: float) -> bool:
+    """Release a claimed task to be retried after `delay` seconds, without counting the attempt."""
+    return bool(_write(_SQL_DEFER_TASK, {"id": task_id, "owner": owner, "delay": delay}))
+
+
+def open_task_count() -> int:
+    with database_service.get_db_context() as db:
+        return db.execute(text(_SQL_COUNT_OPEN_TASKS)).scalar()
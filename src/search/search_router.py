@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from typing import Any
+from src.auth import deps as auth_deps
 from src.search.schemas import PaginatedResponse
 from src.search import search_service
+from src.embedding import embedding_service
+from src.settings import settings
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -17,4 +20,13 @@ def search(q: str = Query(""),
                                     "mode": mode}
     
     rows = search_service.do_job_search(received_data)
-    return rows
\ No newline at end of file
+    return rows
+
+
+@router.get("/cache")
+def query_cache_stats(admin = Depends(auth_deps.require_admin)):
+    """Hit/miss counters of this worker's query-embedding cache and batch sizes of its dispatcher."""
+    stats = embedding_service.get_query_cache().stats()
+    if settings.query_batching:
+        stats["batcher"] = embedding_service.get_query_batcher().stats()
+    return stats
@@ -19,7 +19,7 @@ def do_job_search(search_params: dict) -> JSONResponse | dict | ValueError:
             "page_size": page_size,
             "total_pages": 0
         })
-    vec = embedding_service.embed_texts([q])[0]
+    vec = embedding_service.embed_query(q)
 
     offset = (page - 1) * page_size
 
@@ -44,13 +44,14 @@ def do_job_search(search_params: dict) -> JSONResponse | dict | ValueError:
 
 
 def get_total_jobs_with_embeddings() -> int:
-    """Get total count of all active jobs that have embeddings"""
+    """Get total count of all active canonical jobs that have embeddings"""
     with database_service.get_db_context() as db:
         total_query = text("""
-            SELECT COUNT(DISTINCT j.id)
+            SELECT COUNT(*)
             FROM jobs j
             INNER JOIN job_embeddings je ON j.id = je.job_id
             WHERE j.is_active = TRUE
+              AND j.duplicate_of IS NULL
         """)
         total_result = db.execute(total_query)
         total = total_result.scalar()
@@ -78,6 +79,8 @@ def search_semantic(
                 ).filter(
                     and_(
                         Job.is_active == True,
+                        # Cross-posted copies collapse into their canonical job.
+                        Job.duplicate_of.is_(None),
                     )
                 )
 
@@ -18,6 +18,23 @@ AI_KEYWORDS = [
 
 AI_RE = re.compile("|".join(AI_KEYWORDS), flags=re.I)
 
+# Lowercase literals that every match of each keyword starts with. Descriptions are scanned
+# once for these, and only the hits are confirmed with the keyword regexes; a keyword left
+# out here is searched in full. Keep in step with AI_KEYWORDS.
+AI_KEYWORD_PREFIXES = {
+    r"\bAI\b": ("ai",),
+    r"\bML\b": ("ml",),
+    r"machine\s+learning": ("machine",),
+    r"artificial\s+intelligence": ("artificial",),
+    r"deep\s+learning": ("deep",),
+    r"LLM": ("llm",),
+    r"NLP": ("nlp",),
+    r"data\s+scientist": ("data",),
+    r"(ML|AI)\s+engineer": ("ml", "ai"),
+    r"(research|applied)\s+(scientist|engineer)": ("research", "applied"),
+    r"forward\s+deployed\s+(engineer|scientist)": ("forward",),
+}
+
 ASHBY_COMPANIES = [
     "openai",
 ]
@@ -55,26 +72,82 @@ class Settings(BaseSettings):
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     model_embed_dim: int = 384
     model_batch_size: int = 64
+    # torch | onnx. The ONNX Runtime backend needs the `onnx` extra; int8 weights are quantized
+    # once into model_onnx_dir. model_onnx_threads=0 lets ONNX Runtime use every core.
+    model_backend: str = Field(default="torch")
+    model_onnx_quantize: bool = Field(default=False)
+    model_onnx_dir: str = Field(default="models/onnx")
+    model_onnx_threads: int = Field(default=0)
+    # Embedding backfill: jobs fetched per keyset page, and encoding processes (0 encodes on a
+    # thread of the calling process, reusing its loaded model).
+    embed_page_size: int = Field(default=1000)
+    embed_workers: int = Field(default=0)
     model_top_k: int = 20
     model_hybrid_vec_w: float = 0.7
     model_hybrid_kw_w: float = 0.2
     model_hybrid_rec_w: float = 0.1
     model_recency_half_life_days: int = 7
+    # Query embeddings cached per API process; with query_cache_shared the vectors are also
+    # kept in the query_embeddings table so other workers skip the model call.
+    query_cache_size: int = Field(default=2048)
+    query_cache_ttl: int = Field(default=3600)
+    query_cache_shared: bool = Field(default=False)
+    # Cache misses from concurrent searches are encoded together: the dispatcher waits up to
+    # query_batch_max_wait_ms after the first one for up to query_batch_size queries.
+    query_batching: bool = Field(default=True)
+    query_batch_size: int = Field(default=32)
+    query_batch_max_wait_ms: float = Field(default=2.0)
     
     # DB fields
     database_url: str
     db_name: str    
     db_echo: bool = False
     db_pool_size: int = 5
+    db_copy_threshold: int = Field(default=500)
+    # Upserts commit per chunk so row locks on `jobs` are held briefly; a chunk that cannot get
+    # its locks within the timeout fails fast instead of queueing behind (and ahead of) searches.
+    db_upsert_chunk_size: int = Field(default=1000)
+    db_upsert_lock_timeout_ms: int = Field(default=2000)
+    # SimHash bits two postings may differ by and still count as one job; the banded lookup
+    # only finds every such pair while this stays below simhash.BANDS.
+    dedupe_max_distance: int = Field(default=6)
     ashby_orgs: list[str] = Field(default_factory=lambda: ASHBY_COMPANIES)
     greenhouse_boards: list[str] = Field(default_factory=lambda: GREENHOUSE_BOARDS_COMPANIES)
     sleep_between_calls: float = Field(default=0.6)
     
     # Scraper fields
+    # Starting per-board interval; it then adapts between the min/max bounds.
     scrape_interval: int = 3600
+    scrape_min_interval: int = Field(default=900)
+    scrape_max_interval: int = Field(default=86400)
+    # Off by default so local runs, tests and extra workers don't scrape live boards on boot;
+    # the deployment image turns it on (SCRAPE_SCHEDULER_ENABLED in the dockerfile).
+    scrape_scheduler_enabled: bool = Field(default=False)
+    scrape_jitter: float = Field(default=0.1)
     scrape_max_retries: int = 3
+    scrape_retry_base_delay: float = Field(default=0.5)
+    scrape_retry_max_delay: float = Field(default=30.0)
+    scrape_breaker_threshold: int = Field(default=3)
+    scrape_breaker_cooldown: int = Field(default=1800)
+    scrape_breaker_max_cooldown: int = Field(default=86400)
+    scrape_task_lease_seconds: int = Field(default=120)
+    scrape_task_max_attempts: int = Field(default=3)
+    scrape_task_retry_delay: int = Field(default=60)
+    scrape_task_poll_interval: float = Field(default=2.0)
+    scrape_concurrency: int = Field(default=8)
+    scrape_host_burst: int = Field(default=4)
+    pipeline_queue_size: int = Field(default=4)
+    pipeline_chunk_size: int = Field(default=500)
+    ashby_api_url: str = Field(default="https://api.ashbyhq.com/posting-api/job-board")
+    greenhouse_api_url: str = Field(default="https://boards-api.greenhouse.io/v1/boards")
     headers: str = Field(default="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36")
     time_out: int = Field(default=15)
+    # Board bodies larger than this are spooled to a temp file instead of memory.
+    scrape_spool_max_bytes: int = Field(default=1024 * 1024)
+    # live | record | replay (see src/scrapers/http_fixtures.py)
+    scrape_http_mode: str = Field(default="live")
+    scrape_fixtures_dir: str = Field(default="fixtures/scrape")
+    scrape_replay_amplify: int = Field(default=1)
 
     #email fields
     resend_api_key: str
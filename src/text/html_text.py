@@ -0,0 +1,42 @@
+from __future__ import annotations
+import html
+import re
+
+_BLOCK_TAGS = (
+    "address|article|aside|blockquote|br|dd|div|dl|dt|figcaption|figure|footer|form|"
+    "h[1-6]|header|hr|li|main|nav|ol|p|pre|section|table|tbody|td|th|thead|tr|ul"
+)
+
+# One compiled pattern tokenizes the whole fragment in a single C-level pass. Only block
+# tag names are captured, so re.split hands back [text, block|None, text, ...]; script,
+# style and comment bodies are swallowed by the match and never reach the output.
+_TAG_SPLIT_RE = re.compile(
+    r"<(?:script\b.*?</script\s*|style\b.*?</style\s*|!--.*?--"
+    r"|/?(?:(" + _BLOCK_TAGS + r")\b|[a-zA-Z])[^>]*|[^>]*)>",
+    re.S | re.I,
+)
+
+
+def html_to_text(text: str | None, preserve_blocks: bool = True) -> str:
+    """
+    Convert an HTML fragment to plain text.
+    Block elements (paragraphs, headings, list items, breaks) end a line, inline tags
+    become a space, entities are decoded and whitespace is collapsed. With
+    `preserve_blocks=False` the lines are joined with single spaces instead.
+    """
+    if not text:
+        return ""
+    # Greenhouse ships `content` entity-escaped ("&lt;p&gt;..."): decode the markup first.
+    if "<" not in text and "&lt;" in text:
+        text = html.unescape(text)
+
+    parts = _TAG_SPLIT_RE.split(text)
+    parts[1::2] = ["\n" if block else " " for block in parts[1::2]]
+    lines = []
+    for line in "".join(parts).split("\n"):
+        if "&" in line:
+            line = html.unescape(line)
+        line = " ".join(line.split())
+        if line:
+            lines.append(line)
+    return ("\n" if preserve_blocks else " ").join(lines)
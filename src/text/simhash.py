@@ -0,0 +1,89 @@
+from __future__ import annotations
+import hashlib
+import re
+import numpy as np
+
+# 64-bit SimHash over word shingles of a posting's normalized text. Near-identical
+# descriptions (the same role cross-posted with a reworded sentence or extra boilerplate)
+# land within a few bits of each other.
+#
+# Lookup uses the pigeonhole principle: the fingerprint is cut into BANDS equal slices, and
+# two fingerprints less than BANDS bits apart agree exactly on at least one slice. Each slice
+# is hashed together with a scope (e.g. company and title) into an int32 "band key", so an
+# array overlap on an inverted index only returns same-scope rows sharing a slice.
+
+FINGERPRINT_BITS = 64
+BANDS = 8
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 8
+
+_BAND_BITS = FINGERPRINT_BITS // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_WORD_RE = re.compile(r"\w+")
+# Legal-form words dropped from the end of company names, so "Acme, Inc." and "acme" match.
+_COMPANY_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "ltd", "limited", "gmbh", "corp", "corporation", "co", "plc", "ag", "sa",
+})
+
+
+def normalize(text: str | None) -> str:
+    """Lowercased words joined by single spaces; punctuation and markup spacing dropped."""
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def company_key(company: str | None) -> str:
+    """
+    Company name folded for comparison: lowercased, punctuation and trailing legal suffixes
+    dropped, words run together ("Scale AI, Inc." and the slug "scale-ai" both give "scaleai").
+    """
+    words = normalize(company).split()
+    while len(words) > 1 and words[-1] in _COMPANY_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+
+def shingles(text: str | None, size: int = SHINGLE_SIZE) -> set[str]:
+    """Distinct `size`-word windows of the normalized text."""
+    words = normalize(text).split()
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(text: str | None) -> int | None:
+    """
+    Signed 64-bit SimHash of `text` (signed so it fits a Postgres BIGINT).
+    Returns None for texts too short to fingerprint reliably.
+    """
+    grams = shingles(text)
+    if len(grams) < MIN_SHINGLES:
+        return None
+    digests = b"".join(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest() for g in grams)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(grams), 8), axis=1)
+    # Majority vote per bit position; packbits is big-endian, like int.from_bytes below.
+    packed = np.packbits(bits.sum(axis=0) * 2 > len(grams))
+    return int.from_bytes(packed.tobytes(), "big", signed=True)
+
+
+def bands(fingerprint: int) -> list[int]:
+    """The fingerprint's BANDS slices, most significant first."""
+    unsigned = fingerprint & ((1 << FINGERPRINT_BITS) - 1)
+    return [(unsigned >> (_BAND_BITS * (BANDS - 1 - i))) & _BAND_MASK for i in range(BANDS)]
+
+
+def band_keys(fingerprint: int | None, scope: str) -> list[int] | None:
+    """One signed int32 per band, unique to (scope, band position, band value)."""
+    if fingerprint is None:
+        return None
+    return [
+        int.from_bytes(
+            hashlib.blake2b(f"{scope}\x1f{i}\x1f{band}".encode("utf-8"), digest_size=4).digest(),
+            "big",
+            signed=True,
+        )
+        for i, band in enumerate(bands(fingerprint))
+    ]
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << FINGERPRINT_BITS) - 1)).bit_count()
@@ -0,0 +1,78 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from src import bulk_import
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+
+
+@pytest.fixture
+def archive(tmp_path):
+    lines = SAMPLE_JOBS.read_text(encoding="utf-8").splitlines()[:25]
+    lines.insert(10, "{not json")
+    path = tmp_path / "jobs.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def store(mocker):
+    stored = {}
+
+    def fake_bulk_insert(values, failed=None):
+        new = [v for v in values if v["id"] not in stored]
+        stored.update((v["id"], v) for v in values)
+        return {"inserted": len(new), "updated": 0, "unchanged": len(values) - len(new), "duplicates": 0, "failed": 0}
+
+    mocker.patch.object(bulk_import.db_insertion_service, "bulk_insert_prepared", side_effect=fake_bulk_insert)
+    return stored
+
+
+def test_archive_rows_are_normalized_like_scraped_rows(archive, store):
+    stats = bulk_import.import_files([archive], batch_size=4)
+
+    assert (stats["lines"], stats["bad_lines"], stats["inserted"]) == (26, 1, 25)
+    first = json.loads(SAMPLE_JOBS.read_text(encoding="utf-8").splitlines()[0])
+    row = store[first["id"]]
+    assert row["description_html"] == first["description"]
+    assert row["description_text"] and "<" not in row["description_text"]
+    assert row["content_hash"] and row["source_payload"] == first["source_payload"]
+
+
+def test_interrupted_import_resumes_from_checkpoint(archive, store, tmp_path, mocker):
+    checkpoint = tmp_path / "checkpoint.json"
+    real_commit = bulk_import.db_insertion_service.bulk_insert_prepared.side_effect
+    calls = 0
+
+    def crash_on_third_batch(values, failed=None):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise KeyboardInterrupt
+        return real_commit(values, failed)
+
+    bulk_import.db_insertion_service.bulk_insert_prepared.side_effect = crash_on_third_batch
+    with pytest.raises(KeyboardInterrupt):
+        bulk_import.import_files([archive], batch_size=4, checkpoint=checkpoint)
+    assert bulk_import.Checkpoint(checkpoint).start_line(archive) == 8
+
+    bulk_import.db_insertion_service.bulk_insert_prepared.side_effect = real_commit
+    resumed = bulk_import.import_files([archive], batch_size=4, checkpoint=checkpoint)
+    assert (resumed["lines"], resumed["inserted"]) == (18, 17)
+    assert len(store) == 25
+
+    again = bulk_import.import_files([archive], batch_size=4, checkpoint=checkpoint)
+    assert again["lines"] == 0
+
+
+def test_process_pool_matches_inline_import(archive, store):
+    inline = bulk_import.import_files([archive], batch_size=3)
+    inline_rows = dict(store)
+    store.clear()
+    pooled = bulk_import.import_files([archive], workers=2, batch_size=3)
+    assert {k: pooled[k] for k in ("lines", "bad_lines", "inserted")} == {k: inline[k] for k in ("lines", "bad_lines", "inserted")}
+    assert store == inline_rows
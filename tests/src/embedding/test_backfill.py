@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from src.embedding import backfill, embedding_service
+
+
+class FakeJobs:
+    """In-memory stand-in for the keyset query and the embeddings upsert."""
+
+    def __init__(self, ids, write_nothing=False):
+        self.missing = {job_id: f"text {job_id}" for job_id in ids}
+        self.written = []
+        self.pages = []
+        self.cache = {}
+        self.write_nothing = write_nothing
+
+    def fetch(self, after, upper, limit):
+        self.pages.append(after)
+        ids = sorted(i for i in self.missing if after < i <= upper)[:limit]
+        return [(i, self.missing[i], f"hash-{i}") for i in ids]
+
+    def cached(self, shas):
+        return {sha: self.cache[sha] for sha in shas if sha in self.cache}
+
+    def insert(self, rows):
+        if self.write_nothing:
+            return 0
+        for job_id, vec, content_hash in rows:
+            assert vec == [float(len(self.missing[job_id]))]
+            assert content_hash == f"hash-{job_id}"
+            del self.missing[job_id]
+            self.written.append(job_id)
+        return len(rows)
+
+
+@pytest.fixture
+def jobs(mocker):
+    def install(ids, write_nothing=False, upper=None):
+        fake = FakeJobs(ids, write_nothing)
+        mocker.patch.object(embedding_service, "max_job_id", return_value=upper or max(ids, default=None))
+        mocker.patch.object(embedding_service, "fetch_missing_embeddings", side_effect=fake.fetch)
+        mocker.patch.object(embedding_service, "insert_embeddings", side_effect=fake.insert)
+        mocker.patch.object(embedding_service, "cached_embeddings", side_effect=fake.cached)
+        mocker.patch.object(embedding_service, "cache_embeddings", side_effect=fake.cache.update)
+        fake.encoded = []
+
+        def embed_texts(texts):
+            fake.encoded.extend(texts)
+            return [[float(len(t))] for t in texts]
+
+        mocker.patch.object(embedding_service, "embed_texts", side_effect=embed_texts)
+        return fake
+    return install
+
+
+def test_backfill_embeds_every_missing_job_once_in_keyset_pages(jobs):
+    fake = jobs([f"{i:03d}" for i in range(25)])
+    stats = backfill.run_backfill(page_size=10)
+    assert fake.written == [f"{i:03d}" for i in range(25)]
+    assert stats["embedded"] == 25 and stats["pages"] == 3
+    assert fake.pages == ["", "009", "019"]
+
+
+def test_backfill_terminates_when_writes_do_not_cover_the_page(jobs):
+    fake = jobs([f"{i:03d}" for i in range(25)], write_nothing=True)
+    stats = backfill.run_backfill(page_size=10)
+    assert stats["embedded"] == 0
+    assert len(fake.pages) == 3
+
+
+def test_jobs_inserted_after_the_run_started_wait_for_the_next_run(jobs):
+    fake = jobs(["a", "b", "c", "d"], upper="b")
+    backfill.run_backfill(page_size=1)
+    assert fake.written == ["a", "b"]
+
+
+def test_checkpoint_resumes_after_the_last_written_page(jobs, tmp_path):
+    checkpoint = tmp_path / "embed.json"
+    checkpoint.write_text(json.dumps({"model_name": backfill.settings.model_name, "after": "002"}))
+    fake = jobs([f"{i:03d}" for i in range(6)])
+    backfill.run_backfill(page_size=2, checkpoint=checkpoint)
+    assert fake.written == ["003", "004", "005"]
+    assert not checkpoint.exists()
+
+
+def test_checkpoint_is_kept_when_a_write_fails(jobs, tmp_path, mocker):
+    checkpoint = tmp_path / "embed.json"
+    fake = jobs([f"{i:03d}" for i in range(6)])
+    calls = []
+
+    def failing_insert(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("db down")
+        return fake.insert(rows)
+
+    mocker.patch.object(embedding_service, "insert_embeddings", side_effect=failing_insert)
+    with pytest.raises(RuntimeError):
+        backfill.run_backfill(page_size=2, checkpoint=checkpoint)
+    assert json.loads(checkpoint.read_text())["after"] == "001"
+
+
+def test_checkpoint_of_another_model_is_ignored(jobs, tmp_path):
+    checkpoint = tmp_path / "embed.json"
+    checkpoint.write_text(json.dumps({"model_name": "other-model", "after": "002"}))
+    fake = jobs([f"{i:03d}" for i in range(4)])
+    backfill.run_backfill(page_size=2, checkpoint=checkpoint)
+    assert fake.written == ["000", "001", "002", "003"]
+
+
+def test_identical_texts_are_encoded_once_and_reused_from_the_cache(jobs):
+    fake = jobs([f"{i:03d}" for i in range(8)])
+    # Two postings per role: same title, company and locations, different ids.
+    fake.missing = {job_id: f"text {int(job_id) // 2}" for job_id in fake.missing}
+    fake.cache[embedding_service.text_sha("text 0")] = [6.0]
+    stats = backfill.run_backfill(page_size=3)
+    assert stats["rows"] == stats["embedded"] == 8
+    assert sorted(fake.encoded) == ["text 1", "text 2", "text 3"]
+    assert stats["cache_hits"] == 2
+    assert stats["dedup_ratio"] == round(1 - 3 / 8, 4)
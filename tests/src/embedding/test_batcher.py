@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from src.embedding.batcher import EmbeddingBatcher
+
+
+class SlowEncoder:
+    def __init__(self, delay: float = 0.02):
+        self.batches: list[list[str]] = []
+        self.delay = delay
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return [[float(len(t))] for t in texts]
+
+
+def run_concurrently(fn, args):
+    results = [None] * len(args)
+
+    def call(i):
+        results[i] = fn(args[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(args))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_are_encoded_together():
+    encode = SlowEncoder()
+    batcher = EmbeddingBatcher(encode, max_batch=64, max_wait_ms=50)
+    texts = [f"query {'x' * i}" for i in range(16)]
+    results = run_concurrently(lambda t: batcher.encode([t])[0], texts)
+    assert results == [[float(len(t))] for t in texts]
+    assert len(encode.batches) < len(texts)
+    assert batcher.stats()["requests"] == len(texts)
+
+
+def test_batches_never_exceed_max_batch():
+    encode = SlowEncoder()
+    batcher = EmbeddingBatcher(encode, max_batch=4, max_wait_ms=50)
+    assert batcher.encode([str(i) for i in range(10)]) == [[float(len(str(i)))] for i in range(10)]
+    assert max(len(b) for b in encode.batches) <= 4
+
+
+def test_identical_texts_in_a_batch_are_encoded_once():
+    encode = SlowEncoder()
+    batcher = EmbeddingBatcher(encode, max_batch=8, max_wait_ms=50)
+    assert batcher.encode(["a", "a", "bb"]) == [[1.0], [1.0], [2.0]]
+    assert sorted(t for b in encode.batches for t in b) == ["a", "bb"]
+
+
+def test_errors_reach_every_caller_and_the_dispatcher_keeps_running():
+    calls = []
+
+    def encode(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("model failed")
+        return [[1.0] for _ in texts]
+
+    batcher = EmbeddingBatcher(encode, max_batch=8, max_wait_ms=20)
+    with pytest.raises(RuntimeError, match="model failed"):
+        batcher.encode(["a", "b"])
+    assert batcher.encode(["c"]) == [[1.0]]
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from src.embedding import embedding_service
+from src.embedding.onnx_backend import OnnxEncoder
+from src.settings import settings
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+
+
+@pytest.fixture(scope="module")
+def texts():
+    with SAMPLE_JOBS.open(encoding="utf-8") as fh:
+        jobs = [json.loads(line) for line in fh]
+    queries = ["ml engineer", "remote llm infrastructure", "computer vision research scientist in zurich"]
+    return queries + [f"{j['title']} at {j['company']}" for j in jobs]
+
+
+@pytest.fixture(scope="module")
+def torch_vectors(texts):
+    return np.array(embedding_service.load_model("torch").encode(texts, normalize_embeddings=True))
+
+
+def cosines(a, b):
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def test_onnx_matches_torch(texts, torch_vectors):
+    onnx = OnnxEncoder(settings.model_name).encode(texts, batch_size=4, normalize_embeddings=True)
+    assert onnx.shape == torch_vectors.shape
+    assert np.allclose(np.linalg.norm(onnx, axis=1), 1.0, atol=1e-5)
+    assert cosines(onnx, torch_vectors).min() > 0.999
+
+
+def test_quantized_onnx_stays_close_to_torch(texts, torch_vectors, tmp_path):
+    quantized = OnnxEncoder(settings.model_name, quantized=True, cache_dir=tmp_path)
+    vectors = quantized.encode(texts, normalize_embeddings=True)
+    assert cosines(vectors, torch_vectors).min() > 0.97
+    # Nearest neighbours mostly survive quantization.
+    torch_nn = (torch_vectors @ torch_vectors.T - 2 * np.eye(len(texts))).argmax(axis=1)
+    quant_nn = (vectors @ vectors.T - 2 * np.eye(len(texts))).argmax(axis=1)
+    assert (torch_nn == quant_nn).mean() > 0.9
+
+
+def test_unsupported_pooling_is_rejected():
+    with pytest.raises(ValueError):
+        OnnxEncoder._pooling_mode({"pooling_mode_max_tokens": True})
@@ -0,0 +1,126 @@
+import threading
+import time
+
+from src.embedding import embedding_service
+from src.embedding.query_cache import QueryEmbeddingCache, normalize_query
+from src.search import search_service
+
+
+class FakeEncoder:
+    def __init__(self, delay: float = 0.0):
+        self.calls: list[list[str]] = []
+        self.delay = delay
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class FakeStore:
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, key):
+        return self.rows.get(key)
+
+    def put(self, key, vec):
+        self.rows[key] = vec
+
+
+def test_normalize_query_collapses_whitespace():
+    assert normalize_query("  ml   engineer\tremote ") == "ml engineer remote"
+    assert normalize_query("ｍｌ engineer") == "ml engineer"
+
+
+def test_repeated_and_respaced_queries_hit_the_cache():
+    encode = FakeEncoder()
+    cache = QueryEmbeddingCache(encode, "m")
+    first = cache.get("ml engineer")
+    assert cache.get(" ml  engineer ") == first
+    assert encode.calls == [["ml engineer"]]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_lru_eviction_keeps_recently_used_queries():
+    encode = FakeEncoder()
+    cache = QueryEmbeddingCache(encode, "m", maxsize=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    cache.get("a")
+    cache.get("b")
+    assert encode.calls == [["a"], ["b"], ["c"], ["b"]]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    encode = FakeEncoder()
+    cache = QueryEmbeddingCache(encode, "m", ttl=10, clock=lambda: now[0])
+    cache.get("a")
+    now[0] = 9.9
+    cache.get("a")
+    now[0] = 10.0
+    cache.get("a")
+    assert len(encode.calls) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_keys_include_the_model_name():
+    store = FakeStore()
+    QueryEmbeddingCache(FakeEncoder(), "model-a", store=store).get("a")
+    encode = FakeEncoder()
+    QueryEmbeddingCache(encode, "model-b", store=store).get("a")
+    assert encode.calls == [["a"]]
+    assert len(store.rows) == 2
+
+
+def test_shared_store_serves_other_workers():
+    store = FakeStore()
+    QueryEmbeddingCache(FakeEncoder(), "m", store=store).get("a")
+    encode = FakeEncoder()
+    other = QueryEmbeddingCache(encode, "m", store=store)
+    assert other.get("a") == [1.0, 1.0]
+    assert encode.calls == []
+    assert other.stats()["store_hits"] == 1
+
+
+def test_store_failures_fall_back_to_the_model():
+    class BrokenStore:
+        def get(self, key):
+            raise RuntimeError("db down")
+
+        def put(self, key, vec):
+            raise RuntimeError("db down")
+
+    encode = FakeEncoder()
+    cache = QueryEmbeddingCache(encode, "m", store=BrokenStore())
+    assert cache.get("a") == [1.0, 1.0]
+    assert cache.stats()["store_errors"] == 2
+
+
+def test_concurrent_misses_share_one_model_call():
+    encode = FakeEncoder(delay=0.05)
+    cache = QueryEmbeddingCache(encode, "m")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("a"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert encode.calls == [["a"]]
+    assert results == [[1.0, 1.0]] * 8
+
+
+def test_paginating_a_search_embeds_the_query_once(mocker):
+    encode = FakeEncoder()
+    mocker.patch.object(embedding_service, "_query_cache", QueryEmbeddingCache(encode, "m"))
+    mocker.patch.object(search_service, "get_total_jobs_with_embeddings", return_value=100)
+    search = mocker.patch.object(search_service, "search_semantic", return_value=[])
+    for page in range(1, 6):
+        search_service.do_job_search({"q": "ml engineer", "page": page, "page_size": 20})
+    assert encode.calls == [["ml engineer"]]
+    assert search.call_count == 5
@@ -0,0 +1,177 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import psycopg2
+import psycopg2.errors
+from sqlalchemy import text
+from src.insertion import db_insertion_service, near_duplicates
+
+
+def make_row(**overrides):
+    row = {
+        "id": "job-1-id",
+        "source": "greenhouse",
+        "source_id": "1",
+        "company": "TestCo",
+        "title": "ML Engineer",
+        "locations": ["Remote"],
+        "posted_at": "2025-09-03T19:24:37-04:00",
+        "url": "https://example.test/jobs/1",
+        "description_html": "<p>Train models</p>",
+        "tags": ["Research"],
+    }
+    row.update(overrides)
+    return row
+
+
+def test_content_fingerprint_ignores_bookkeeping_fields():
+    base = make_row()
+    assert db_insertion_service.content_fingerprint(base) == db_insertion_service.content_fingerprint(
+        {**base, "is_active": False, "updated_at": "2030-01-01"}
+    )
+    assert db_insertion_service.content_fingerprint(base) != db_insertion_service.content_fingerprint(
+        make_row(title="Senior ML Engineer")
+    )
+
+
+def test_fingerprint_bands_ignore_company_spelling():
+    description = " ".join(f"word{i}" for i in range(40))
+    slug = near_duplicates.fingerprint_columns("scale-ai", "ML Engineer", description)
+    display = near_duplicates.fingerprint_columns("Scale AI, Inc.", "ML engineer", description)
+    assert slug == display
+    assert slug["company_key"] == "scaleai"
+
+
+def test_prepare_job_rows_keeps_the_latest_row_per_id():
+    rows = [
+        make_row(title="v2", updated_at="2025-09-02T00:00:00Z"),
+        make_row(id="other"),
+        make_row(title="v1", updated_at="2025-09-01T00:00:00+00:00"),
+        make_row(id="other", title="other v2"),
+    ]
+    values = db_insertion_service.prepare_job_rows(rows)
+    assert [(v["id"], v["title"]) for v in values] == [("job-1-id", "v2"), ("other", "other v2")]
+
+
+def test_prepare_job_rows_falls_back_to_posted_at_for_scraped_rows():
+    # Shaped like the scrapers' rows: no id (derived from dedupe_key) and no updated_at.
+    def scraped(title_suffix, posted_at):
+        row = make_row(description_html=f"<p>Train models {title_suffix}</p>", posted_at=posted_at)
+        del row["id"]
+        return row
+
+    rows = [
+        scraped("newer", datetime(2025, 9, 5, tzinfo=timezone.utc)),
+        scraped("older", datetime(2025, 9, 1, tzinfo=timezone.utc)),
+    ]
+    values = db_insertion_service.prepare_job_rows(rows)
+    assert len(values) == 1
+    assert values[0]["description_html"] == "<p>Train models newer</p>"
+    # Without either timestamp, input order decides.
+    values = db_insertion_service.prepare_job_rows([scraped("first", None), scraped("second", None)])
+    assert values[0]["description_html"] == "<p>Train models second</p>"
+
+
+def test_failing_rows_are_isolated_from_their_chunk(mocker):
+    mocker.patch.object(db_insertion_service.settings, "db_upsert_chunk_size", 4)
+    written = []
+
+    def upsert(values):
+        if any(v["id"] == "bad" for v in values):
+            raise psycopg2.DataError("invalid input syntax")
+        written.extend(v["id"] for v in values)
+        return {"inserted": len(values), "updated": 0, "unchanged": 0}
+
+    rows = [make_row(id=f"job-{i}") for i in range(6)] + [make_row(id="bad"), make_row(id="job-0")]
+    failed = []
+    counts = db_insertion_service._upsert_chunks(rows, upsert, failed)
+    assert counts == {"inserted": 6, "updated": 0, "unchanged": 0, "duplicates": 1, "failed": 1}
+    assert sorted(written) == [f"job-{i}" for i in range(6)]
+    assert [v["id"] for v in failed] == ["bad"]
+
+    def locked(values):
+        raise psycopg2.errors.LockNotAvailable("canceling statement due to lock timeout")
+
+    failed = []
+    counts = db_insertion_service._upsert_chunks(rows, locked, failed)
+    assert counts["failed"] == 7 and len(failed) == 7
+
+
+def test_insert_jobs_into_db_counts_and_skips_unchanged(session):
+    first = db_insertion_service.insert_jobs_into_db([make_row(), make_row(id="job-2-id", source_id="2")])
+    assert first == {"inserted": 2, "updated": 0, "unchanged": 0, "duplicates": 0, "failed": 0}
+
+    second = db_insertion_service.insert_jobs_into_db(
+        [make_row(title="Senior ML Engineer"), make_row(id="job-2-id", source_id="2")]
+    )
+    assert second == {"inserted": 0, "updated": 1, "unchanged": 1, "duplicates": 0, "failed": 0}
+
+    assert session.execute(text("SELECT title FROM jobs WHERE id = 'job-1-id'")).scalar() == "Senior ML Engineer"
+    details = session.execute(
+        text("SELECT description_text, source_payload FROM job_details WHERE job_id = 'job-1-id'")
+    ).one()
+    assert details == ("Train models", None)
+
+
+def test_bulk_insert_jobs_copy_path(session):
+    rows = [
+        make_row(id=f"job-{i}", source_id=str(i), tags=['quote " and \\ backslash', None], compensation={"min": i})
+        for i in range(5)
+    ]
+    assert db_insertion_service.bulk_insert_jobs(rows) == {"inserted": 5, "updated": 0, "unchanged": 0, "duplicates": 0, "failed": 0}
+
+    rows[0]["title"] = "Staff ML Engineer"
+    assert db_insertion_service.bulk_insert_jobs(rows) == {"inserted": 0, "updated": 1, "unchanged": 4, "duplicates": 0, "failed": 0}
+
+    stored = session.execute(
+        text("""
+            SELECT j.title, j.tags, d.compensation, j.locations, d.description_text
+            FROM jobs j JOIN job_details d ON d.job_id = j.id
+            WHERE j.id = 'job-0'
+        """)
+    ).one()
+    assert stored.title == "Staff ML Engineer"
+    assert stored.tags == ['quote " and \\ backslash', None]
+    assert stored.compensation == {"min": 0}
+    assert stored.description_text == "Train models"
+    assert stored.locations == ["Remote"]
+
+
+def test_deactivate_unseen_jobs_and_reactivate_on_return(session):
+    db_insertion_service.insert_jobs_into_db(
+        [make_row(), make_row(id="job-2-id", source_id="2"), make_row(id="other", company="OtherCo")]
+    )
+
+    assert db_insertion_service.deactivate_unseen_jobs("greenhouse", "testco", ["2"]) == 1
+    assert db_insertion_service.deactivate_unseen_jobs("greenhouse", "TestCo", []) == 0
+    active = session.execute(text("SELECT id FROM jobs WHERE is_active ORDER BY id")).scalars().all()
+    assert active == ["job-2-id", "other"]
+
+    # Same content, but the posting is back on the board.
+    assert db_insertion_service.insert_jobs_into_db([make_row()]) == {
+        "inserted": 0, "updated": 1, "unchanged": 0, "duplicates": 0, "failed": 0
+    }
+    assert session.execute(text("SELECT is_active FROM jobs WHERE id = 'job-1-id'")).scalar() is True
+
+
+def test_cross_posted_job_links_to_the_older_canonical(session):
+    sample = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+    description = json.loads(sample.read_text(encoding="utf-8").splitlines()[0])["description"]
+    db_insertion_service.insert_jobs_into_db([make_row(description_html=description)])
+    db_insertion_service.insert_jobs_into_db([
+        make_row(id="ashby-copy", source="ashby", url="https://example.test/other", locations=["London"],
+                 description_html=description + "<p>Apply today.</p>"),
+        make_row(id="other-role", source_id="2", title="Data Scientist", description_html=description),
+    ])
+    # The same role under the company's display name rather than its board slug.
+    db_insertion_service.insert_jobs_into_db([
+        make_row(id="display-name-copy", source="lever", company="TestCo, Inc.", url="https://example.test/lever/1",
+                 description_html=description),
+    ])
+
+    links = dict(session.execute(text("SELECT id, duplicate_of FROM jobs")).all())
+    assert links == {"job-1-id": None, "ashby-copy": "job-1-id", "other-role": None, "display-name-copy": "job-1-id"}
+
+    # Once the canonical posting is gone, its copy stands on its own.
+    db_insertion_service.deactivate_unseen_jobs("greenhouse", "TestCo", ["2"])
+    assert session.execute(text("SELECT duplicate_of FROM jobs WHERE id = 'ashby-copy'")).scalar() is None
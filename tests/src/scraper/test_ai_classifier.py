@@ -0,0 +1,52 @@
+import json
+import random
+from pathlib import Path
+
+from src.scrapers.ai_classifier import AIRoleClassifier
+from src.settings import AI_KEYWORD_PREFIXES, AI_KEYWORDS, AI_RE
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+
+
+def sample_postings():
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    postings = [(r["title"], r["description"]) for r in rows]
+    # Negatives: same descriptions with every keyword hit scrubbed out.
+    postings += [("Office Manager", AI_RE.sub("xx", desc)) for _, desc in postings]
+    return postings
+
+
+def test_every_keyword_has_literal_prefixes():
+    assert list(AI_KEYWORD_PREFIXES) == AI_KEYWORDS
+    for kw, literals in AI_KEYWORD_PREFIXES.items():
+        assert literals and all(lit == lit.lower() for lit in literals), kw
+
+
+def test_classifier_agrees_with_combined_regex():
+    classifier = AIRoleClassifier(AI_KEYWORDS, AI_KEYWORD_PREFIXES)
+    postings = sample_postings()
+    rng = random.Random(7)
+    words = ["ai", "aim", "maintain", "ML", "html", "Deep   learning", "deep", "LLMs", "applied\nscientist", "data"]
+    postings += [("", " ".join(rng.choices(words, k=6))) for _ in range(300)]
+
+    expected = [bool(AI_RE.search(f"{t}\n{d}")) for t, d in postings]
+    assert classifier.classify(postings) == expected
+    assert [classifier.matches(t, d) for t, d in postings] == expected
+
+
+def test_classify_maps_title_hits_to_the_right_posting():
+    classifier = AIRoleClassifier(AI_KEYWORDS, AI_KEYWORD_PREFIXES)
+    postings = [("Recruiter", ""), ("Staff ML Engineer", ""), ("Chef", ""), ("NLP Lead", ""), ("", "")]
+    assert classifier.classify(postings) == [False, True, False, True, False]
+
+
+def test_unfiltered_keywords_still_match():
+    classifier = AIRoleClassifier([r"[a-z]+ops\b"])
+    assert classifier.classify([("", "We run mlops"), ("", "nothing here")]) == [True, False]
+
+
+def test_overlapping_prefix_hits_are_all_confirmed():
+    # "ai" starts inside the rejected "dai" hit; a non-overlapping scan would skip past it.
+    classifier = AIRoleClassifier([r"daily", r"ai\b"], {r"daily": ("dai",), r"ai\b": ("ai",)})
+    assert classifier.classify([("", "dai"), ("", "dais")]) == [True, False]
@@ -0,0 +1,67 @@
+from sqlalchemy import text
+
+from src.scrapers import board_service
+
+
+def test_breaker_opens_after_threshold_and_closes_on_success(session, mocker):
+    mocker.patch.object(board_service.settings, "scrape_breaker_threshold", 2)
+    mocker.patch.object(board_service.settings, "scrape_breaker_cooldown", 60)
+
+    first = board_service.record_board_failure("greenhouse", "flaky", "ReadTimeout: ")
+    assert first["consecutive_failures"] == 1 and first["circuit_open_until"] is None
+    second = board_service.record_board_failure("greenhouse", "flaky", "ReadTimeout: ")
+    assert second["consecutive_failures"] == 2 and second["circuit_open_until"] is not None
+
+    state = board_service.load_board_states()[("greenhouse", "flaky")]
+    assert board_service.circuit_open(state)
+
+    board_service.save_board_states([{
+        "source": "greenhouse", "board": "flaky", "etag": None, "last_modified": None,
+        "body_hash": "abc", "changed": True, "high_water_mark": None, "known_source_ids": None,
+    }])
+    state = board_service.load_board_states()[("greenhouse", "flaky")]
+    assert state["consecutive_failures"] == 0
+    assert not board_service.circuit_open(state)
+
+
+def _state(board, body_hash):
+    return {
+        "source": "greenhouse", "board": board, "etag": None, "last_modified": None,
+        "body_hash": body_hash, "changed": True, "high_water_mark": None, "known_source_ids": None,
+    }
+
+
+def test_registry_seeds_once_and_cadence_adapts(session, mocker):
+    mocker.patch.object(board_service.settings, "scrape_interval", 3600)
+    mocker.patch.object(board_service.settings, "scrape_min_interval", 1000)
+    mocker.patch.object(board_service.settings, "scrape_max_interval", 6000)
+
+    board_service.ensure_registry([("greenhouse", "busy"), ("greenhouse", "quiet")])
+    board_service.ensure_registry([("greenhouse", "ignored")])
+    assert board_service.due_boards() == [("greenhouse", "busy"), ("greenhouse", "quiet")]
+
+    board_service.save_board_states([_state("busy", "v1"), _state("quiet", "v1")])
+    assert board_service.due_boards() == []
+    assert len(board_service.due_boards(all_boards=True)) == 2
+
+    # busy changes every run; quiet only changed on its first fetch (3600 / 2 * 1.5 * 1.5).
+    board_service.save_board_states([_state("busy", "v2"), _state("quiet", "v1")])
+    board_service.save_board_states([_state("busy", "v3"), _state("quiet", "v1")])
+    intervals = {b["board"]: b["scrape_interval"] for b in board_service.list_boards()}
+    assert intervals == {"busy": 1000, "quiet": 4050}
+
+
+def test_remove_board_disables_it_and_retires_postings(session):
+    board_service.add_board("greenhouse", "acme", min_interval=600)
+    session.execute(text(
+        "INSERT INTO jobs (id, source, source_id, company, title) VALUES ('j1', 'greenhouse', '1', 'acme', 'ML')"
+    ))
+
+    assert board_service.remove_board("greenhouse", "acme")
+    assert not board_service.remove_board("greenhouse", "missing")
+    assert board_service.due_boards(all_boards=True) == []
+    assert session.execute(text("SELECT is_active FROM jobs WHERE id = 'j1'")).scalar() is False
+
+    readded = board_service.add_board("greenhouse", "acme")
+    assert readded["enabled"] and readded["min_interval"] is None
+    assert board_service.update_board("greenhouse", "acme", scrape_interval=1200)["scrape_interval"] == 1200
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from src.scrapers import scraper_service
+from src.scrapers.fetch_engine import FetchEngine, TokenBucket
+
+BOARD_DELAY = 0.3
+
+
+class StubBoardHandler(BaseHTTPRequestHandler):
+    """Serves a tiny Greenhouse-shaped board for every /<board>/jobs path after a fixed delay."""
+
+    def do_GET(self):
+        time.sleep(BOARD_DELAY)
+        board = self.path.strip("/").split("/")[0]
+        etag = f'"{board}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps({
+            "jobs": [
+                {
+                    "id": f"{board}-1",
+                    "title": "Machine Learning Engineer",
+                    "location": {"name": "Remote"},
+                    "content": "<p>Train models</p>",
+                    "absolute_url": f"http://example.test/{board}/1",
+                    "updated_at": "2025-09-03T19:24:37-04:00",
+                },
+                {
+                    "id": f"{board}-2",
+                    "title": "Office Manager",
+                    "location": {"name": "Remote"},
+                    "content": "<p>Run the office</p>",
+                },
+            ]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBoardHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Two tokens are banked, the next two wait 1/20 s each.
+    elapsed = asyncio.run(run())
+    assert 0.08 <= elapsed < 0.5
+
+
+def test_fetch_greenhouse_boards_concurrently(stub_server, mocker):
+    boards = ["alpha", "beta", "gamma", "delta"]
+    mocker.patch.object(scraper_service.settings, "greenhouse_api_url", stub_server)
+    mocker.patch.object(scraper_service.settings, "sleep_between_calls", 0.01)
+
+    start = time.monotonic()
+    rows = scraper_service.fetch_greenhouse(boards)
+    elapsed = time.monotonic() - start
+
+    assert sorted(r["source_id"] for r in rows) == sorted(f"{b}-1" for b in boards)
+    assert all(r["source"] == "greenhouse" for r in rows)
+    # Sequential fetching would take len(boards) * BOARD_DELAY.
+    assert elapsed < BOARD_DELAY * len(boards) * 0.75
+
+
+def test_fetch_engine_respects_global_concurrency(stub_server):
+    async def run():
+        async with FetchEngine(concurrency=1, rate_per_host=0) as engine:
+            start = time.monotonic()
+            await asyncio.gather(*(engine.get_json(f"{stub_server}/{b}/jobs") for b in ("a", "b")))
+            return time.monotonic() - start
+
+    assert asyncio.run(run()) >= BOARD_DELAY * 2
+
+
+def test_throttled_host_does_not_hold_fetch_slots_from_other_hosts(stub_server):
+    other = ThreadingHTTPServer(("127.0.0.1", 0), StubBoardHandler)
+    threading.Thread(target=other.serve_forever, daemon=True).start()
+    other_url = f"http://127.0.0.1:{other.server_address[1]}"
+
+    async def timed(coro):
+        start = time.monotonic()
+        await coro
+        return time.monotonic() - start
+
+    async def run():
+        # One token per 0.5 s on each host: the six throttled boards need about 2.5 s.
+        async with FetchEngine(concurrency=2, rate_per_host=2, burst_per_host=1) as engine:
+            throttled = [timed(engine.get_json(f"{stub_server}/t{i}/jobs")) for i in range(6)]
+            return await asyncio.gather(*throttled, timed(engine.get_json(f"{other_url}/free/jobs")))
+
+    try:
+        *throttled, free = asyncio.run(run())
+    finally:
+        other.shutdown()
+        other.server_close()
+    assert max(throttled) >= 2.5
+    assert free < BOARD_DELAY * 2
+
+
+def test_get_board_conditional_requests(stub_server):
+    async def run():
+        async with FetchEngine(rate_per_host=0) as engine:
+            url = f"{stub_server}/alpha/jobs"
+            first = await engine.get_board(url)
+            revalidated = await engine.get_board(url, validators={"etag": first.etag})
+            # Server ignores the (wrong) etag, but the body hash still matches.
+            rehashed = await engine.get_board(url, validators={"etag": '"stale"', "body_hash": first.body_hash})
+            return first, revalidated, rehashed
+
+    first, revalidated, rehashed = asyncio.run(run())
+    assert not first.not_modified
+    assert first.etag == '"alpha-v1"'
+    assert len(first.data["jobs"]) == 2
+
+    assert revalidated.status_code == 304
+    assert revalidated.not_modified and revalidated.data is None
+    assert revalidated.etag == first.etag
+
+    assert rehashed.status_code == 200
+    assert rehashed.not_modified and rehashed.data is None
+
+
+def test_get_retries_with_retry_after_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(503, headers={"Retry-After": "0.2"})
+        if len(calls) == 2:
+            raise httpx.ConnectError("connection reset", request=request)
+        return httpx.Response(200, json={"jobs": []})
+
+    async def run():
+        engine = FetchEngine(rate_per_host=0, transport=httpx.MockTransport(handler), max_retries=3, backoff_base=0.01)
+        async with engine:
+            return await engine.get_json("http://boards.test/acme/jobs"), engine.retries
+
+    data, retries = asyncio.run(run())
+    assert data == {"jobs": []}
+    assert retries == 2
+    assert calls[1] - calls[0] >= 0.2
+
+
+def test_get_gives_up_after_max_retries_and_on_long_retry_after():
+    def always_failing(request):
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    def rate_limited(request):
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    async def run(handler):
+        engine = FetchEngine(rate_per_host=0, transport=httpx.MockTransport(handler), max_retries=2, backoff_base=0.01)
+        async with engine:
+            try:
+                return await engine.get("http://boards.test/acme/jobs"), engine.retries
+            except httpx.ConnectTimeout:
+                return None, engine.retries
+
+    assert asyncio.run(run(always_failing)) == (None, 2)
+    resp, retries = asyncio.run(run(rate_limited))
+    assert resp.status_code == 429 and retries == 0
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.insertion import db_insertion_service
+from src.scrapers import http_fixtures, scraper_service
+from src.scrapers.fetch_engine import FetchEngine
+from src.scrapers.http_fixtures import RecordingTransport, ReplayTransport
+
+PAYLOAD = {
+    "jobs": [
+        {"id": 1, "title": "Machine Learning Engineer", "content": "<p>Train models</p>",
+         "absolute_url": "https://boards.example.com/acme/jobs/1"},
+        {"id": 2, "title": "Office Manager", "content": "<p>Run the office</p>",
+         "absolute_url": "https://boards.example.com/acme/jobs/2?gh_src=x"},
+    ]
+}
+
+
+def live_board(request: httpx.Request) -> httpx.Response:
+    if request.headers.get("If-None-Match"):
+        return httpx.Response(304)
+    return httpx.Response(200, json=PAYLOAD, headers={"ETag": '"v1"', "Server": "stub"})
+
+
+def fetch_acme(transport: httpx.AsyncBaseTransport, validators=None):
+    spec = scraper_service.greenhouse_spec("acme")
+
+    async def run():
+        async with FetchEngine(rate_per_host=0, transport=transport) as engine:
+            return await engine.get_board(spec.url, params=spec.params, validators=validators)
+
+    return asyncio.run(run())
+
+
+def test_record_then_replay_offline(tmp_path):
+    recorded = fetch_acme(RecordingTransport(tmp_path, inner=httpx.MockTransport(live_board)))
+    # Recording strips validators so a full body is always captured.
+    fetch_acme(RecordingTransport(tmp_path, inner=httpx.MockTransport(live_board)), validators={"etag": '"v1"'})
+    files = list(tmp_path.glob("*.json.gz"))
+    assert len(files) == 1 and "acme_jobs" in files[0].name
+
+    fixture = http_fixtures.read_fixture(files[0])
+    assert fixture["headers"] == {"content-type": "application/json", "etag": '"v1"'}
+    assert json.loads(fixture["body"]) == PAYLOAD
+
+    replayed = fetch_acme(ReplayTransport(tmp_path))
+    assert replayed.data == recorded.data == PAYLOAD
+    assert replayed.body_hash == recorded.body_hash
+    assert fetch_acme(ReplayTransport(tmp_path), validators={"etag": '"v1"'}).status_code == 304
+
+
+def test_replay_amplifies_postings(tmp_path):
+    spec = scraper_service.greenhouse_spec("acme")
+    http_fixtures.save_payload(tmp_path, spec.url, spec.params, PAYLOAD, etag='"v1"')
+
+    resp = fetch_acme(ReplayTransport(tmp_path, amplify=3))
+    assert [j["id"] for j in resp.data["jobs"]] == [1, 2, "1~1", "2~1", "1~2", "2~2"]
+    assert resp.etag == '"v1"-x3'
+    rows = scraper_service.parse_greenhouse_board("acme", resp.data)
+    assert sorted(r["source_id"] for r in rows) == ["1", "1~1", "1~2"]
+
+
+def test_amplified_postings_ingest_as_distinct_jobs():
+    factor = 5
+    postings = [
+        {"id": i, "title": "Research Engineer", "content": "<p>LLM work</p>",
+         "location": {"name": "Remote"}, "absolute_url": f"https://boards.example.com/acme/jobs/{i}"}
+        for i in range(4)
+    ]
+    data = http_fixtures.amplify_payload({"jobs": postings}, factor)
+    assert data["jobs"][4]["absolute_url"] == "https://boards.example.com/acme/jobs/0?copy=1"
+    rows = scraper_service.parse_greenhouse_board("acme", data)
+    assert len(rows) == factor * len(postings)
+    values = db_insertion_service.prepare_job_rows(rows)
+    assert len({v["id"] for v in values}) == len(values) == factor * len(postings)
+
+
+def test_replay_without_fixture_fails_the_board(tmp_path):
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        fetch_acme(ReplayTransport(tmp_path))
+    assert excinfo.value.response.status_code == 404
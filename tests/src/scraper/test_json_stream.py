@@ -0,0 +1,61 @@
+import io
+import json
+import pytest
+from src.scrapers import json_stream, scraper_service
+
+
+def _payload(n):
+    return {
+        "meta": {"board": "acme", "tags": ["a", {"b": [1, 2.5e3]}]},
+        "count": 12345678901234567890,
+        "jobs": [
+            {"id": str(i), "title": f"ML Engineer {i} — Zürich ✨", "content": "<p>machine learning</p>" * i}
+            for i in range(n)
+        ],
+        "trailing": None,
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+def test_iter_array_items_matches_json_loads(chunk_size):
+    payload = _payload(25)
+    fh = io.BytesIO(json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8"))
+    assert list(json_stream.iter_array_items(fh, chunk_size=chunk_size)) == payload["jobs"]
+
+
+@pytest.mark.parametrize("body", [b"{}", b'{"jobs": []}', b'{"other": [1, 2]}'])
+def test_iter_array_items_empty(body):
+    assert list(json_stream.iter_array_items(io.BytesIO(body), chunk_size=2)) == []
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"jobs": [], "jobPostings": [{"id": "1"}, {"id": "2"}]},
+        {"postings": [{"id": "3"}], "meta": {"n": 1}, "jobPostings": [{"id": "1"}, {"id": "2"}]},
+        {"postings": [{"id": "3"}], "jobs": None, "jobPostings": [{"id": "1"}, {"id": "2"}]},
+        {"postings": [{"id": "3"}]},
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 64 * 1024])
+def test_iter_array_items_picks_the_first_non_empty_key_in_priority_order(payload, chunk_size):
+    keys = ("jobs", "jobPostings", "postings")
+    expected = payload.get("jobs") or payload.get("jobPostings") or payload.get("postings")
+    fh = io.BytesIO(json.dumps(payload).encode("utf-8"))
+    assert list(json_stream.iter_array_items(fh, keys, chunk_size=chunk_size)) == expected
+
+
+def test_iter_array_items_rejects_truncated_payload():
+    body = json.dumps(_payload(5)).encode("utf-8")[:-40]
+    with pytest.raises(ValueError):
+        list(json_stream.iter_array_items(io.BytesIO(body), chunk_size=16))
+
+
+def test_streamed_rows_match_dict_rows():
+    payload = _payload(10)
+    payload["jobs"][0].update(title="Office Manager", content="")
+    from_dict = scraper_service.parse_greenhouse_board("acme", payload)
+    streamed = list(scraper_service.iter_greenhouse_rows("acme", io.BytesIO(json.dumps(payload).encode("utf-8"))))
+    assert streamed == from_dict
+    assert len(streamed) == 9
+    assert streamed[0]["source_payload"] == {k: v for k, v in payload["jobs"][1].items() if k != "content"}
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.scrapers import pipeline, scraper_service
+from src.scrapers.fetch_engine import FetchEngine
+
+JOBS_PER_BOARD = 7
+
+
+class StubBoardHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        board = self.path.strip("/").split("/")[0]
+        if board == "broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({
+            "jobs": [
+                {"id": f"{board}-{i}", "title": "Research Engineer", "content": "<p>LLM work</p>"}
+                for i in range(JOBS_PER_BOARD)
+            ]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(mocker):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBoardHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mocker.patch.object(scraper_service.settings, "greenhouse_api_url", f"http://127.0.0.1:{server.server_address[1]}")
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_pipeline_chunks_rows_and_saves_board_states(stub_server, mocker):
+    inserted_chunks = []
+
+    def fake_insert(rows, failed):
+        inserted_chunks.append([r["source_id"] for r in rows])
+        return {"inserted": len(rows), "updated": 0, "unchanged": 0, "duplicates": 0, "failed": 0}
+
+    mocker.patch.object(pipeline.db_insertion_service, "insert_jobs_into_db", side_effect=fake_insert)
+    save_states = mocker.patch.object(pipeline.board_service, "save_board_states")
+    deactivate = mocker.patch.object(pipeline.db_insertion_service, "deactivate_unseen_jobs", return_value=0)
+    record_failure = mocker.patch.object(
+        pipeline.board_service, "record_board_failure",
+        return_value={"consecutive_failures": 1, "circuit_open_until": None},
+    )
+    embed = mocker.patch.object(pipeline.embedding_service, "embed_data")
+
+    boards = ["a", "b", "broken", "c", "tripped"]
+    specs = [scraper_service.greenhouse_spec(b) for b in boards]
+    states = {("greenhouse", "tripped"): {"circuit_open_until": datetime.now(timezone.utc) + timedelta(hours=1)}}
+    stats = asyncio.run(pipeline.run_pipeline(
+        specs, states, queue_size=1, chunk_size=5,
+        engine=FetchEngine(concurrency=2, rate_per_host=0, max_retries=2, backoff_base=0.01),
+    ))
+
+    assert stats["inserted"] == 3 * JOBS_PER_BOARD
+    assert stats["boards_changed"] == 3
+    assert stats["boards_failed"] == 1
+    assert stats["boards_circuit_open"] == 1
+    assert stats["retries"] == 2
+    assert record_failure.call_args.args[:2] == ("greenhouse", "broken")
+    assert all(len(chunk) <= 5 for chunk in inserted_chunks)
+    assert sorted(i for chunk in inserted_chunks for i in chunk) == sorted(
+        f"{b}-{i}" for b in ("a", "b", "c") for i in range(JOBS_PER_BOARD)
+    )
+    saved = sorted(s["board"] for call in save_states.call_args_list for s in call.args[0])
+    assert saved == ["a", "b", "c"]
+    swept = {call.args[1]: call.args[2] for call in deactivate.call_args_list}
+    assert swept == {b: sorted(f"{b}-{i}" for i in range(JOBS_PER_BOARD)) for b in ("a", "b", "c")}
+    assert embed.called
+
+
+def test_board_with_failed_rows_keeps_its_previous_state(stub_server, mocker):
+    def fake_insert(rows, failed):
+        bad = [r for r in rows if r["company"] == "b"]
+        failed.extend(bad)
+        return {"inserted": len(rows) - len(bad), "updated": 0, "unchanged": 0, "duplicates": 0, "failed": len(bad)}
+
+    mocker.patch.object(pipeline.db_insertion_service, "insert_jobs_into_db", side_effect=fake_insert)
+    save_states = mocker.patch.object(pipeline.board_service, "save_board_states")
+    deactivate = mocker.patch.object(pipeline.db_insertion_service, "deactivate_unseen_jobs", return_value=0)
+    mocker.patch.object(pipeline.embedding_service, "embed_data")
+
+    specs = [scraper_service.greenhouse_spec(b) for b in ("a", "b")]
+    stats = asyncio.run(pipeline.run_pipeline(specs, {}, chunk_size=5, engine=FetchEngine(rate_per_host=0)))
+
+    assert stats["rows_failed"] == JOBS_PER_BOARD
+    assert (stats["boards_changed"], stats["boards_failed"]) == (1, 1)
+    assert [s["board"] for call in save_states.call_args_list for s in call.args[0]] == ["a"]
+    assert [call.args[1] for call in deactivate.call_args_list] == ["a"]
+
+
+def test_watermark_skips_known_postings_below_the_mark():
+    state = {
+        "high_water_mark": datetime(2025, 9, 1, tzinfo=timezone.utc),
+        "known_source_ids": ["1", "2"],
+    }
+    data = {"jobs": [
+        {"id": 1, "title": "ML Engineer", "updated_at": "2025-08-01T00:00:00Z"},   # known, old: skipped
+        {"id": 2, "title": "ML Engineer", "updated_at": "2025-09-02T10:00:00Z"},   # known, updated
+        {"id": 3, "title": "ML Engineer", "updated_at": "2025-08-01T00:00:00Z"},   # new id
+    ]}
+
+    watermark = pipeline.BoardWatermark.from_state(state)
+    rows = scraper_service.parse_greenhouse_board("acme", data, watermark)
+    assert [r["source_id"] for r in rows] == ["2", "3"]
+    assert watermark.skipped == 1
+    assert watermark.next_mark() == datetime(2025, 9, 2, 10, tzinfo=timezone.utc)
+    assert watermark.seen_ids == {"1", "2", "3"}
+
+    full = pipeline.BoardWatermark.from_state(state, full_refresh=True)
+    assert len(scraper_service.parse_greenhouse_board("acme", data, full)) == 3
@@ -0,0 +1,64 @@
+import threading
+
+from src.scrapers import scraper_service
+from src.scrapers.run_service import RunRegistry
+
+
+def test_registry_runs_in_background_and_dedupes_triggers():
+    release = threading.Event()
+
+    def fake_scrape(full_refresh, progress, min_gap=None):
+        progress.boards_planned([scraper_service.greenhouse_spec("acme")])
+        progress.board_status("greenhouse", "acme", "changed", rows=3)
+        progress.stage_time("fetch", 0.25)
+        release.wait(5)
+        progress.board_status("greenhouse", "acme", "ingested")
+        return {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    registry = RunRegistry(target=fake_scrape)
+    run, created = registry.submit()
+    again, created_again = registry.submit(full_refresh=True)
+    assert created and not created_again
+    assert again is run
+    assert registry.active() is run
+
+    release.set()
+    events = list(run.events(keepalive=5))
+    assert events[-1].startswith("event: progress")
+
+    snap = run.snapshot()
+    assert snap["status"] == "succeeded"
+    assert snap["stats"]["inserted"] == 3
+    assert snap["stage_seconds"] == {"fetch": 0.25}
+    assert snap["boards"] == [{"source": "greenhouse", "board": "acme", "status": "ingested", "rows": 3}]
+    assert registry.active() is None
+
+    # A finished run no longer blocks a new one.
+    second, created = registry.submit()
+    assert created and second is not run
+    list(second.events(keepalive=5))
+    assert [r.run_id for r in registry.recent()][:2] == [second.run_id, run.run_id]
+
+
+def test_failed_run_reports_error():
+    def broken_scrape(full_refresh, progress, min_gap=None):
+        raise RuntimeError("database unavailable")
+
+    registry = RunRegistry(target=broken_scrape)
+    run, _ = registry.submit()
+    list(run.events(keepalive=5))
+
+    snap = run.snapshot()
+    assert snap["status"] == "failed"
+    assert snap["error"] == "RuntimeError: database unavailable"
+
+
+def test_skipped_run_is_terminal():
+    def locked_out(full_refresh, progress, min_gap=None):
+        raise scraper_service.ScrapeSkipped("another process is already scraping")
+
+    registry = RunRegistry(target=locked_out)
+    run, _ = registry.submit()
+    list(run.events(keepalive=5))
+    assert run.snapshot()["status"] == "skipped"
+    assert registry.last_finished() is run
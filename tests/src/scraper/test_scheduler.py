@@ -0,0 +1,33 @@
+import threading
+
+from src.scrapers.run_service import RunRegistry
+from src.scrapers.scheduler import ScrapeScheduler
+
+
+def test_scheduler_submits_runs_every_interval_with_min_gap():
+    calls = []
+    fired = threading.Event()
+
+    def fake_scrape(full_refresh, progress, min_gap=None):
+        calls.append((progress.trigger, min_gap))
+        if len(calls) >= 2:
+            fired.set()
+        return {}
+
+    scheduler = ScrapeScheduler(registry=RunRegistry(target=fake_scrape), interval=0.05, jitter=0.2)
+    scheduler.start()
+    try:
+        assert fired.wait(5)
+        assert scheduler.describe()["next_run_at"] is not None
+    finally:
+        scheduler.stop()
+
+    assert not scheduler.running
+    assert calls[:2] == [("scheduled", 0.025), ("scheduled", 0.025)]
+
+
+def test_next_delay_stays_within_jitter():
+    scheduler = ScrapeScheduler(registry=RunRegistry(), interval=100, jitter=0.1)
+    delays = [scheduler.next_delay() for _ in range(200)]
+    assert all(90 <= d <= 110 for d in delays)
+    assert len(set(delays)) > 1
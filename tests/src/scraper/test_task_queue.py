@@ -0,0 +1,98 @@
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import text
+
+from src.scrapers import queue_worker, task_queue
+from src.scrapers.task_queue import ClaimedTask
+
+
+def test_claim_lease_expiry_and_retry(session, mocker):
+    mocker.patch.object(task_queue.settings, "scrape_task_max_attempts", 2)
+    assert task_queue.enqueue_boards([("greenhouse", "acme"), ("ashby", "beta")]) == 2
+    # An open task per board already exists.
+    assert task_queue.enqueue_boards([("greenhouse", "acme")]) == 0
+
+    first = task_queue.claim_tasks("worker-a", limit=1)
+    second = task_queue.claim_tasks("worker-b", limit=5)
+    assert len(first) == 1 and len(second) == 1
+    assert {first[0].board, second[0].board} == {"acme", "beta"}
+    assert task_queue.claim_tasks("worker-c") == []
+
+    assert task_queue.complete_task(second[0].id, "worker-b", {"inserted": 3})
+    assert task_queue.heartbeat(first[0].id, "worker-a")
+    assert not task_queue.heartbeat(first[0].id, "worker-b")
+
+    # worker-a dies: once its lease lapses the task is claimed again.
+    session.execute(text("UPDATE scrape_tasks SET lease_expires_at = now() - interval '1 minute' WHERE id = :id"),
+                    {"id": first[0].id})
+    reclaimed = task_queue.claim_tasks("worker-c")
+    assert [t.id for t in reclaimed] == [first[0].id] and reclaimed[0].attempts == 2
+    assert not task_queue.complete_task(first[0].id, "worker-a", {})
+
+    # Out of attempts: the failure is final.
+    assert task_queue.fail_task(first[0].id, "worker-c", "ReadTimeout") == "failed"
+    assert task_queue.open_task_count() == 0
+
+
+def fake_board_locks(busy=()):
+    @contextmanager
+    def locks(boards):
+        yield {b for b in boards if b not in busy}
+    return locks
+
+
+def test_run_worker_completes_and_fails_tasks(mocker):
+    tasks = [
+        ClaimedTask(id=1, source="greenhouse", board="ok", full_refresh=False, attempts=1, max_attempts=3),
+        ClaimedTask(id=2, source="greenhouse", board="down", full_refresh=False, attempts=1, max_attempts=3),
+    ]
+    mocker.patch.object(queue_worker.task_queue, "claim_tasks", side_effect=[[tasks[0]], [tasks[1]], []])
+    mocker.patch.object(queue_worker.task_queue, "open_task_count", return_value=0)
+    complete = mocker.patch.object(queue_worker.task_queue, "complete_task", return_value=True)
+    fail = mocker.patch.object(queue_worker.task_queue, "fail_task", return_value="pending")
+
+    async def fake_process(task, owner):
+        return {"boards_failed": int(task.board == "down"), "inserted": 1}
+
+    mocker.patch.object(queue_worker, "process_task", side_effect=fake_process)
+    mocker.patch.object(queue_worker.board_service, "board_locks", side_effect=fake_board_locks())
+
+    assert queue_worker.run_worker(drain=True) == 2
+    assert complete.call_args.args[0] == 1
+    assert fail.call_args.args[0] == 2
+
+
+def test_run_worker_defers_tasks_for_boards_locked_by_another_scraper(mocker):
+    task = ClaimedTask(id=7, source="greenhouse", board="busy", full_refresh=False, attempts=1, max_attempts=3)
+    mocker.patch.object(queue_worker.task_queue, "claim_tasks", side_effect=[[task], []])
+    mocker.patch.object(queue_worker.task_queue, "open_task_count", return_value=0)
+    defer = mocker.patch.object(queue_worker.task_queue, "defer_task", return_value=True)
+    process = mocker.patch.object(queue_worker, "process_task")
+    mocker.patch.object(queue_worker.board_service, "board_locks",
+                        side_effect=fake_board_locks(busy={("greenhouse", "busy")}))
+
+    assert queue_worker.run_worker(drain=True) == 0
+    assert defer.call_args.args[0] == 7
+    process.assert_not_called()
+
+
+def test_polling_worker_embeds_when_the_queue_goes_idle(mocker):
+    tasks = [
+        ClaimedTask(id=i, source="greenhouse", board=f"b{i}", full_refresh=False, attempts=1, max_attempts=3)
+        for i in (1, 2)
+    ]
+    # Idle twice after the first task: only the first idle poll has new rows to embed.
+    mocker.patch.object(queue_worker.task_queue, "claim_tasks", side_effect=[[tasks[0]], [], [], [tasks[1]]])
+    mocker.patch.object(queue_worker.task_queue, "complete_task", return_value=True)
+    mocker.patch.object(queue_worker.time, "sleep")
+
+    async def fake_process(task, owner):
+        return {"boards_failed": 0, "inserted": 1}
+
+    mocker.patch.object(queue_worker, "process_task", side_effect=fake_process)
+    mocker.patch.object(queue_worker.board_service, "board_locks", side_effect=fake_board_locks())
+    mocker.patch.object(queue_worker.embedding_service, "embed_lock", side_effect=lambda: nullcontext(True))
+    embed = mocker.patch.object(queue_worker.embedding_service, "embed_data")
+
+    assert queue_worker.run_worker(max_tasks=2, embed=True) == 2
+    embed.assert_called_once()
@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+from src.api.api import app
+from src.auth import deps as auth_deps
+from src.embedding import embedding_service
+from src.embedding.query_cache import QueryEmbeddingCache
+
+
+def test_query_cache_stats_require_an_admin(mocker):
+    client = TestClient(app)
+    assert client.get("/search/cache").status_code == 401
+
+    mocker.patch.object(embedding_service, "_query_cache", QueryEmbeddingCache(lambda texts: [[0.0]], "m"))
+    app.dependency_overrides[auth_deps.require_admin] = lambda: object()
+    try:
+        resp = client.get("/search/cache")
+    finally:
+        app.dependency_overrides.clear()
+    assert resp.status_code == 200
+    assert resp.json()["model_name"] == "m"
@@ -0,0 +1,48 @@
+import html
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from src.text.html_text import html_to_text
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+
+
+def legacy_strip_html(text):
+    """The regex implementation the scraper used before html_to_text."""
+    if not text:
+        return ""
+    no_tags = re.sub(r"<[^>]+>", " ", text)
+    return html.unescape(re.sub(r"\s+", " ", no_tags)).strip()
+
+
+def sample_descriptions():
+    with SAMPLE_JOBS.open(encoding="utf-8") as f:
+        return [json.loads(line)["description"] for line in f if line.strip()]
+
+
+def test_parity_with_legacy_output_on_sample_corpus():
+    for desc in sample_descriptions():
+        assert html_to_text(desc).split() == legacy_strip_html(desc).split()
+        assert html_to_text(desc, preserve_blocks=False) == " ".join(legacy_strip_html(desc).split())
+
+
+def test_keeps_paragraph_and_list_boundaries():
+    raw = "<h2>About</h2><p>We build <b>safe</b> AI.</p><ul><li>Python</li><li>Rust &amp; C++</li></ul>Thanks<br/>Team"
+    assert html_to_text(raw) == "About\nWe build safe AI.\nPython\nRust & C++\nThanks\nTeam"
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("&lt;p&gt;Escaped &amp;amp; markup&lt;/p&gt;&lt;p&gt;Second&lt;/p&gt;", "Escaped & markup\nSecond"),
+        ("<style>p { color: red }</style><p>Body</p><script>var a = '<p>';</script>", "Body"),
+        ("<!-- note --><p>a&nbsp;b</p><pre>x</pre><param name='q'>", "a b\nx"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_edge_cases(raw, expected):
+    assert html_to_text(raw) == expected
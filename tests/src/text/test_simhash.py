@@ -0,0 +1,69 @@
+import json
+import random
+from pathlib import Path
+
+from src.settings import settings
+from src.text import simhash
+from src.text.html_text import html_to_text
+
+SAMPLE_JOBS = Path(__file__).resolve().parents[3] / "src" / "sample_jobs.jsonl"
+
+
+def sample_descriptions():
+    with SAMPLE_JOBS.open(encoding="utf-8") as fh:
+        return [html_to_text(json.loads(line).get("description")) for line in fh]
+
+
+def test_shingles_normalize_case_punctuation_and_spacing():
+    assert simhash.shingles("Build  the, MODEL now") == simhash.shingles("build the model\nnow!")
+    assert simhash.shingles("build the model now") == {"build the model", "the model now"}
+    assert simhash.shingles("") == set()
+
+
+def test_company_key_folds_case_punctuation_and_legal_suffixes():
+    assert simhash.company_key("Scale AI, Inc.") == simhash.company_key("scale-ai") == "scaleai"
+    assert simhash.company_key("Acme GmbH") == simhash.company_key("ACME Corp") == "acme"
+    # A name that is only a suffix word is kept.
+    assert simhash.company_key("Co") == "co"
+    assert simhash.company_key(None) == ""
+
+
+def test_short_texts_are_not_fingerprinted():
+    assert simhash.simhash("ML Engineer") is None
+    assert simhash.band_keys(None, "acme") is None
+
+
+def test_fingerprint_fits_bigint_and_bands_reassemble():
+    fp = simhash.simhash(sample_descriptions()[0])
+    assert -(2 ** 63) <= fp < 2 ** 63
+    unsigned = 0
+    for band in simhash.bands(fp):
+        unsigned = (unsigned << 8) | band
+    assert unsigned == fp & (2 ** 64 - 1)
+
+
+def test_band_keys_are_scoped():
+    fp = simhash.simhash(sample_descriptions()[0])
+    keys = simhash.band_keys(fp, "acme\x1fml engineer")
+    assert len(keys) == simhash.BANDS and all(-(2 ** 31) <= k < 2 ** 31 for k in keys)
+    assert not set(keys) & set(simhash.band_keys(fp, "acme\x1fdata scientist"))
+
+
+def test_reposted_descriptions_are_within_the_dedupe_distance():
+    for desc in sample_descriptions():
+        fp = simhash.simhash(desc)
+        reposted = simhash.simhash(desc.replace("the", "a", 2) + " Apply via our careers page today.")
+        assert simhash.hamming(fp, simhash.simhash(desc.upper())) == 0
+        assert simhash.hamming(fp, reposted) <= settings.dedupe_max_distance
+
+
+def test_pairs_closer_than_bands_bits_share_a_band_key():
+    rng = random.Random(3)
+    fp = simhash.simhash(sample_descriptions()[0])
+    assert settings.dedupe_max_distance < simhash.BANDS
+    for _ in range(200):
+        other = fp
+        for bit in rng.sample(range(64), simhash.BANDS - 1):
+            other ^= 1 << bit
+        other = other - (1 << 64) if other >= 1 << 63 else other
+        assert set(simhash.band_keys(fp, "acme")) & set(simhash.band_keys(other, "acme"))